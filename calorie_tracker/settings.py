@@ -41,6 +41,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tracker.middleware.PerformanceMiddleware',  # First, so it times the whole request
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -74,10 +75,24 @@ WSGI_APPLICATION = 'calorie_tracker.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# tracker.backends.sqlite3 is Django's SQLite backend tuned for concurrent
+# writers (WAL, pragmas, BEGIN IMMEDIATE); see its module docstring.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'tracker.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Reuse connections across requests instead of reconnecting each time
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Seconds a writer waits for the write lock before "database is locked"
+            'timeout': 20,
+        },
+        # Test on a file like production: an in-memory database has no WAL
+        # and locks whole tables between connections
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -121,6 +136,44 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Per-request SQL/render timing, Server-Timing header and /metrics histograms.
+# Set to False to remove the middleware from the request path entirely.
+TRACKER_PERFORMANCE_METRICS = True
+
+# Views over their @query_budget raise QueryBudgetExceeded when True,
+# otherwise a warning is logged by tracker.decorators
+TRACKER_QUERY_BUDGET_STRICT = DEBUG
+
+# Cache used for the food catalog version and per-user dashboard/history
+# fragments. It must be shared by all worker processes in production, or a
+# write only invalidates the pages cached by one of them. Local memory is
+# per process and only suitable for development and tests; use e.g. the
+# file-based backend (or Redis/Memcached across hosts) instead:
+#     'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+#     'LOCATION': BASE_DIR / 'cache',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'calorie-tracker',
+    }
+}
+
+# Refuse to start with a per-process cache (local memory, dummy) when True
+TRACKER_REQUIRE_SHARED_CACHE = not DEBUG
+
+# Seconds cached dashboard/history data lives; writes invalidate it sooner
+TRACKER_FRAGMENT_CACHE_TIMEOUT = 600
+
+# Queue food log writes from the add-food and log-meal views in a per-worker
+# buffer flushed in batches by a background thread (see tracker.ingest),
+# every TRACKER_LOG_FLUSH_INTERVAL_MS or once TRACKER_LOG_FLUSH_BATCH_SIZE
+# entries are waiting. Pages wait up to TRACKER_LOG_READ_WAIT_TIMEOUT
+# seconds for the user's own pending entries.
+TRACKER_BUFFERED_LOG_WRITES = False
+TRACKER_LOG_FLUSH_INTERVAL_MS = 5
+TRACKER_LOG_FLUSH_BATCH_SIZE = 500
+TRACKER_LOG_READ_WAIT_TIMEOUT = 2.0
+
 # Login URLs (using namespaced URLs)
 LOGIN_URL = 'tracker:login'
 LOGIN_REDIRECT_URL = 'tracker:dashboard'
@@ -0,0 +1,164 @@
+/**
+ * Food Search Typeahead
+ * Wires a text input to the food search endpoint and stores the picked
+ * food id in a hidden input.
+ *
+ * When the input has a data-catalog-url, the content-hashed catalog asset
+ * is fetched once (and then served from the browser cache) and prefix
+ * matches are found locally; the endpoint is only asked when fewer than a
+ * full page of foods match, to add its typo-tolerant results.
+ */
+
+(function() {
+    'use strict';
+
+    const RESULT_LIMIT = 10;
+
+    // Catalog promises by URL, shared by every input on the page
+    const catalogs = {};
+
+    function normalize(text) {
+        return text.toLowerCase().match(/[a-z0-9]+/g) || [];
+    }
+
+    /**
+     * Fetch a catalog asset and turn its rows into food objects shaped like
+     * the search endpoint's results. Resolves to null if it cannot be loaded.
+     */
+    function loadCatalog(url) {
+        if (!catalogs[url]) {
+            catalogs[url] = fetch(url, {credentials: 'same-origin'})
+                .then(response => response.ok ? response.json() : Promise.reject(response))
+                .then(data => data.foods.map(row => {
+                    const food = {};
+                    data.fields.forEach((field, i) => { food[field] = row[i]; });
+                    food.category_display = data.categories[food.category] || food.category;
+                    food.words = normalize(food.name);
+                    return food;
+                }))
+                .catch(() => null);
+        }
+        return catalogs[url];
+    }
+
+    /**
+     * Foods with a word starting with each query word, whole-name prefix
+     * matches first, mirroring the prefix tiers of the search endpoint.
+     */
+    function searchCatalog(foods, query, category, limit) {
+        const words = normalize(query);
+        if (!words.length) {
+            return [];
+        }
+        const joined = words.join(' ');
+        const ranked = [];
+        foods.forEach(food => {
+            if (category && food.category !== category) {
+                return;
+            }
+            const matches = words.every(word => food.words.some(foodWord => foodWord.startsWith(word)));
+            if (matches) {
+                ranked.push([food.words.join(' ').startsWith(joined) ? 0 : 1, food]);
+            }
+        });
+        // Foods are already ordered by name, and sort is stable
+        ranked.sort((a, b) => a[0] - b[0]);
+        return ranked.slice(0, limit).map(entry => entry[1]);
+    }
+
+    /**
+     * Attach a typeahead to a search input.
+     *
+     * options:
+     *   hiddenInput    - input receiving the selected food id
+     *   resultsEl      - element the suggestion list is rendered into
+     *   categorySelect - optional <select> restricting results to a category
+     *   onSelect       - optional callback(food) when a suggestion is picked,
+     *                    or callback(null) when the selection is cleared
+     */
+    function attach(searchInput, options) {
+        const hiddenInput = options.hiddenInput;
+        const resultsEl = options.resultsEl;
+        const categorySelect = options.categorySelect || null;
+        const onSelect = options.onSelect || function() {};
+        const catalogUrl = searchInput.dataset.catalogUrl;
+        let searchTimer = null;
+
+        if (catalogUrl) {
+            // Start loading early so the first keystroke can be answered locally
+            loadCatalog(catalogUrl);
+        }
+
+        function clearResults() {
+            resultsEl.innerHTML = '';
+        }
+
+        function selectFood(food) {
+            hiddenInput.value = food.id;
+            searchInput.value = food.name;
+            clearResults();
+            onSelect(food);
+        }
+
+        function showResults(query, results) {
+            if (searchInput.value.trim() !== query) {
+                return;  // A newer search is in flight
+            }
+            clearResults();
+            results.forEach(food => {
+                const item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'list-group-item list-group-item-action';
+                item.innerHTML = '<strong></strong><br><small class="text-muted"></small>';
+                item.querySelector('strong').textContent = food.name;
+                item.querySelector('small').textContent = `${food.category_display} - ${food.calories_per_100g} kcal/100g`;
+                item.addEventListener('click', () => selectFood(food));
+                resultsEl.appendChild(item);
+            });
+        }
+
+        function fetchResults(query, category) {
+            const params = new URLSearchParams({q: query, category: category, limit: RESULT_LIMIT});
+            fetch(`${searchInput.dataset.searchUrl}?${params}`, {credentials: 'same-origin'})
+                .then(response => response.json())
+                .then(data => showResults(query, data.results));
+        }
+
+        function runSearch() {
+            const query = searchInput.value.trim();
+            if (!query) {
+                clearResults();
+                return;
+            }
+            const category = categorySelect ? categorySelect.value : '';
+            if (!catalogUrl) {
+                fetchResults(query, category);
+                return;
+            }
+            loadCatalog(catalogUrl).then(foods => {
+                const results = foods ? searchCatalog(foods, query, category, RESULT_LIMIT) : [];
+                showResults(query, results);
+                if (results.length < RESULT_LIMIT) {
+                    // Let the endpoint fill the list with typo-tolerant matches
+                    fetchResults(query, category);
+                }
+            });
+        }
+
+        searchInput.addEventListener('input', function() {
+            // Typing invalidates the previous selection until a result is picked
+            hiddenInput.value = '';
+            onSelect(null);
+            clearTimeout(searchTimer);
+            searchTimer = setTimeout(runSearch, 150);
+        });
+        if (categorySelect) {
+            categorySelect.addEventListener('change', runSearch);
+        }
+    }
+
+    window.FoodSearch = {
+        attach: attach
+    };
+
+})();
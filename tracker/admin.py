@@ -1,5 +1,7 @@
+from django import forms
 from django.contrib import admin
-from .models import UserProfile, Food, DailyFoodLog
+from django.db.models import Count
+from .models import UserProfile, Food, Recipe, RecipeIngredient, DailyFoodLog, DailyCalorieSummary, UserFoodScore, PopulationStat
 
 
 @admin.register(UserProfile)
@@ -35,7 +37,7 @@ class FoodAdmin(admin.ModelAdmin):
     Admin interface for Food model.
     Allows admins to add/edit/delete food items.
     """
-    list_display = ['name', 'category', 'calories_per_100g', 'created_at']
+    list_display = ['name', 'category', 'calories_per_100g', 'protein_per_100g', 'carbs_per_100g', 'fat_per_100g', 'created_at']
     list_filter = ['category', 'created_at']
     search_fields = ['name', 'category']
     ordering = ['category', 'name']
@@ -44,6 +46,9 @@ class FoodAdmin(admin.ModelAdmin):
         ('Food Information', {
             'fields': ('name', 'category', 'calories_per_100g')
         }),
+        ('Macronutrients (per 100g)', {
+            'fields': ('protein_per_100g', 'carbs_per_100g', 'fat_per_100g', 'fibre_per_100g')
+        }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -52,6 +57,123 @@ class FoodAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at', 'updated_at']
 
 
+class RecipeIngredientInline(admin.TabularInline):
+    """
+    Inline editor for a recipe's ingredients.
+    """
+    model = RecipeIngredient
+    extra = 3
+    autocomplete_fields = ['food']
+
+
+class RecipeAdminForm(forms.ModelForm):
+    """
+    Recipe form that edits the name and category of the recipe's Food.
+    """
+    name = forms.CharField(max_length=200)
+    category = forms.ChoiceField(choices=Food.CATEGORY_CHOICES)
+    
+    class Meta:
+        model = Recipe
+        fields = []
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.fields['name'].initial = self.instance.food.name
+            self.fields['category'].initial = self.instance.food.category
+    
+    def clean_name(self):
+        name = self.cleaned_data['name'].strip()
+        foods = Food.objects.filter(name=name)
+        if self.instance.pk:
+            foods = foods.exclude(pk=self.instance.food_id)
+        if foods.exists():
+            raise forms.ValidationError('A food with this name already exists.')
+        return name
+
+
+@admin.register(Recipe)
+class RecipeAdmin(admin.ModelAdmin):
+    """
+    Admin interface for Recipe model.
+    The per-100g values are calculated from the ingredients and shown
+    read-only; the recipe is logged and searched as a Food.
+    """
+    form = RecipeAdminForm
+    inlines = [RecipeIngredientInline]
+    list_display = ['name', 'category', 'calories_per_100g', 'ingredient_count', 'updated_at']
+    search_fields = ['food__name']
+    readonly_fields = ['calories_per_100g', 'protein_per_100g', 'carbs_per_100g', 'fat_per_100g', 'fibre_per_100g']
+    
+    fieldsets = (
+        ('Recipe', {
+            'fields': ('name', 'category')
+        }),
+        ('Calculated Values (per 100g)', {
+            'fields': ('calories_per_100g', 'protein_per_100g', 'carbs_per_100g', 'fat_per_100g', 'fibre_per_100g')
+        }),
+    )
+    
+    def get_queryset(self, request):
+        """Optimize queryset with select_related and an ingredient count."""
+        qs = super().get_queryset(request)
+        return qs.select_related('food').annotate(ingredient_total=Count('ingredients'))
+    
+    def save_model(self, request, obj, form, change):
+        """Create or update the recipe's Food; its values are filled in from the ingredients."""
+        food = obj.food if change else Food(calories_per_100g=0)
+        food.name = form.cleaned_data['name']
+        food.category = form.cleaned_data['category']
+        food.save()
+        obj.food = food
+        super().save_model(request, obj, form, change)
+    
+    def get_deleted_objects(self, objs, request):
+        """List what deleting the recipes' Foods removes, including logs and protected uses."""
+        return super().get_deleted_objects([obj.food for obj in objs], request)
+    
+    def delete_model(self, request, obj):
+        """Delete the recipe through its Food, which cascades to the recipe."""
+        obj.food.delete()
+    
+    def delete_queryset(self, request, queryset):
+        """Delete the recipes through their Foods, which cascade to the recipes."""
+        Food.objects.filter(id__in=queryset.values('food_id')).delete()
+    
+    @admin.display(description='Name', ordering='food__name')
+    def name(self, obj):
+        return obj.food.name
+    
+    @admin.display(description='Category')
+    def category(self, obj):
+        return obj.food.get_category_display()
+    
+    @admin.display(description='Ingredients', ordering='ingredient_total')
+    def ingredient_count(self, obj):
+        return obj.ingredient_total
+    
+    @admin.display(description='Calories per 100g')
+    def calories_per_100g(self, obj):
+        return obj.food.calories_per_100g if obj.pk else '-'
+    
+    @admin.display(description='Protein per 100g')
+    def protein_per_100g(self, obj):
+        return obj.food.protein_per_100g if obj.pk else '-'
+    
+    @admin.display(description='Carbs per 100g')
+    def carbs_per_100g(self, obj):
+        return obj.food.carbs_per_100g if obj.pk else '-'
+    
+    @admin.display(description='Fat per 100g')
+    def fat_per_100g(self, obj):
+        return obj.food.fat_per_100g if obj.pk else '-'
+    
+    @admin.display(description='Fibre per 100g')
+    def fibre_per_100g(self, obj):
+        return obj.food.fibre_per_100g if obj.pk else '-'
+
+
 @admin.register(DailyFoodLog)
 class DailyFoodLogAdmin(admin.ModelAdmin):
     """
@@ -60,7 +182,7 @@ class DailyFoodLogAdmin(admin.ModelAdmin):
     list_display = ['user', 'food', 'quantity', 'calories', 'date', 'created_at']
     list_filter = ['date', 'created_at', 'food__category']
     search_fields = ['user__username', 'food__name']
-    readonly_fields = ['calories', 'created_at']
+    readonly_fields = ['calories', 'protein', 'carbs', 'fat', 'fibre', 'created_at']
     date_hierarchy = 'date'
     
     fieldsets = (
@@ -68,7 +190,7 @@ class DailyFoodLogAdmin(admin.ModelAdmin):
             'fields': ('user', 'food', 'quantity', 'date')
         }),
         ('Calculated Values', {
-            'fields': ('calories',)
+            'fields': ('calories', 'protein', 'carbs', 'fat', 'fibre')
         }),
         ('Timestamp', {
             'fields': ('created_at',)
@@ -79,3 +201,75 @@ class DailyFoodLogAdmin(admin.ModelAdmin):
         """Optimize queryset with select_related."""
         qs = super().get_queryset(request)
         return qs.select_related('user', 'food')
+
+
+def is_own_admin_view(model_admin, request):
+    """
+    Return True if the request is for one of model_admin's own views (its
+    changelist, delete page, etc.) rather than, say, the delete page of a
+    related object whose deletion cascades to these rows.
+    """
+    resolver_match = request.resolver_match
+    return resolver_match is not None and getattr(resolver_match.func, 'model_admin', None) is model_admin
+
+
+@admin.register(DailyCalorieSummary)
+class DailyCalorieSummaryAdmin(admin.ModelAdmin):
+    """
+    Read-only admin interface for DailyCalorieSummary model.
+    Rows are maintained automatically from DailyFoodLog.
+    """
+    list_display = ['user', 'date', 'total_calories', 'total_protein', 'total_carbs', 'total_fat', 'entry_count', 'updated_at']
+    list_filter = ['date']
+    search_fields = ['user__username']
+    date_hierarchy = 'date'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        # Rows go with their user, but cannot be deleted on their own
+        return not is_own_admin_view(self, request) and super().has_delete_permission(request, obj)
+
+
+@admin.register(UserFoodScore)
+class UserFoodScoreAdmin(admin.ModelAdmin):
+    """
+    Read-only admin interface for UserFoodScore model.
+    Rows are maintained automatically from DailyFoodLog.
+    """
+    list_display = ['user', 'food', 'score', 'log_count']
+    search_fields = ['user__username', 'food__name']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        # Rows go with their user or food, but cannot be deleted on their own
+        return not is_own_admin_view(self, request) and super().has_delete_permission(request, obj)
+
+
+@admin.register(PopulationStat)
+class PopulationStatAdmin(admin.ModelAdmin):
+    """
+    Read-only admin interface for PopulationStat model.
+    Shows the precomputed results of the compute_population_stats command;
+    nothing here queries the food logs.
+    """
+    list_display = ['key', 'dimension', 'average_daily_calories', 'user_count', 'logged_days', 'entry_count', 'computed_at']
+    list_filter = ['dimension']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .instrumentation import install_query_timing
+        from .user_cache import check_shared_cache
+        
+        check_shared_cache()
+        install_query_timing()
@@ -0,0 +1 @@
+# SQLite backend tuned for concurrent writers
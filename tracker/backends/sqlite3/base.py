@@ -0,0 +1,47 @@
+"""
+SQLite backend tuned for concurrent writers.
+
+Use it as the database ENGINE ('tracker.backends.sqlite3'). On top of
+Django's SQLite backend it:
+
+- applies PRAGMAS to every new connection: WAL journaling so readers never
+  block the writer, synchronous=NORMAL (safe with WAL), a larger page
+  cache, memory-mapped reads and in-memory temp tables. Individual pragmas
+  can be overridden with OPTIONS['pragmas'];
+- starts transactions with BEGIN IMMEDIATE, taking the write lock up
+  front. With a plain BEGIN, two transactions that both read and then
+  write (e.g. saving a log and refreshing its daily summary) can deadlock
+  on the lock upgrade, and SQLite fails one of them with "database is
+  locked" at once instead of waiting for the busy timeout.
+
+Set OPTIONS['timeout'] for the busy timeout and CONN_MAX_AGE for
+persistent connections as usual.
+"""
+from django.db.backends.sqlite3 import base
+
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Negative sizes are in KiB: 64 MiB page cache per connection
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        # Not a sqlite3.connect() argument, so take it out before connecting
+        self.pragmas = {**PRAGMAS, **kwargs.pop('pragmas', {})}
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
@@ -0,0 +1,137 @@
+"""
+Per-worker in-memory cache of the Food catalog.
+
+Every worker keeps a snapshot of the Food table (id -> name, category,
+calories and macronutrients per 100g) tagged with the catalog version it
+was loaded at. The version counter lives in the Django cache so that a bump
+from any worker is seen by all workers sharing that cache; it is bumped on
+Food save/delete and the snapshot is reloaded lazily on the next access.
+
+Each snapshot also renders itself, once, as a gzipped JSON asset whose URL
+carries a hash of its content (see views.food_catalog), so browsers fetch
+the catalog once per change and serve it from cache on every page after.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from .models import Food
+
+
+CATALOG_VERSION_KEY = 'tracker:food_catalog_version'
+
+CatalogFood = namedtuple('CatalogFood', [
+    'id', 'name', 'category', 'calories_per_100g',
+    'protein_per_100g', 'carbs_per_100g', 'fat_per_100g', 'fibre_per_100g',
+])
+
+CatalogAsset = namedtuple('CatalogAsset', ['digest', 'content', 'gzipped'])
+
+# Per-food columns of the catalog asset, in order
+ASSET_FIELDS = [
+    'id', 'name', 'category', 'calories_per_100g',
+    'protein_per_100g', 'carbs_per_100g', 'fat_per_100g', 'fibre_per_100g',
+]
+
+
+def get_catalog_version():
+    """Return the current catalog version, initialising it if the cache is empty."""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Seed with the clock rather than 1 so a version lost to eviction
+        # never comes back to a value a worker still holds a snapshot of
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, 0)
+    return version
+
+
+def bump_catalog_version():
+    """Invalidate every worker's catalog snapshot."""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+class FoodCatalog:
+    """
+    Immutable snapshot of the Food table.
+    """
+
+    def __init__(self, version, foods):
+        self.version = version
+        self.foods = {food.id: food for food in foods}
+        self._asset = None
+
+    @classmethod
+    def load(cls, version):
+        """Load a snapshot of the Food table in a single query."""
+        rows = Food.objects.order_by().values_list(*CatalogFood._fields)
+        return cls(version, [CatalogFood(*row) for row in rows])
+
+    def __len__(self):
+        return len(self.foods)
+
+    def get(self, food_id):
+        """Return the CatalogFood for an id, or None."""
+        return self.foods.get(food_id)
+
+    def get_food(self, food_id):
+        """
+        Return a Food instance built from the snapshot, or None.
+        The instance behaves like one loaded from the database, so it can be
+        assigned to foreign keys without another query.
+        """
+        entry = self.get(food_id)
+        if entry is None:
+            return None
+        food = Food(**entry._asdict())
+        food._state.adding = False
+        food._state.db = 'default'
+        return food
+
+    def asset(self):
+        """
+        Return the snapshot as a CatalogAsset: compact JSON (rows of
+        ASSET_FIELDS ordered by name, plus category labels), its gzipped
+        form and a digest of the JSON for cache-busting URLs. Built on first
+        use and kept for the life of the snapshot.
+        """
+        if self._asset is None:
+            rows = [
+                [entry.id, entry.name, entry.category] + [
+                    float(getattr(entry, field)) for field in ASSET_FIELDS[3:]
+                ]
+                for entry in sorted(self.foods.values(), key=lambda entry: entry.name)
+            ]
+            content = json.dumps(
+                {'fields': ASSET_FIELDS, 'categories': dict(Food.CATEGORY_CHOICES), 'foods': rows},
+                separators=(',', ':')
+            ).encode()
+            # mtime=0 keeps the gzipped bytes identical across workers
+            self._asset = CatalogAsset(
+                hashlib.sha256(content).hexdigest()[:16], content, gzip.compress(content, mtime=0)
+            )
+        return self._asset
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return this worker's catalog snapshot, reloading it if the version moved on."""
+    global _catalog
+    version = get_catalog_version()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        with _catalog_lock:
+            if _catalog is None or _catalog.version != version:
+                _catalog = FoodCatalog.load(version)
+            catalog = _catalog
+    return catalog
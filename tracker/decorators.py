@@ -0,0 +1,207 @@
+"""
+View decorators.
+"""
+import hashlib
+import logging
+import time
+from datetime import datetime, time as dt_time, timezone as dt_timezone
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .catalog import get_catalog_version
+from .ingest import wait_for_user_writes
+from .instrumentation import QueryTimer
+from .user_cache import csrf_fragment_key, get_user_data_modified, get_user_data_version
+
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a view issues more queries or spends more DB time than its budget allows."""
+
+
+def query_budget(max_queries, max_db_ms=None):
+    """
+    Limit the number of SQL queries (and optionally total SQL time in ms)
+    a view may issue while building its response.
+
+    Over-budget views raise QueryBudgetExceeded when
+    settings.TRACKER_QUERY_BUDGET_STRICT is True (defaults to DEBUG), so
+    N+1 regressions fail loudly in development and tests; otherwise a
+    structured warning is logged and the response is returned unchanged.
+
+    Apply it directly to the view function, inside login_required and
+    similar decorators, so only the view's own queries are counted. Async
+    views are supported: queries they run through the async ORM are
+    counted even though they execute in sync_to_async worker threads.
+
+    Streaming responses run their queries while the body is iterated, after
+    the view has returned, so for those the count also covers producing the
+    body and the budget is checked once the last chunk has been sent.
+    """
+    def check(view_func, request, timer, elapsed_ms):
+        db_ms = timer.duration * 1000
+        over_queries = timer.count > max_queries
+        over_time = max_db_ms is not None and db_ms > max_db_ms
+        if not (over_queries or over_time):
+            return
+        details = {
+            'view': view_func.__name__,
+            'path': request.path,
+            'queries': timer.count,
+            'max_queries': max_queries,
+            'db_ms': round(db_ms, 2),
+            'max_db_ms': max_db_ms,
+            'view_ms': round(elapsed_ms, 2),
+        }
+        if getattr(settings, 'TRACKER_QUERY_BUDGET_STRICT', settings.DEBUG):
+            budget = f'{max_queries} queries' + (f' / {max_db_ms} ms' if max_db_ms is not None else '')
+            raise QueryBudgetExceeded(
+                f"{details['view']} used {details['queries']} queries / {details['db_ms']} ms "
+                f"(budget: {budget})"
+            )
+        logger.warning('Query budget exceeded in %s', details['view'], extra={'query_budget': details})
+
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                timer = QueryTimer()
+                start = time.perf_counter()
+                with timer:
+                    response = await view_func(request, *args, **kwargs)
+                check(view_func, request, timer, (time.perf_counter() - start) * 1000)
+                return response
+            return async_wrapper
+
+        def timed_stream(request, content, timer, start):
+            # Each chunk is produced under the timer; the budget is checked
+            # once the body has been sent
+            iterator = iter(content)
+            try:
+                while True:
+                    with timer:
+                        try:
+                            chunk = next(iterator)
+                        except StopIteration:
+                            break
+                    yield chunk
+            finally:
+                close = getattr(iterator, 'close', None)
+                if close is not None:
+                    close()
+            check(view_func, request, timer, (time.perf_counter() - start) * 1000)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            timer = QueryTimer()
+            start = time.perf_counter()
+            with timer:
+                response = view_func(request, *args, **kwargs)
+            if getattr(response, 'streaming', False) and not response.is_async:
+                response.streaming_content = timed_stream(request, response.streaming_content, timer, start)
+                return response
+            check(view_func, request, timer, (time.perf_counter() - start) * 1000)
+            return response
+        return wrapper
+    return decorator
+
+
+def async_login_required(view_func):
+    """
+    login_required for async views, which Django 4.2's decorator does not
+    support. request.user is resolved in a worker thread because loading it
+    reads the session and user tables.
+    """
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        is_authenticated = await sync_to_async(lambda: request.user.is_authenticated)()
+        if not is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def read_your_writes(view_func):
+    """
+    Wait for the user's food log entries still in this worker's write
+    buffer (see tracker.ingest) to be committed before the view runs, so a
+    page reflects everything the user just submitted. A no-op when nothing
+    is buffered.
+
+    Apply it inside login_required and outside user_data_conditional, so
+    the ETag is computed from the data version after the flush. Async views
+    are supported.
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            await sync_to_async(lambda: wait_for_user_writes(request.user.pk))()
+            return await view_func(request, *args, **kwargs)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        wait_for_user_writes(request.user.pk)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def user_data_conditional(range_func):
+    """
+    Answer conditional GETs for a page built only from the user's own data
+    with 304 Not Modified before the view runs any queries.
+
+    range_func(request) returns the requested range (e.g. a date or week
+    start) and is part of the ETag together with the user's data version,
+    the food catalog version (pages show food names and categories) and the
+    CSRF secret, so the cached page's forms stay valid. Last-Modified is the
+    latest of the last data change, the last login (which rotates the CSRF
+    secret) and the start of today (which moves default ranges). Requests
+    with pending flash messages always get a full response so the messages
+    are shown, and so do requests whose range_func returns None (an invalid
+    range), so the view can reject them. Responses are marked private and
+    must be revalidated.
+
+    Apply it inside login_required.
+    """
+    def has_pending_messages(request):
+        return len(messages.get_messages(request)) > 0
+
+    def etag_func(request, *args, **kwargs):
+        if has_pending_messages(request):
+            return None
+        requested_range = range_func(request)
+        if requested_range is None:
+            return None
+        user_id = request.user.pk
+        parts = [
+            user_id, get_user_data_version(user_id), get_catalog_version(),
+            csrf_fragment_key(request), requested_range,
+        ]
+        return hashlib.sha1(':'.join(str(part) for part in parts).encode()).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        if has_pending_messages(request) or range_func(request) is None:
+            return None
+        today_start = timezone.make_aware(datetime.combine(timezone.localdate(), dt_time.min))
+        candidates = [
+            datetime.fromtimestamp(get_user_data_modified(request.user.pk), tz=dt_timezone.utc),
+            today_start,
+        ]
+        if request.user.last_login:
+            candidates.append(request.user.last_login)
+        return max(candidates)
+
+    def decorator(view_func):
+        view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+        return cache_control(private=True, no_cache=True)(view)
+    return decorator
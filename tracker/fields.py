@@ -0,0 +1,100 @@
+"""
+Fixed-point model field.
+
+Quantities, calories and macronutrients are stored as integer counts of
+hundredths (centigrams, centi-kcal) instead of SQLite's REAL/text decimals,
+so reading a row needs no decimal parsing and SUMs over years of logs run
+as exact integer additions in the database. In Python the values are
+Decimals with two places, so forms, templates and JSON output are unchanged.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from django import forms
+from django.core import exceptions
+from django.db import models
+
+
+# Stored integer units per whole unit
+SCALE = 100
+
+TWO_PLACES = Decimal('0.01')
+
+
+def to_fixed(value):
+    """Return a Decimal (or int/str) value as an integer count of hundredths."""
+    return int((Decimal(value) * SCALE).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def from_fixed(units):
+    """Return an integer count of hundredths as a two-place Decimal."""
+    return (Decimal(units) / SCALE).quantize(TWO_PLACES)
+
+
+def divide_half_up(numerator, denominator):
+    """Divide non-negative integers, rounding half up, without floats."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def scale_per_100(units, per_100_units):
+    """
+    Return the amount in hundredths for units (hundredths of the base
+    quantity) of something containing per_100_units (hundredths) per 100 of
+    the base quantity, rounded half up using integer arithmetic only.
+    """
+    return divide_half_up(units * per_100_units, 100 * SCALE)
+
+
+class FixedPointField(models.Field):
+    """
+    Two-place decimal stored as a BIGINT count of hundredths.
+    """
+
+    description = 'Fixed-point decimal stored as an integer count of hundredths'
+    default_error_messages = {
+        'invalid': '“%(value)s” value must be a decimal number.',
+    }
+
+    def __init__(self, *args, max_digits=None, **kwargs):
+        self.max_digits = max_digits
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.max_digits is not None:
+            kwargs['max_digits'] = self.max_digits
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return 'BigIntegerField'
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        # Integer SUMs come back as int (SQLite) or Decimal (PostgreSQL)
+        return from_fixed(Decimal(str(value)))
+
+    def to_python(self, value):
+        if value is None:
+            return value
+        try:
+            return Decimal(str(value)).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+        except InvalidOperation:
+            raise exceptions.ValidationError(
+                self.error_messages['invalid'],
+                code='invalid',
+                params={'value': value},
+            )
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return to_fixed(self.to_python(value))
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{
+            'form_class': forms.DecimalField,
+            'max_digits': self.max_digits,
+            'decimal_places': 2,
+            **kwargs,
+        })
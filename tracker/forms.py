@@ -1,7 +1,32 @@
+from datetime import timedelta
+from decimal import Decimal
 from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.utils import timezone
 from .models import UserProfile, Food, DailyFoodLog
+from .catalog import get_catalog
+
+
+class CatalogFoodChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField that resolves the submitted id through the Food catalog
+    cache instead of querying the Food table.
+    """
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            food = get_catalog().get_food(int(value))
+        except (TypeError, ValueError):
+            food = None
+        if food is None:
+            raise forms.ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return food
 
 
 class UserRegistrationForm(UserCreationForm):
@@ -95,14 +120,28 @@ class UserProfileForm(forms.ModelForm):
         }
 
 
+# Entries may be logged at most this many days ahead, e.g. for planned meals
+MAX_DAYS_AHEAD = 365
+
+
+def validate_log_date(value):
+    """Reject entry dates further ahead than MAX_DAYS_AHEAD."""
+    if value > timezone.now().date() + timedelta(days=MAX_DAYS_AHEAD):
+        raise forms.ValidationError(
+            'Entries can be logged at most %(days)d days ahead.', code='too_far_ahead', params={'days': MAX_DAYS_AHEAD}
+        )
+    return value
+
+
 class FoodLogForm(forms.ModelForm):
     """
     Form for logging daily food consumption.
     """
-    food = forms.ModelChoiceField(
-        queryset=Food.objects.all().order_by('category', 'name'),
-        widget=forms.Select(attrs={
-            'class': 'form-control',
+    # Hidden input filled in by the search typeahead, so the full catalog
+    # is never rendered into the page as <option>s
+    food = CatalogFoodChoiceField(
+        queryset=Food.objects.all(),
+        widget=forms.HiddenInput(attrs={
             'id': 'food-select'
         }),
         label='Food Item'
@@ -135,8 +174,72 @@ class FoodLogForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         # Set default date to today
         if not self.instance.pk:
-            from django.utils import timezone
             self.fields['date'].initial = timezone.now().date()
+    
+    def clean_date(self):
+        return validate_log_date(self.cleaned_data['date'])
+    
+    def _get_validation_exclusions(self):
+        # The food id was already checked against the catalog cache, so skip
+        # the model's foreign key existence query
+        exclude = super()._get_validation_exclusions()
+        exclude.add('food')
+        return exclude
+
+
+class MealLogForm(forms.Form):
+    """
+    Date for a multi-item meal; the items come from MealItemFormSet.
+    """
+    date = forms.DateField(
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date',
+            'id': 'date-input'
+        }),
+        label='Date',
+        validators=[validate_log_date]
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['date'].initial = timezone.now().date()
+
+
+class MealItemForm(forms.Form):
+    """
+    A single (food, quantity) row of a meal.
+    """
+    food = CatalogFoodChoiceField(
+        queryset=Food.objects.all(),
+        widget=forms.HiddenInput(attrs={
+            'class': 'food-id'
+        }),
+        label='Food Item'
+    )
+    quantity = forms.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        min_value=Decimal('0.01'),
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control quantity-input',
+            'placeholder': 'Quantity in grams',
+            'step': '0.01',
+            'min': 0.01
+        }),
+        label='Quantity (grams)'
+    )
+
+
+# One required row plus four optional ones covers a typical thali
+MealItemFormSet = forms.formset_factory(
+    MealItemForm,
+    extra=4,
+    min_num=1,
+    validate_min=True,
+    max_num=20,
+    validate_max=True
+)
 
 
 class LoginForm(forms.Form):
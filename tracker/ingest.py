@@ -0,0 +1,207 @@
+"""
+Write-coalescing ingestion of food log entries.
+
+With settings.TRACKER_BUFFERED_LOG_WRITES enabled, the add-food and
+log-meal views validate an entry and compute its nutrients in the request,
+then hand it to this worker's LogWriteBuffer instead of committing it
+themselves. A background thread flushes the buffer every
+TRACKER_LOG_FLUSH_INTERVAL_MS milliseconds, or as soon as
+TRACKER_LOG_FLUSH_BATCH_SIZE entries are waiting, inserting each batch with
+one bulk_create and refreshing the affected daily summaries and food
+scores in the same transaction. Peak-time submissions then share a handful
+of commits instead of paying for one each.
+
+Entries still in the buffer are flushed when the process exits normally
+(e.g. a graceful worker shutdown), and views reading a user's own data wait
+for that user's pending entries first (see decorators.read_your_writes), so
+a submission is always visible on the next page served by the same worker.
+The buffer is per process: a page served by another worker sees the entry
+once the next flush has committed it, a few milliseconds later.
+"""
+import atexit
+import logging
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+
+from .catalog import get_catalog
+from .models import DailyFoodLog, DailyCalorieSummary, UserFoodScore
+from .user_cache import bump_user_data_version
+
+
+logger = logging.getLogger(__name__)
+
+# Defaults for the flush interval (ms) and the batch size that triggers an early flush
+DEFAULT_FLUSH_INTERVAL_MS = 5
+DEFAULT_FLUSH_BATCH_SIZE = 500
+
+# Seconds a reading view waits for the user's pending entries before giving up
+DEFAULT_READ_WAIT_TIMEOUT = 2.0
+
+
+def buffered_log_writes_enabled():
+    """Return True if food log writes go through the write buffer."""
+    return getattr(settings, 'TRACKER_BUFFERED_LOG_WRITES', False)
+
+
+class LogWriteBuffer:
+    """
+    In-process queue of unsaved DailyFoodLog instances flushed in batches
+    by a background thread.
+    """
+
+    def __init__(self, interval_ms=DEFAULT_FLUSH_INTERVAL_MS, batch_size=DEFAULT_FLUSH_BATCH_SIZE):
+        self.interval = interval_ms / 1000
+        self.batch_size = batch_size
+        self._queue = []
+        # Entries per user that are queued or being flushed
+        self._pending = Counter()
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._start_thread()
+
+    def _start_thread(self):
+        self._thread = threading.Thread(target=self._run, name='tracker-log-writer', daemon=True)
+        self._thread.start()
+
+    def add(self, logs):
+        """
+        Queue entries for the next flush. Their nutrients must already be
+        set; nothing is validated here.
+        """
+        with self._condition:
+            if self._stopping:
+                raise RuntimeError('The log write buffer has been shut down.')
+            if not self._thread.is_alive():
+                logger.error('Food log writer thread had died; restarting it')
+                self._start_thread()
+            was_empty = not self._queue
+            self._queue.extend(logs)
+            self._pending.update(log.user_id for log in logs)
+            # Wake the idle flush thread for the first entry, and again once
+            # a full batch is waiting so it need not sit out the interval
+            if was_empty or len(self._queue) >= self.batch_size:
+                self._condition.notify_all()
+
+    def wait_for_user(self, user_id, timeout=DEFAULT_READ_WAIT_TIMEOUT):
+        """
+        Block until none of the user's entries are waiting to be committed.
+        Returns False if they were still pending after timeout seconds.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending[user_id], timeout)
+
+    def shutdown(self):
+        """Stop the flush thread after it has committed every queued entry."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            while True:
+                with self._condition:
+                    # Sleep while idle; once an entry arrives, give others
+                    # up to one interval to join its batch
+                    self._condition.wait_for(lambda: self._stopping or self._queue)
+                    self._condition.wait_for(
+                        lambda: self._stopping or len(self._queue) >= self.batch_size,
+                        self.interval
+                    )
+                    batch = self._queue[:self.batch_size]
+                    del self._queue[:self.batch_size]
+                    if not batch and self._stopping:
+                        return
+                if batch:
+                    self._flush(batch)
+        finally:
+            connection.close()
+
+    def _flush(self, batch):
+        # Any error is caught, not just database errors: an exception
+        # escaping here would end the thread and strand every later entry
+        try:
+            self._write(batch)
+        except Exception:
+            # Retry entry by entry so one bad row (e.g. a food deleted since
+            # it was validated) does not take the rest of the batch with it
+            logger.exception('Batched write of %d food log entries failed; retrying one by one', len(batch))
+            for log in batch:
+                try:
+                    self._write([log])
+                except Exception:
+                    logger.exception('Dropped food log entry for user %s on %s', log.user_id, log.date)
+        finally:
+            with self._condition:
+                self._pending.subtract(log.user_id for log in batch)
+                self._pending += Counter()
+                self._condition.notify_all()
+
+    @staticmethod
+    def _write(logs):
+        days = {(log.user_id, log.date) for log in logs}
+        with transaction.atomic():
+            DailyFoodLog.objects.bulk_create(logs)
+            for user_id, date in days:
+                DailyCalorieSummary.refresh(user_id, date)
+            UserFoodScore.add_logs(logs)
+            for user_id in {user_id for user_id, _ in days}:
+                transaction.on_commit(lambda user_id=user_id: bump_user_data_version(user_id))
+
+
+_buffer = None
+_buffer_pid = None
+_buffer_lock = threading.Lock()
+
+
+def get_log_buffer():
+    """Return this process's write buffer, starting it on first use."""
+    global _buffer, _buffer_pid
+    # A forked worker inherits the parent's buffer object but not its thread
+    if _buffer is None or _buffer_pid != os.getpid():
+        with _buffer_lock:
+            if _buffer is None or _buffer_pid != os.getpid():
+                _buffer = LogWriteBuffer(
+                    getattr(settings, 'TRACKER_LOG_FLUSH_INTERVAL_MS', DEFAULT_FLUSH_INTERVAL_MS),
+                    getattr(settings, 'TRACKER_LOG_FLUSH_BATCH_SIZE', DEFAULT_FLUSH_BATCH_SIZE),
+                )
+                _buffer_pid = os.getpid()
+    return _buffer
+
+
+def submit_logs(logs):
+    """
+    Compute the nutrients of validated, unsaved entries and queue them for
+    writing. Returns the entries, which get their ids once flushed.
+
+    Raises ValidationError, queuing nothing, if an entry's food is not in
+    the catalog (e.g. it was deleted after the form was validated).
+    """
+    catalog = get_catalog()
+    for log in logs:
+        if catalog.get(log.food_id) is None:
+            raise ValidationError('The selected food is no longer available.', code='invalid_food')
+    for log in logs:
+        log.set_nutrients()
+    get_log_buffer().add(logs)
+    return logs
+
+
+def wait_for_user_writes(user_id):
+    """Wait until the user's buffered entries in this process are committed."""
+    if _buffer is None or _buffer_pid != os.getpid():
+        return
+    timeout = getattr(settings, 'TRACKER_LOG_READ_WAIT_TIMEOUT', DEFAULT_READ_WAIT_TIMEOUT)
+    if not _buffer.wait_for_user(user_id, timeout):
+        logger.warning('Food log entries for user %s still pending after %ss', user_id, timeout)
+
+
+@atexit.register
+def _flush_on_exit():
+    if _buffer is not None and _buffer_pid == os.getpid():
+        _buffer.shutdown()
@@ -0,0 +1,150 @@
+"""
+Low-level timing hooks for SQL queries and template rendering.
+
+QueryTimer counts queries and their total duration, and RenderTimer measures
+time spent rendering templates. Both are context managers that only see work
+done in their own context: QueryTimer relies on an execute wrapper added to
+every database connection (see install_query_timing), RenderTimer on a
+one-time patch of Template._render (see install_render_timing), and each
+hook only does work while a timer is active in the current context.
+
+Because the active timers are held in context variables, which asgiref's
+sync_to_async copies into its worker threads, queries an async view runs
+through the async ORM are counted too, even though they execute on another
+thread's connection.
+"""
+import contextvars
+import math
+import threading
+import time
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.base import Template
+
+
+_active_query_timers = contextvars.ContextVar('tracker_query_timers', default=())
+
+
+class QueryTimer:
+    """
+    Context manager counting the SQL queries run in the current context,
+    and their total time. Timers can be nested; each sees every query.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self._lock = threading.Lock()
+        self._token = None
+
+    def __enter__(self):
+        install_query_timing()
+        self._token = _active_query_timers.set(_active_query_timers.get() + (self,))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_query_timers.reset(self._token)
+
+    def record(self, duration):
+        # Worker threads of one request may finish queries concurrently
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+
+
+def _timed_execute(execute, sql, params, many, context):
+    timers = _active_query_timers.get()
+    if not timers:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for timer in timers:
+            timer.record(duration)
+
+
+def _add_timed_execute(sender=None, connection=None, **kwargs):
+    # Outermost, so wrappers pushed by connection.execute_wrapper() pop cleanly
+    if _timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _timed_execute)
+
+
+_query_timing_lock = threading.Lock()
+_query_timing_installed = False
+
+
+def install_query_timing():
+    """
+    Add the QueryTimer execute wrapper to every database connection in every
+    thread: this thread's existing connections now, and any connection as it
+    is opened from then on. Idempotent; called from the app's ready().
+    """
+    global _query_timing_installed
+    with _query_timing_lock:
+        if not _query_timing_installed:
+            connection_created.connect(_add_timed_execute, dispatch_uid='tracker_query_timing')
+            _query_timing_installed = True
+    for connection in connections.all(initialized_only=True):
+        _add_timed_execute(connection=connection)
+
+
+_active_render_timers = contextvars.ContextVar('tracker_render_timers', default=())
+
+
+class RenderTimer:
+    """
+    Context manager accumulating template render time. Timers can be nested;
+    each sees every render. Nested renders ({% extends %}, {% include %}) are
+    only counted once.
+    """
+
+    def __init__(self):
+        self.duration = 0.0
+        self.depth = 0
+        self._token = None
+
+    def __enter__(self):
+        install_render_timing()
+        self._token = _active_render_timers.set(_active_render_timers.get() + (self,))
+        return self
+
+    def __exit__(self, *exc_info):
+        _active_render_timers.reset(self._token)
+
+
+def install_render_timing():
+    """Wrap Template._render so active RenderTimers see render time. Idempotent."""
+    render = Template._render
+    if getattr(render, 'tracker_timed', False):
+        return
+
+    def timed_render(self, context):
+        timers = _active_render_timers.get()
+        if not timers:
+            return render(self, context)
+        for timer in timers:
+            timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            duration = time.perf_counter() - start
+            for timer in timers:
+                timer.depth -= 1
+                if timer.depth == 0:
+                    timer.duration += duration
+
+    timed_render.tracker_timed = True
+    Template._render = timed_render
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile (fraction between 0 and 1) of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
@@ -0,0 +1,85 @@
+"""
+Management command to fill in the macronutrients of food logs saved before
+they were stored on each entry.
+Run with: python manage.py backfill_log_macros [--user USERNAME ...]
+
+Entries logged before macronutrients were added kept zero protein, carbs,
+fat and fibre. Their macronutrients are recalculated from the linked Food
+(calories are left as logged) and the affected daily summaries rebuilt.
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tracker.models import DailyFoodLog, DailyCalorieSummary, MACRONUTRIENTS
+
+
+class Command(BaseCommand):
+    help = 'Recalculates the macronutrients of food logs saved without them and rebuilds their summaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Only backfill food logs of this username (can be repeated)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows updated per transaction (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        # Entries with no macronutrients whose food has some
+        logs = DailyFoodLog.objects.filter(
+            **{name: 0 for name in MACRONUTRIENTS}
+        ).exclude(
+            **{f'food__{name}_per_100g': 0 for name in MACRONUTRIENTS}
+        )
+        usernames = options['usernames']
+        if usernames:
+            user_ids = list(User.objects.filter(username__in=usernames).values_list('id', flat=True))
+            if len(user_ids) != len(set(usernames)):
+                raise CommandError('One or more usernames do not exist.')
+            logs = logs.filter(user_id__in=user_ids)
+
+        updated = 0
+        touched_user_ids = set()
+        logs = logs.select_related('food').order_by('id')
+        try:
+            # Batches are read by id rather than through one open cursor,
+            # since each batch updates the rows the query selects
+            last_id = 0
+            while True:
+                batch = list(logs.filter(id__gt=last_id)[:batch_size])
+                if not batch:
+                    break
+                for log in batch:
+                    nutrients = log.calculate_nutrients()
+                    for name in MACRONUTRIENTS:
+                        setattr(log, name, nutrients[name])
+                updated += self.flush(batch, touched_user_ids)
+                last_id = batch[-1].id
+        finally:
+            # bulk_update skips the save signals, so rebuild the affected
+            # summaries once, including for batches committed before a failure
+            summary_count = DailyCalorieSummary.rebuild(touched_user_ids) if touched_user_ids else 0
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'[SUCCESS] Backfilled macronutrients of {updated} food logs '
+                f'and rebuilt {summary_count} daily summaries!'
+            )
+        )
+
+    def flush(self, batch, touched_user_ids):
+        """Save one batch's macronutrients in its own transaction."""
+        with transaction.atomic():
+            DailyFoodLog.objects.bulk_update(batch, MACRONUTRIENTS)
+        touched_user_ids.update(log.user_id for log in batch)
+        return len(batch)
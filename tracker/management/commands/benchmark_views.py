@@ -0,0 +1,192 @@
+"""
+Management command to benchmark every tracker route through the test client.
+Run with: python manage.py benchmark_views --user USERNAME [--iterations 20] [--output report.json]
+
+For each route the report records the response status, query count, SQL
+time, template render time and p50/p95 latency. Reports are JSON so they can
+be kept per commit and compared with --compare.
+
+--asgi sends requests through the ASGI handler so async views (e.g.
+dashboard_async) run natively and can be compared with their sync
+counterparts; --cold invalidates the user's cached pages before every
+request so each one does its full work.
+"""
+import json
+import time
+
+import django
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from tracker import urls as tracker_urls
+from tracker.instrumentation import QueryTimer, RenderTimer, percentile
+from tracker.models import DailyFoodLog
+from tracker.user_cache import bump_user_data_version
+
+
+# Routes that change state in a way that breaks later requests
+SKIPPED_ROUTES = ['logout']
+
+# Extra query strings so routes exercise their main code path
+ROUTE_QUERY_STRINGS = {
+    'food_search': '?q=dal',
+    'export_logs': '?format=csv',
+    'calendar_report': '?period=year&count=10',
+}
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks every tracker route and writes a JSON performance report'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='username', required=True, help='User to request the pages as')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per route (default: 20)')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+        parser.add_argument('--compare', help='Previous JSON report to print a comparison against')
+        parser.add_argument('--asgi', action='store_true', help='Send requests through the ASGI handler')
+        parser.add_argument('--cold', action='store_true', help="Invalidate the user's cached pages before every request")
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1.')
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist.')
+
+        self.user = user
+        self.cold = options['cold']
+
+        setup_test_environment()
+        try:
+            client = AsyncClient() if options['asgi'] else Client()
+            client.force_login(user)
+            routes = {}
+            for name, url in self.route_urls(user):
+                routes[name] = self.benchmark(client, url, options['iterations'])
+        finally:
+            teardown_test_environment()
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'django_version': django.get_version(),
+            'database': connection.vendor,
+            'user': user.username,
+            'food_logs': DailyFoodLog.objects.filter(user=user).count(),
+            'iterations': options['iterations'],
+            'asgi': options['asgi'],
+            'cold': options['cold'],
+            'routes': routes,
+        }
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output + '\n')
+            self.stdout.write(self.style.SUCCESS(f'[SUCCESS] Report written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            self.compare(options['compare'], report)
+
+    def route_urls(self, user):
+        """Yield (name, url) for every named tracker route, filling in URL arguments."""
+        sample_log_id = DailyFoodLog.objects.filter(user=user).values_list('id', flat=True).first()
+
+        for pattern in tracker_urls.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name or pattern.name in SKIPPED_ROUTES:
+                continue
+
+            kwargs = {}
+            if 'log_id' in pattern.pattern.converters:
+                if sample_log_id is None:
+                    self.stderr.write(self.style.WARNING(f'[SKIPPED] {pattern.name}: user has no food logs'))
+                    continue
+                kwargs['log_id'] = sample_log_id
+            if set(pattern.pattern.converters) - set(kwargs):
+                self.stderr.write(self.style.WARNING(f'[SKIPPED] {pattern.name}: unknown URL arguments'))
+                continue
+
+            url = reverse(f'{tracker_urls.app_name}:{pattern.name}', kwargs=kwargs)
+            yield pattern.name, url + ROUTE_QUERY_STRINGS.get(pattern.name, '')
+
+    def benchmark(self, client, url, iterations):
+        """Request a URL once to warm up, then time the given number of requests."""
+        self.request(client, url)
+
+        latencies, db_times, render_times, query_counts = [], [], [], []
+        status = None
+        for _ in range(iterations):
+            query_timer = QueryTimer()
+            with query_timer, RenderTimer() as render_timer:
+                start = time.perf_counter()
+                status = self.request(client, url)
+                latencies.append((time.perf_counter() - start) * 1000)
+            db_times.append(query_timer.duration * 1000)
+            render_times.append(render_timer.duration * 1000)
+            query_counts.append(query_timer.count)
+
+        # Progress goes to stderr so stdout stays valid JSON
+        self.stderr.write(
+            f'[BENCH] {url}: p50 {percentile(latencies, 0.5):.2f} ms, '
+            f'p95 {percentile(latencies, 0.95):.2f} ms, {max(query_counts)} queries'
+        )
+        return {
+            'url': url,
+            'status': status,
+            'queries': max(query_counts),
+            'db_ms_p50': round(percentile(db_times, 0.5), 3),
+            'render_ms_p50': round(percentile(render_times, 0.5), 3),
+            'latency_ms_p50': round(percentile(latencies, 0.5), 3),
+            'latency_ms_p95': round(percentile(latencies, 0.95), 3),
+            'latency_ms_mean': round(sum(latencies) / len(latencies), 3),
+        }
+
+    def request(self, client, url):
+        """GET a URL, draining streaming responses, and return the status code."""
+        if self.cold:
+            bump_user_data_version(self.user.id)
+        if isinstance(client, AsyncClient):
+            return async_to_sync(self.arequest)(client, url)
+
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response.status_code
+
+    async def arequest(self, client, url):
+        """GET a URL through the ASGI handler and return the status code."""
+        response = await client.get(url)
+        if response.streaming:
+            if response.is_async:
+                async for _ in response.streaming_content:
+                    pass
+            else:
+                # Sync streaming content may run queries, so drain it in a thread
+                await sync_to_async(list)(response.streaming_content)
+        return response.status_code
+
+    def compare(self, path, report):
+        """Print p50 latency and query count changes against a previous report."""
+        try:
+            with open(path, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise CommandError(f'Could not read baseline report "{path}": {e}')
+
+        self.stdout.write(f'\n{"route":<20} {"p50 ms (before -> after)":>30} {"queries":>14}')
+        for name, result in report['routes'].items():
+            before = baseline.get('routes', {}).get(name)
+            if before is None:
+                self.stdout.write(f'{name:<20} {"new route":>30}')
+                continue
+            latency = f'{before["latency_ms_p50"]:.2f} -> {result["latency_ms_p50"]:.2f}'
+            queries = f'{before["queries"]} -> {result["queries"]}'
+            self.stdout.write(f'{name:<20} {latency:>30} {queries:>14}')
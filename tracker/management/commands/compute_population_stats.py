@@ -0,0 +1,70 @@
+"""
+Management command to precompute cross-user intake statistics.
+Run with: python manage.py compute_population_stats [--chunk-size 500] [--workers 4]
+
+Intended to run nightly (e.g. from cron). Users are processed in shards of
+--chunk-size users, in this process or across a pool of --workers
+processes, and the results replace the PopulationStat table shown in the
+admin.
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from tracker.population import compute_shard, init_worker, merge, shard_ranges, store
+
+
+class Command(BaseCommand):
+    help = 'Computes population intake statistics by category, cohort and weekday'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Users per shard (default: 500)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=0,
+            help='Worker processes to compute shards in (default: 0, compute in this process)'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be at least 1.')
+        if options['workers'] < 0:
+            raise CommandError('--workers cannot be negative.')
+
+        self.verbosity = options['verbosity']
+        start = time.perf_counter()
+        ranges = shard_ranges(options['chunk_size'])
+        self.stdout.write(f'Computing {len(ranges)} shards...')
+
+        partials = []
+        if options['workers'] > 0:
+            # Workers must open their own connections rather than inherit ours
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=options['workers'], initializer=init_worker) as pool:
+                for i, partial in enumerate(pool.map(compute_shard, ranges), 1):
+                    partials.append(partial)
+                    self.report_progress(i, ranges)
+        else:
+            for i, user_id_range in enumerate(ranges, 1):
+                partials.append(compute_shard(user_id_range))
+                self.report_progress(i, ranges)
+
+        count = store(merge(partials))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\n[SUCCESS] Stored {count} population statistics in {elapsed:.1f}s!')
+        )
+
+    def report_progress(self, done, ranges):
+        """Print a progress line for a finished shard."""
+        if self.verbosity >= 1:
+            first_id, last_id = ranges[done - 1]
+            self.stdout.write(f'[PROGRESS] Shard {done}/{len(ranges)} (users {first_id}-{last_id})')
@@ -0,0 +1,177 @@
+"""
+Management command to bulk import historical food logs from CSV or JSONL files.
+Run with: python manage.py import_food_logs FILE [FILE ...] --user USERNAME
+
+Each row needs date (YYYY-MM-DD), food (Food name) and quantity (grams).
+A username column/key, when present, overrides --user for that row, so the
+CSV/NDJSON files produced by the history export can be imported directly.
+"""
+import csv
+import json
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tracker.catalog import get_catalog
+from tracker.fields import TWO_PLACES
+from tracker.models import DailyFoodLog, DailyCalorieSummary, UserFoodScore
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports historical food logs from CSV or JSONL files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help='CSV or JSONL files to import')
+        parser.add_argument(
+            '--user',
+            dest='username',
+            help='Username to import rows for when a row has no username'
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'jsonl'],
+            help='File format (default: detected from the file extension)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows inserted per transaction (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+
+        self.default_user_id = None
+        if options['username']:
+            try:
+                self.default_user_id = User.objects.get(username=options['username']).id
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["username"]}" does not exist.')
+
+        # One-time lookup maps so rows never query the Food or User tables
+        self.foods = {food.name.lower(): food for food in get_catalog().foods.values()}
+        self.user_ids = {}
+        # Quantities must fit the model field's digits, like in the forms
+        quantity_field = DailyFoodLog._meta.get_field('quantity')
+        self.max_quantity = Decimal(10) ** (quantity_field.max_digits - 2)
+
+        self.imported = 0
+        self.skipped = 0
+        self.touched_user_ids = set()
+        started = time.monotonic()
+
+        try:
+            batch = []
+            for path in options['files']:
+                for line_number, row in self.read_rows(path, options['format']):
+                    log = self.build_log(path, line_number, row)
+                    if log is None:
+                        self.skipped += 1
+                        continue
+                    batch.append(log)
+                    if len(batch) >= batch_size:
+                        self.flush(batch, started)
+                        batch = []
+            if batch:
+                self.flush(batch, started)
+        finally:
+            # bulk_create skips the save signals, so rebuild the affected
+            # summaries and food scores once, including for the batches
+            # committed before an import that failed part way
+            if self.touched_user_ids:
+                DailyCalorieSummary.rebuild(self.touched_user_ids)
+                UserFoodScore.rebuild(self.touched_user_ids)
+
+        elapsed = time.monotonic() - started
+        rate = self.imported / elapsed if elapsed > 0 else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n[SUCCESS] Imported {self.imported} food logs, skipped {self.skipped} '
+                f'rows in {elapsed:.1f}s ({rate:.0f} rows/sec)'
+            )
+        )
+
+    def read_rows(self, path, file_format):
+        """Yield (line_number, row dict) pairs from a CSV or JSONL file without loading it whole."""
+        if not Path(path).is_file():
+            raise CommandError(f'File "{path}" does not exist.')
+        if file_format is None:
+            file_format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+        with open(path, newline='', encoding='utf-8') as f:
+            if file_format == 'csv':
+                for line_number, row in enumerate(csv.DictReader(f), start=2):
+                    yield line_number, row
+            else:
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        row = None
+                    if not isinstance(row, dict):
+                        self.warn(path, line_number, 'invalid JSON object')
+                        self.skipped += 1
+                        continue
+                    yield line_number, row
+
+    def build_log(self, path, line_number, row):
+        """Turn a row into an unsaved DailyFoodLog, or return None if it is invalid."""
+        user_id = self.resolve_user(row.get('username'))
+        if user_id is None:
+            self.warn(path, line_number, 'unknown or missing user')
+            return None
+
+        food = self.foods.get(str(row.get('food', '')).strip().lower())
+        if food is None:
+            self.warn(path, line_number, f'unknown food "{row.get("food", "")}"')
+            return None
+
+        try:
+            date = datetime.strptime(str(row.get('date', '')).strip(), '%Y-%m-%d').date()
+            quantity = Decimal(str(row.get('quantity', '')).strip())
+            if not quantity.is_finite():
+                raise ValueError(quantity)
+            if quantity >= self.max_quantity:
+                self.warn(path, line_number, f'quantity must be below {self.max_quantity}')
+                return None
+            if quantity.quantize(TWO_PLACES) <= 0:
+                self.warn(path, line_number, 'quantity must be positive')
+                return None
+            log = DailyFoodLog(user_id=user_id, food_id=food.id, quantity=quantity, date=date)
+            log.set_nutrients()
+        except (ValueError, ArithmeticError):
+            # ArithmeticError covers decimal.InvalidOperation and overflows
+            self.warn(path, line_number, 'invalid date or quantity')
+            return None
+        return log
+
+    def resolve_user(self, username):
+        """Map a username to a user id, caching lookups for the whole import."""
+        if not username:
+            return self.default_user_id
+        if username not in self.user_ids:
+            self.user_ids[username] = User.objects.filter(username=username).values_list('id', flat=True).first()
+        return self.user_ids[username]
+
+    def flush(self, batch, started):
+        """Insert one batch in its own transaction and report progress."""
+        with transaction.atomic():
+            DailyFoodLog.objects.bulk_create(batch)
+        self.imported += len(batch)
+        self.touched_user_ids.update(log.user_id for log in batch)
+
+        elapsed = time.monotonic() - started
+        rate = self.imported / elapsed if elapsed > 0 else 0
+        self.stdout.write(f'[PROGRESS] {self.imported} rows imported ({rate:.0f} rows/sec)')
+
+    def warn(self, path, line_number, reason):
+        self.stdout.write(self.style.WARNING(f'[SKIPPED] {path}:{line_number}: {reason}'))
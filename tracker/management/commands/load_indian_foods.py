@@ -1,122 +1,239 @@
 """
 Management command to preload Indian foods into the database.
-Run with: python manage.py load_indian_foods
+Run with: python manage.py load_indian_foods [FILE ...]
+
+Without files the built-in Indian foods list is loaded. Dataset files may be
+CSV (header: name,category,calories_per_100g and optionally protein_per_100g,
+carbs_per_100g,fat_per_100g,fibre_per_100g), a JSON array of objects, or
+JSON lines with the same keys. Missing macronutrients are stored as 0.
 """
-from django.core.management.base import BaseCommand
-from tracker.models import Food
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from tracker.catalog import bump_catalog_version
+from tracker.models import Food, MACRONUTRIENTS
+from tracker.recipes import recipes_using_foods, schedule_recipe_refresh
+
+
+# Food fields written by the loader besides the name
+FOOD_VALUE_FIELDS = ['category', 'calories_per_100g'] + [f'{name}_per_100g' for name in MACRONUTRIENTS]
 
 
 class Command(BaseCommand):
-    help = 'Loads Indian foods into the database'
+    help = 'Loads Indian foods (or external food dataset files) into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            help='Optional CSV, JSON or JSONL dataset files to load instead of the built-in list'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Foods upserted per statement (default: 2000)'
+        )
 
     def handle(self, *args, **options):
         """
-        Preload Indian foods with their categories and calorie information.
+        Deduplicate the dataset by name and upsert it with bulk_create.
+        Foods whose category and nutrients are unchanged are skipped, so a
+        refresh only writes (and bumps updated_at on) rows that changed.
+        """
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be at least 1.')
+        
+        foods_data = self.read_files(options['files']) if options['files'] else self.default_foods()
+        foods, skipped_count = self.deduplicate(foods_data)
+        
+        existing = {}
+        existing_ids = {}
+        for food_id, name, *values in Food.objects.values_list('id', 'name', *FOOD_VALUE_FIELDS):
+            existing[name] = values
+            existing_ids[name] = food_id
+        changed = [
+            food for food in foods.values()
+            if existing.get(food.name) != [getattr(food, field) for field in FOOD_VALUE_FIELDS]
+        ]
+        created_count = sum(1 for food in changed if food.name not in existing)
+        updated_count = len(changed) - created_count
+        
+        with transaction.atomic():
+            for start in range(0, len(changed), batch_size):
+                Food.objects.bulk_create(
+                    changed[start:start + batch_size],
+                    update_conflicts=True,
+                    unique_fields=['name'],
+                    update_fields=FOOD_VALUE_FIELDS + ['updated_at']
+                )
+            # bulk_create skips the Food signals, so recalculate recipes using
+            # the updated foods (or backed by them) once committed
+            schedule_recipe_refresh(recipes_using_foods(
+                existing_ids[food.name] for food in changed if food.name in existing_ids
+            ))
+        
+        # bulk_create skips the Food signals, so invalidate cached catalogs once
+        if changed:
+            bump_catalog_version()
+        
+        if options['verbosity'] >= 2:
+            for food in changed:
+                if food.name in existing:
+                    self.stdout.write(
+                        self.style.WARNING(f'[UPDATED] Updated: {food.name} ({food.get_category_display()})')
+                    )
+                else:
+                    self.stdout.write(
+                        self.style.SUCCESS(f'[OK] Created: {food.name} ({food.get_category_display()})')
+                    )
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n[SUCCESS] Successfully loaded {created_count} new foods and updated {updated_count} existing foods! '
+                f'({len(foods) - len(changed)} unchanged, {skipped_count} invalid rows skipped)'
+            )
+        )
+
+    def read_files(self, paths):
+        """Yield food dicts from CSV, JSON array or JSON lines files."""
+        for path in paths:
+            if not Path(path).is_file():
+                raise CommandError(f'File "{path}" does not exist.')
+            
+            with open(path, newline='', encoding='utf-8') as f:
+                if path.lower().endswith('.csv'):
+                    yield from csv.DictReader(f)
+                elif path.lower().endswith('.json'):
+                    try:
+                        rows = json.load(f)
+                    except json.JSONDecodeError as e:
+                        raise CommandError(f'Invalid JSON in "{path}": {e}')
+                    if not isinstance(rows, list):
+                        raise CommandError(f'"{path}" must contain a JSON array of foods.')
+                    yield from rows
+                else:
+                    for line in f:
+                        if line.strip():
+                            try:
+                                yield json.loads(line)
+                            except json.JSONDecodeError:
+                                yield None
+
+    def deduplicate(self, foods_data):
+        """
+        Validate rows and deduplicate them by name (last occurrence wins).
+        Returns ({name: unsaved Food}, number of invalid rows).
+        """
+        categories = dict(Food.CATEGORY_CHOICES)
+        max_name_length = Food._meta.get_field('name').max_length
+        foods = {}
+        skipped_count = 0
+        
+        for food_data in foods_data:
+            try:
+                name = str(food_data['name']).strip()
+                category = str(food_data['category']).strip()
+                calories = Decimal(str(food_data['calories_per_100g']).strip()).quantize(Decimal('0.01'))
+                macros = {
+                    f'{macro}_per_100g': Decimal(str(food_data.get(f'{macro}_per_100g') or 0).strip()).quantize(Decimal('0.01'))
+                    for macro in MACRONUTRIENTS
+                }
+            except (TypeError, KeyError, AttributeError, InvalidOperation):
+                skipped_count += 1
+                continue
+            
+            if not name or len(name) > max_name_length or category not in categories or not 0 <= calories < 10000:
+                skipped_count += 1
+                continue
+            if not all(0 <= value < 1000 for value in macros.values()):
+                skipped_count += 1
+                continue
+            
+            foods[name] = Food(name=name, category=category, calories_per_100g=calories, **macros)
+        
+        return foods, skipped_count
+
+    def default_foods(self):
+        """
+        Built-in Indian foods with their categories and calorie information.
         Calorie values are approximate per 100g.
         """
-        foods_data = [
+        return [
             # Dal/Lentils
-            {'name': 'Toor Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 100},
-            {'name': 'Moong Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 105},
-            {'name': 'Masoor Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 100},
-            {'name': 'Chana Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 120},
-            {'name': 'Urad Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 110},
-            {'name': 'Rajma (Kidney Beans)', 'category': 'dal', 'calories_per_100g': 127},
+            {'name': 'Toor Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 100, 'protein_per_100g': 6.8, 'carbs_per_100g': 17, 'fat_per_100g': 0.4, 'fibre_per_100g': 5},
+            {'name': 'Moong Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 105, 'protein_per_100g': 7, 'carbs_per_100g': 19, 'fat_per_100g': 0.4, 'fibre_per_100g': 7.6},
+            {'name': 'Masoor Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 100, 'protein_per_100g': 7.6, 'carbs_per_100g': 17, 'fat_per_100g': 0.4, 'fibre_per_100g': 7.9},
+            {'name': 'Chana Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 120, 'protein_per_100g': 8.5, 'carbs_per_100g': 20, 'fat_per_100g': 0.9, 'fibre_per_100g': 7},
+            {'name': 'Urad Dal (Cooked)', 'category': 'dal', 'calories_per_100g': 110, 'protein_per_100g': 7.5, 'carbs_per_100g': 18, 'fat_per_100g': 0.6, 'fibre_per_100g': 6},
+            {'name': 'Rajma (Kidney Beans)', 'category': 'dal', 'calories_per_100g': 127, 'protein_per_100g': 8.7, 'carbs_per_100g': 22.8, 'fat_per_100g': 0.5, 'fibre_per_100g': 6.4},
             
             # Rice
-            {'name': 'White Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 130},
-            {'name': 'Brown Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 111},
-            {'name': 'Basmati Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 130},
-            {'name': 'Jeera Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 140},
-            {'name': 'Biryani Rice', 'category': 'rice', 'calories_per_100g': 180},
+            {'name': 'White Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 130, 'protein_per_100g': 2.7, 'carbs_per_100g': 28.2, 'fat_per_100g': 0.3, 'fibre_per_100g': 0.4},
+            {'name': 'Brown Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 111, 'protein_per_100g': 2.6, 'carbs_per_100g': 23, 'fat_per_100g': 0.9, 'fibre_per_100g': 1.8},
+            {'name': 'Basmati Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 130, 'protein_per_100g': 3.5, 'carbs_per_100g': 28, 'fat_per_100g': 0.4, 'fibre_per_100g': 0.4},
+            {'name': 'Jeera Rice (Cooked)', 'category': 'rice', 'calories_per_100g': 140, 'protein_per_100g': 2.8, 'carbs_per_100g': 27, 'fat_per_100g': 2.5, 'fibre_per_100g': 0.6},
+            {'name': 'Biryani Rice', 'category': 'rice', 'calories_per_100g': 180, 'protein_per_100g': 6, 'carbs_per_100g': 25, 'fat_per_100g': 6, 'fibre_per_100g': 1},
             
             # Roti/Chapati
-            {'name': 'Roti/Chapati (Wheat)', 'category': 'roti', 'calories_per_100g': 297},
-            {'name': 'Phulka', 'category': 'roti', 'calories_per_100g': 280},
-            {'name': 'Naan', 'category': 'roti', 'calories_per_100g': 310},
-            {'name': 'Paratha', 'category': 'roti', 'calories_per_100g': 326},
-            {'name': 'Bhatura', 'category': 'roti', 'calories_per_100g': 350},
+            {'name': 'Roti/Chapati (Wheat)', 'category': 'roti', 'calories_per_100g': 297, 'protein_per_100g': 9.8, 'carbs_per_100g': 46, 'fat_per_100g': 7.5, 'fibre_per_100g': 4.9},
+            {'name': 'Phulka', 'category': 'roti', 'calories_per_100g': 280, 'protein_per_100g': 9.5, 'carbs_per_100g': 50, 'fat_per_100g': 1.5, 'fibre_per_100g': 5},
+            {'name': 'Naan', 'category': 'roti', 'calories_per_100g': 310, 'protein_per_100g': 9, 'carbs_per_100g': 50, 'fat_per_100g': 6.5, 'fibre_per_100g': 2.2},
+            {'name': 'Paratha', 'category': 'roti', 'calories_per_100g': 326, 'protein_per_100g': 7, 'carbs_per_100g': 45, 'fat_per_100g': 13, 'fibre_per_100g': 4},
+            {'name': 'Bhatura', 'category': 'roti', 'calories_per_100g': 350, 'protein_per_100g': 7, 'carbs_per_100g': 45, 'fat_per_100g': 16, 'fibre_per_100g': 2},
             
             # Vegetables/Sabzi
-            {'name': 'Aloo Sabzi (Potato)', 'category': 'vegetables', 'calories_per_100g': 150},
-            {'name': 'Bhindi Sabzi (Okra)', 'category': 'vegetables', 'calories_per_100g': 80},
-            {'name': 'Baingan Bharta (Eggplant)', 'category': 'vegetables', 'calories_per_100g': 90},
-            {'name': 'Gobi Sabzi (Cauliflower)', 'category': 'vegetables', 'calories_per_100g': 60},
-            {'name': 'Mix Vegetable Sabzi', 'category': 'vegetables', 'calories_per_100g': 70},
-            {'name': 'Paneer Sabzi', 'category': 'vegetables', 'calories_per_100g': 200},
-            {'name': 'Dal Makhani', 'category': 'vegetables', 'calories_per_100g': 180},
-            {'name': 'Chana Masala', 'category': 'vegetables', 'calories_per_100g': 140},
-            {'name': 'Palak Paneer', 'category': 'vegetables', 'calories_per_100g': 190},
-            {'name': 'Matar Paneer', 'category': 'vegetables', 'calories_per_100g': 180},
+            {'name': 'Aloo Sabzi (Potato)', 'category': 'vegetables', 'calories_per_100g': 150, 'protein_per_100g': 2.2, 'carbs_per_100g': 20, 'fat_per_100g': 7, 'fibre_per_100g': 2.4},
+            {'name': 'Bhindi Sabzi (Okra)', 'category': 'vegetables', 'calories_per_100g': 80, 'protein_per_100g': 2, 'carbs_per_100g': 8, 'fat_per_100g': 4.5, 'fibre_per_100g': 3.2},
+            {'name': 'Baingan Bharta (Eggplant)', 'category': 'vegetables', 'calories_per_100g': 90, 'protein_per_100g': 1.8, 'carbs_per_100g': 9, 'fat_per_100g': 5, 'fibre_per_100g': 3},
+            {'name': 'Gobi Sabzi (Cauliflower)', 'category': 'vegetables', 'calories_per_100g': 60, 'protein_per_100g': 2.2, 'carbs_per_100g': 6, 'fat_per_100g': 3.5, 'fibre_per_100g': 2.3},
+            {'name': 'Mix Vegetable Sabzi', 'category': 'vegetables', 'calories_per_100g': 70, 'protein_per_100g': 2.3, 'carbs_per_100g': 8, 'fat_per_100g': 3.5, 'fibre_per_100g': 2.8},
+            {'name': 'Paneer Sabzi', 'category': 'vegetables', 'calories_per_100g': 200, 'protein_per_100g': 9, 'carbs_per_100g': 7, 'fat_per_100g': 15, 'fibre_per_100g': 1.2},
+            {'name': 'Dal Makhani', 'category': 'vegetables', 'calories_per_100g': 180, 'protein_per_100g': 6, 'carbs_per_100g': 16, 'fat_per_100g': 9, 'fibre_per_100g': 4.5},
+            {'name': 'Chana Masala', 'category': 'vegetables', 'calories_per_100g': 140, 'protein_per_100g': 6.5, 'carbs_per_100g': 18, 'fat_per_100g': 4.5, 'fibre_per_100g': 5},
+            {'name': 'Palak Paneer', 'category': 'vegetables', 'calories_per_100g': 190, 'protein_per_100g': 8, 'carbs_per_100g': 6, 'fat_per_100g': 14, 'fibre_per_100g': 2},
+            {'name': 'Matar Paneer', 'category': 'vegetables', 'calories_per_100g': 180, 'protein_per_100g': 8, 'carbs_per_100g': 9, 'fat_per_100g': 12, 'fibre_per_100g': 2.5},
             
             # Fruits
-            {'name': 'Banana', 'category': 'fruits', 'calories_per_100g': 89},
-            {'name': 'Apple', 'category': 'fruits', 'calories_per_100g': 52},
-            {'name': 'Mango', 'category': 'fruits', 'calories_per_100g': 60},
-            {'name': 'Orange', 'category': 'fruits', 'calories_per_100g': 47},
-            {'name': 'Guava', 'category': 'fruits', 'calories_per_100g': 68},
-            {'name': 'Papaya', 'category': 'fruits', 'calories_per_100g': 43},
-            {'name': 'Watermelon', 'category': 'fruits', 'calories_per_100g': 30},
-            {'name': 'Pomegranate', 'category': 'fruits', 'calories_per_100g': 83},
+            {'name': 'Banana', 'category': 'fruits', 'calories_per_100g': 89, 'protein_per_100g': 1.1, 'carbs_per_100g': 22.8, 'fat_per_100g': 0.3, 'fibre_per_100g': 2.6},
+            {'name': 'Apple', 'category': 'fruits', 'calories_per_100g': 52, 'protein_per_100g': 0.3, 'carbs_per_100g': 13.8, 'fat_per_100g': 0.2, 'fibre_per_100g': 2.4},
+            {'name': 'Mango', 'category': 'fruits', 'calories_per_100g': 60, 'protein_per_100g': 0.8, 'carbs_per_100g': 15, 'fat_per_100g': 0.4, 'fibre_per_100g': 1.6},
+            {'name': 'Orange', 'category': 'fruits', 'calories_per_100g': 47, 'protein_per_100g': 0.9, 'carbs_per_100g': 11.8, 'fat_per_100g': 0.1, 'fibre_per_100g': 2.4},
+            {'name': 'Guava', 'category': 'fruits', 'calories_per_100g': 68, 'protein_per_100g': 2.6, 'carbs_per_100g': 14.3, 'fat_per_100g': 1, 'fibre_per_100g': 5.4},
+            {'name': 'Papaya', 'category': 'fruits', 'calories_per_100g': 43, 'protein_per_100g': 0.5, 'carbs_per_100g': 10.8, 'fat_per_100g': 0.3, 'fibre_per_100g': 1.7},
+            {'name': 'Watermelon', 'category': 'fruits', 'calories_per_100g': 30, 'protein_per_100g': 0.6, 'carbs_per_100g': 7.6, 'fat_per_100g': 0.2, 'fibre_per_100g': 0.4},
+            {'name': 'Pomegranate', 'category': 'fruits', 'calories_per_100g': 83, 'protein_per_100g': 1.7, 'carbs_per_100g': 18.7, 'fat_per_100g': 1.2, 'fibre_per_100g': 4},
             
             # Dairy Products
-            {'name': 'Milk (Full Cream)', 'category': 'dairy', 'calories_per_100g': 61},
-            {'name': 'Milk (Skimmed)', 'category': 'dairy', 'calories_per_100g': 34},
-            {'name': 'Curd/Yogurt', 'category': 'dairy', 'calories_per_100g': 59},
-            {'name': 'Paneer (Cottage Cheese)', 'category': 'dairy', 'calories_per_100g': 265},
-            {'name': 'Ghee', 'category': 'dairy', 'calories_per_100g': 900},
-            {'name': 'Butter', 'category': 'dairy', 'calories_per_100g': 717},
-            {'name': 'Cheese', 'category': 'dairy', 'calories_per_100g': 402},
+            {'name': 'Milk (Full Cream)', 'category': 'dairy', 'calories_per_100g': 61, 'protein_per_100g': 3.2, 'carbs_per_100g': 4.8, 'fat_per_100g': 3.3, 'fibre_per_100g': 0},
+            {'name': 'Milk (Skimmed)', 'category': 'dairy', 'calories_per_100g': 34, 'protein_per_100g': 3.4, 'carbs_per_100g': 5, 'fat_per_100g': 0.1, 'fibre_per_100g': 0},
+            {'name': 'Curd/Yogurt', 'category': 'dairy', 'calories_per_100g': 59, 'protein_per_100g': 3.5, 'carbs_per_100g': 4.7, 'fat_per_100g': 3.3, 'fibre_per_100g': 0},
+            {'name': 'Paneer (Cottage Cheese)', 'category': 'dairy', 'calories_per_100g': 265, 'protein_per_100g': 18.3, 'carbs_per_100g': 1.2, 'fat_per_100g': 20.8, 'fibre_per_100g': 0},
+            {'name': 'Ghee', 'category': 'dairy', 'calories_per_100g': 900, 'protein_per_100g': 0, 'carbs_per_100g': 0, 'fat_per_100g': 99.8, 'fibre_per_100g': 0},
+            {'name': 'Butter', 'category': 'dairy', 'calories_per_100g': 717, 'protein_per_100g': 0.9, 'carbs_per_100g': 0.1, 'fat_per_100g': 81, 'fibre_per_100g': 0},
+            {'name': 'Cheese', 'category': 'dairy', 'calories_per_100g': 402, 'protein_per_100g': 25, 'carbs_per_100g': 1.3, 'fat_per_100g': 33, 'fibre_per_100g': 0},
             
             # Snacks
-            {'name': 'Samosa', 'category': 'snacks', 'calories_per_100g': 262},
-            {'name': 'Pakora', 'category': 'snacks', 'calories_per_100g': 200},
-            {'name': 'Dhokla', 'category': 'snacks', 'calories_per_100g': 160},
-            {'name': 'Vada Pav', 'category': 'snacks', 'calories_per_100g': 280},
-            {'name': 'Pav Bhaji', 'category': 'snacks', 'calories_per_100g': 180},
-            {'name': 'Dosa', 'category': 'snacks', 'calories_per_100g': 130},
-            {'name': 'Idli', 'category': 'snacks', 'calories_per_100g': 39},
-            {'name': 'Upma', 'category': 'snacks', 'calories_per_100g': 120},
+            {'name': 'Samosa', 'category': 'snacks', 'calories_per_100g': 262, 'protein_per_100g': 4.5, 'carbs_per_100g': 30, 'fat_per_100g': 14, 'fibre_per_100g': 2.5},
+            {'name': 'Pakora', 'category': 'snacks', 'calories_per_100g': 200, 'protein_per_100g': 6, 'carbs_per_100g': 22, 'fat_per_100g': 11, 'fibre_per_100g': 3},
+            {'name': 'Dhokla', 'category': 'snacks', 'calories_per_100g': 160, 'protein_per_100g': 6.5, 'carbs_per_100g': 25, 'fat_per_100g': 3.5, 'fibre_per_100g': 2},
+            {'name': 'Vada Pav', 'category': 'snacks', 'calories_per_100g': 280, 'protein_per_100g': 6, 'carbs_per_100g': 38, 'fat_per_100g': 11, 'fibre_per_100g': 3},
+            {'name': 'Pav Bhaji', 'category': 'snacks', 'calories_per_100g': 180, 'protein_per_100g': 4.5, 'carbs_per_100g': 24, 'fat_per_100g': 7.5, 'fibre_per_100g': 3},
+            {'name': 'Dosa', 'category': 'snacks', 'calories_per_100g': 130, 'protein_per_100g': 3.9, 'carbs_per_100g': 22, 'fat_per_100g': 3.3, 'fibre_per_100g': 1},
+            {'name': 'Idli', 'category': 'snacks', 'calories_per_100g': 39, 'protein_per_100g': 2, 'carbs_per_100g': 8, 'fat_per_100g': 0.2, 'fibre_per_100g': 0.8},
+            {'name': 'Upma', 'category': 'snacks', 'calories_per_100g': 120, 'protein_per_100g': 3.5, 'carbs_per_100g': 19, 'fat_per_100g': 3.5, 'fibre_per_100g': 1.5},
             
             # Beverages
-            {'name': 'Chai (Tea)', 'category': 'beverages', 'calories_per_100g': 30},
-            {'name': 'Coffee', 'category': 'beverages', 'calories_per_100g': 2},
-            {'name': 'Lassi (Sweet)', 'category': 'beverages', 'calories_per_100g': 90},
-            {'name': 'Lassi (Salted)', 'category': 'beverages', 'calories_per_100g': 50},
-            {'name': 'Buttermilk (Chaas)', 'category': 'beverages', 'calories_per_100g': 25},
-            {'name': 'Fresh Juice (Orange)', 'category': 'beverages', 'calories_per_100g': 45},
-            {'name': 'Fresh Juice (Mango)', 'category': 'beverages', 'calories_per_100g': 60},
+            {'name': 'Chai (Tea)', 'category': 'beverages', 'calories_per_100g': 30, 'protein_per_100g': 1, 'carbs_per_100g': 4.5, 'fat_per_100g': 1, 'fibre_per_100g': 0},
+            {'name': 'Coffee', 'category': 'beverages', 'calories_per_100g': 2, 'protein_per_100g': 0.1, 'carbs_per_100g': 0, 'fat_per_100g': 0, 'fibre_per_100g': 0},
+            {'name': 'Lassi (Sweet)', 'category': 'beverages', 'calories_per_100g': 90, 'protein_per_100g': 3, 'carbs_per_100g': 14, 'fat_per_100g': 2.5, 'fibre_per_100g': 0},
+            {'name': 'Lassi (Salted)', 'category': 'beverages', 'calories_per_100g': 50, 'protein_per_100g': 3, 'carbs_per_100g': 4.5, 'fat_per_100g': 2.5, 'fibre_per_100g': 0},
+            {'name': 'Buttermilk (Chaas)', 'category': 'beverages', 'calories_per_100g': 25, 'protein_per_100g': 1.5, 'carbs_per_100g': 2.5, 'fat_per_100g': 1, 'fibre_per_100g': 0},
+            {'name': 'Fresh Juice (Orange)', 'category': 'beverages', 'calories_per_100g': 45, 'protein_per_100g': 0.7, 'carbs_per_100g': 10.4, 'fat_per_100g': 0.2, 'fibre_per_100g': 0.2},
+            {'name': 'Fresh Juice (Mango)', 'category': 'beverages', 'calories_per_100g': 60, 'protein_per_100g': 0.4, 'carbs_per_100g': 14, 'fat_per_100g': 0.2, 'fibre_per_100g': 0.5},
         ]
-        
-        created_count = 0
-        updated_count = 0
-        
-        for food_data in foods_data:
-            food, created = Food.objects.get_or_create(
-                name=food_data['name'],
-                defaults={
-                    'category': food_data['category'],
-                    'calories_per_100g': food_data['calories_per_100g']
-                }
-            )
-            
-            if created:
-                created_count += 1
-                self.stdout.write(
-                    self.style.SUCCESS(f'[OK] Created: {food.name} ({food.get_category_display()})')
-                )
-            else:
-                # Update if exists
-                food.category = food_data['category']
-                food.calories_per_100g = food_data['calories_per_100g']
-                food.save()
-                updated_count += 1
-                self.stdout.write(
-                    self.style.WARNING(f'[UPDATED] Updated: {food.name} ({food.get_category_display()})')
-                )
-        
-        self.stdout.write(
-            self.style.SUCCESS(
-                f'\n[SUCCESS] Successfully loaded {created_count} new foods and updated {updated_count} existing foods!'
-            )
-        )
@@ -0,0 +1,34 @@
+"""
+Management command to rebuild the per-user daily calorie summaries and food scores.
+Run with: python manage.py rebuild_daily_summaries [--user USERNAME ...]
+"""
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from tracker.models import DailyCalorieSummary, UserFoodScore
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily calorie summary and food score tables from the food logs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Only rebuild summaries for this username (can be repeated)'
+        )
+
+    def handle(self, *args, **options):
+        user_ids = None
+        usernames = options['usernames']
+        if usernames:
+            user_ids = list(User.objects.filter(username__in=usernames).values_list('id', flat=True))
+            if len(user_ids) != len(set(usernames)):
+                raise CommandError('One or more usernames do not exist.')
+        
+        count = DailyCalorieSummary.rebuild(user_ids)
+        score_count = UserFoodScore.rebuild(user_ids)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'[SUCCESS] Rebuilt {count} daily summaries and {score_count} food scores!')
+        )
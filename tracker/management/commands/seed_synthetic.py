@@ -0,0 +1,137 @@
+"""
+Management command to generate synthetic users and food logs for benchmarking.
+Run with: python manage.py seed_synthetic --users 10 --days 365 [--seed 42]
+
+Users are named <prefix>0001, <prefix>0002, ... and share the password
+"synthetic". Output is deterministic for a given seed and food catalog.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from tracker.models import UserProfile, Food, DailyFoodLog, DailyCalorieSummary, UserFoodScore
+
+
+# (categories to pick from, min grams, max grams, probability the meal is logged)
+MEALS = [
+    (['dairy', 'beverages', 'snacks', 'fruits'], 100, 250, 0.9),   # Breakfast
+    (['roti', 'rice', 'dal', 'vegetables'], 80, 250, 0.95),         # Lunch
+    (['roti', 'rice', 'dal', 'vegetables', 'dairy'], 80, 250, 0.95),
+    (['snacks', 'beverages', 'fruits'], 50, 200, 0.6),              # Evening snack
+    (['roti', 'rice', 'dal', 'vegetables'], 80, 250, 0.9),          # Dinner
+    (['roti', 'dal', 'vegetables', 'dairy'], 80, 200, 0.8),
+]
+
+
+class Command(BaseCommand):
+    help = 'Generates synthetic users with realistic food logs for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Number of users (default: 10)')
+        parser.add_argument('--days', type=int, default=365, help='Days of history per user (default: 365)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default: 42)')
+        parser.add_argument('--prefix', default='synthetic_', help='Username prefix (default: synthetic_)')
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete existing users with the prefix before generating'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Food logs inserted per statement (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        foods_by_category = {}
+        for food in Food.objects.order_by('id'):
+            foods_by_category.setdefault(food.category, []).append(food)
+        if not foods_by_category:
+            raise CommandError('No foods in the database. Run load_indian_foods first.')
+
+        prefix = options['prefix']
+        existing = User.objects.filter(username__startswith=prefix)
+        if options['clear']:
+            deleted = existing.count()
+            with transaction.atomic():
+                # Delete the logs in one statement rather than through the ORM,
+                # which would send a delete signal (and refresh a summary) per
+                # row; the users' summaries and scores go with the users
+                user_ids_sql, params = existing.values('id').query.sql_with_params()
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'DELETE FROM {DailyFoodLog._meta.db_table} WHERE user_id IN ({user_ids_sql})', params
+                    )
+                existing.delete()
+            self.stdout.write(self.style.WARNING(f'[DELETED] Removed {deleted} existing synthetic users'))
+        elif existing.exists():
+            raise CommandError(f'Users with prefix "{prefix}" already exist. Use --clear to replace them.')
+
+        meals = [
+            ([food for category in categories for food in foods_by_category.get(category, [])], min_grams, max_grams, probability)
+            for categories, min_grams, max_grams, probability in MEALS
+        ]
+        rng = random.Random(options['seed'])
+        today = timezone.now().date()
+        password = make_password('synthetic')
+
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(username=f'{prefix}{i:04d}', password=password)
+                for i in range(1, options['users'] + 1)
+            ])
+            # bulk_create may not return ids on every backend, so reload them
+            users = list(User.objects.filter(username__startswith=prefix).order_by('username'))
+            UserProfile.objects.bulk_create([self.build_profile(rng, user) for user in users])
+
+            log_count = 0
+            batch = []
+            for user in users:
+                for day in range(options['days']):
+                    date = today - timedelta(days=day)
+                    for choices, min_grams, max_grams, probability in meals:
+                        if rng.random() > probability or not choices:
+                            continue
+                        log = DailyFoodLog(
+                            user=user,
+                            food=rng.choice(choices),
+                            quantity=rng.randrange(min_grams, max_grams + 1, 10),
+                            date=date
+                        )
+                        log.set_nutrients()
+                        batch.append(log)
+                    if len(batch) >= options['batch_size']:
+                        DailyFoodLog.objects.bulk_create(batch)
+                        log_count += len(batch)
+                        batch = []
+            if batch:
+                DailyFoodLog.objects.bulk_create(batch)
+                log_count += len(batch)
+
+            DailyCalorieSummary.rebuild([user.id for user in users])
+            UserFoodScore.rebuild([user.id for user in users])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n[SUCCESS] Created {len(users)} users with {log_count} food logs over {options["days"]} days!'
+            )
+        )
+
+    def build_profile(self, rng, user):
+        """Random but plausible profile; bulk_create skips save(), so set the target here."""
+        gender = rng.choice(['male', 'female'])
+        profile = UserProfile(
+            user=user,
+            age=rng.randint(18, 70),
+            gender=gender,
+            height=rng.randint(165, 190) if gender == 'male' else rng.randint(150, 175),
+            weight=rng.randint(55, 100),
+            activity_level=rng.choice([level for level, _ in UserProfile.ACTIVITY_LEVELS]),
+        )
+        profile.daily_calorie_target = profile.calculate_daily_calorie_needs()
+        return profile
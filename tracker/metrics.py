@@ -0,0 +1,87 @@
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+Histograms are kept per worker process; each worker's /metrics endpoint
+reports only the requests it served.
+"""
+import threading
+
+
+# Bucket upper bounds in seconds for duration histograms
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bucket upper bounds for SQL query counts per request
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """
+    Cumulative histogram labelled by view name.
+    """
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        """Record one observation for a view."""
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def render(self):
+        """Return the histogram as Prometheus text format lines."""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            for view, series in sorted(self._series.items()):
+                label = view.replace('\\', '\\\\').replace('"', '\\"')
+                for bound, count in zip(self.buckets, series['buckets']):
+                    lines.append(f'{self.name}_bucket{{view="{label}",le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{view="{label}",le="+Inf"}} {series["count"]}')
+                lines.append(f'{self.name}_sum{{view="{label}"}} {series["sum"]}')
+                lines.append(f'{self.name}_count{{view="{label}"}} {series["count"]}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'tracker_request_duration_seconds', 'Total time spent handling the request.', DURATION_BUCKETS
+)
+DB_DURATION = Histogram(
+    'tracker_db_duration_seconds', 'Time spent executing SQL queries per request.', DURATION_BUCKETS
+)
+RENDER_DURATION = Histogram(
+    'tracker_render_duration_seconds', 'Time spent rendering templates per request.', DURATION_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'tracker_db_queries', 'Number of SQL queries per request.', QUERY_COUNT_BUCKETS
+)
+
+HISTOGRAMS = [REQUEST_DURATION, DB_DURATION, RENDER_DURATION, DB_QUERIES]
+
+
+def record_request(view, total, db_time, render_time, query_count):
+    """Record the timings of one handled request."""
+    REQUEST_DURATION.observe(view, total)
+    DB_DURATION.observe(view, db_time)
+    RENDER_DURATION.observe(view, render_time)
+    DB_QUERIES.observe(view, query_count)
+
+
+def render_metrics():
+    """Return all metrics in the Prometheus text exposition format."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,66 @@
+"""
+Request performance instrumentation.
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .instrumentation import QueryTimer, RenderTimer
+from .metrics import record_request
+
+
+class PerformanceMiddleware:
+    """
+    Measure SQL query count, SQL time, template render time and total time
+    for every request, add them as a Server-Timing header and record them in
+    the per-view histograms served by the metrics endpoint.
+
+    Disabled (and removed from the middleware chain entirely) unless
+    settings.TRACKER_PERFORMANCE_METRICS is True. Runs natively under both
+    WSGI and ASGI, so async views are not forced through a thread; queries
+    they run in sync_to_async worker threads are still counted, since the
+    timers follow the request's context into those threads.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'TRACKER_PERFORMANCE_METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        query_timer = QueryTimer()
+        start = time.perf_counter()
+        with query_timer, RenderTimer() as render_timer:
+            response = self.get_response(request)
+        return self.finish(request, response, query_timer, render_timer, start)
+
+    async def __acall__(self, request):
+        query_timer = QueryTimer()
+        start = time.perf_counter()
+        with query_timer, RenderTimer() as render_timer:
+            response = await self.get_response(request)
+        return self.finish(request, response, query_timer, render_timer, start)
+
+    def finish(self, request, response, query_timer, render_timer, start):
+        """Add the Server-Timing header and record the request's metrics."""
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={query_timer.duration * 1000:.2f};desc="{query_timer.count} queries"',
+            f'render;dur={render_timer.duration * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ])
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        record_request(view, total, query_timer.duration, render_timer.duration, query_timer.count)
+        return response
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_daily_summaries(apps, schema_editor):
+    DailyFoodLog = apps.get_model('tracker', 'DailyFoodLog')
+    DailyCalorieSummary = apps.get_model('tracker', 'DailyCalorieSummary')
+    rows = DailyFoodLog.objects.order_by().values('user_id', 'date').annotate(
+        total_calories=models.Sum('calories'),
+        entry_count=models.Count('id')
+    )
+    DailyCalorieSummary.objects.bulk_create(
+        (DailyCalorieSummary(**row) for row in rows.iterator()),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyCalorieSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('total_calories', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Daily Calorie Summary',
+                'verbose_name_plural': 'Daily Calorie Summaries',
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_daily_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:48
+
+from django.db import migrations, models
+
+
+def merge_duplicate_foods(apps, schema_editor):
+    """Point logs at the oldest Food of each duplicated name and drop the rest."""
+    Food = apps.get_model('tracker', 'Food')
+    DailyFoodLog = apps.get_model('tracker', 'DailyFoodLog')
+    duplicated = Food.objects.values('name').annotate(
+        count=models.Count('id'),
+        keep_id=models.Min('id')
+    ).filter(count__gt=1)
+    for row in duplicated:
+        duplicate_ids = Food.objects.filter(name=row['name']).exclude(id=row['keep_id']).values_list('id', flat=True)
+        DailyFoodLog.objects.filter(food_id__in=list(duplicate_ids)).update(food_id=row['keep_id'])
+        Food.objects.filter(id__in=list(duplicate_ids)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0002_daily_calorie_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_foods, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='food',
+            name='name',
+            field=models.CharField(max_length=200, unique=True),
+        ),
+    ]
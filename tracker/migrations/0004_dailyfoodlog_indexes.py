@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_food_name_unique'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='dailyfoodlog',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='dailyfoodlog',
+            index=models.Index(fields=['user', 'date', 'calories'], name='tracker_log_user_date_cal_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyfoodlog',
+            index=models.Index(fields=['user', '-created_at'], name='tracker_log_user_created_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_dailyfoodlog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyfoodlog',
+            index=models.Index(fields=['user', '-date', '-created_at', '-id'], name='tracker_log_user_keyset_idx'),
+        ),
+    ]
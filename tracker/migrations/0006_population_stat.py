@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0005_dailyfoodlog_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopulationStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('overall', 'All Users'), ('category', 'Food Category'), ('cohort', 'Activity Level / Gender'), ('weekday', 'Weekday')], max_length=20)),
+                ('key', models.CharField(help_text="Group within the dimension, e.g. 'Snacks' or 'moderate / male'", max_length=50)),
+                ('sort_order', models.PositiveSmallIntegerField(default=0)),
+                ('user_count', models.PositiveIntegerField(default=0)),
+                ('logged_days', models.PositiveIntegerField(default=0, help_text='User-days the average is taken over')),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('total_calories', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('average_daily_calories', models.DecimalField(decimal_places=2, default=0, max_digits=9)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Population Statistic',
+                'verbose_name_plural': 'Population Statistics',
+                'ordering': ['dimension', 'sort_order', 'key'],
+                'unique_together': {('dimension', 'key')},
+            },
+        ),
+    ]
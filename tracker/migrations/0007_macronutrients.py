@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:30
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_population_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='food',
+            name='protein_per_100g',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Protein in grams per 100 grams', max_digits=5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='carbs_per_100g',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Carbohydrates in grams per 100 grams', max_digits=5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='fat_per_100g',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Fat in grams per 100 grams', max_digits=5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='food',
+            name='fibre_per_100g',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Dietary fibre in grams per 100 grams', max_digits=5, validators=[django.core.validators.MinValueValidator(0)]),
+        ),
+        migrations.AddField(
+            model_name='dailyfoodlog',
+            name='protein',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Calculated protein in grams', max_digits=7),
+        ),
+        migrations.AddField(
+            model_name='dailyfoodlog',
+            name='carbs',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Calculated carbohydrates in grams', max_digits=7),
+        ),
+        migrations.AddField(
+            model_name='dailyfoodlog',
+            name='fat',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Calculated fat in grams', max_digits=7),
+        ),
+        migrations.AddField(
+            model_name='dailyfoodlog',
+            name='fibre',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Calculated fibre in grams', max_digits=7),
+        ),
+        migrations.AddField(
+            model_name='dailycaloriesummary',
+            name='total_protein',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AddField(
+            model_name='dailycaloriesummary',
+            name='total_carbs',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AddField(
+            model_name='dailycaloriesummary',
+            name='total_fat',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AddField(
+            model_name='dailycaloriesummary',
+            name='total_fibre',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+    ]
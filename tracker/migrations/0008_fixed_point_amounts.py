@@ -0,0 +1,108 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:50
+
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models.functions import Cast, Round
+
+import tracker.fields
+
+
+# (model, field, max_digits, whether the field keeps its default of 0, field options)
+AMOUNT_FIELDS = [
+    ('food', 'calories_per_100g', 6, False,
+     {'help_text': 'Calories per 100 grams', 'validators': [django.core.validators.MinValueValidator(0)]}),
+    ('food', 'protein_per_100g', 5, True,
+     {'help_text': 'Protein in grams per 100 grams', 'validators': [django.core.validators.MinValueValidator(0)]}),
+    ('food', 'carbs_per_100g', 5, True,
+     {'help_text': 'Carbohydrates in grams per 100 grams', 'validators': [django.core.validators.MinValueValidator(0)]}),
+    ('food', 'fat_per_100g', 5, True,
+     {'help_text': 'Fat in grams per 100 grams', 'validators': [django.core.validators.MinValueValidator(0)]}),
+    ('food', 'fibre_per_100g', 5, True,
+     {'help_text': 'Dietary fibre in grams per 100 grams', 'validators': [django.core.validators.MinValueValidator(0)]}),
+    ('dailyfoodlog', 'quantity', 7, False,
+     {'help_text': 'Quantity in grams', 'validators': [django.core.validators.MinValueValidator(Decimal('0.01'))]}),
+    ('dailyfoodlog', 'calories', 7, False, {'help_text': 'Calculated calories for this entry'}),
+    ('dailyfoodlog', 'protein', 7, True, {'help_text': 'Calculated protein in grams'}),
+    ('dailyfoodlog', 'carbs', 7, True, {'help_text': 'Calculated carbohydrates in grams'}),
+    ('dailyfoodlog', 'fat', 7, True, {'help_text': 'Calculated fat in grams'}),
+    ('dailyfoodlog', 'fibre', 7, True, {'help_text': 'Calculated fibre in grams'}),
+    ('dailycaloriesummary', 'total_calories', 9, True, {}),
+    ('dailycaloriesummary', 'total_protein', 9, True, {}),
+    ('dailycaloriesummary', 'total_carbs', 9, True, {}),
+    ('dailycaloriesummary', 'total_fat', 9, True, {}),
+    ('dailycaloriesummary', 'total_fibre', 9, True, {}),
+    ('populationstat', 'total_calories', 14, True, {}),
+]
+
+
+def copy_to_fixed(apps, schema_editor):
+    """Store every decimal amount as an integer count of hundredths."""
+    for model_name, name, *_ in AMOUNT_FIELDS:
+        model = apps.get_model('tracker', model_name)
+        model.objects.update(**{
+            f'{name}_fixed': Cast(Round(models.F(name) * 100), models.BigIntegerField())
+        })
+
+
+def copy_to_decimal(apps, schema_editor):
+    """Restore the decimal amounts from the integer hundredths."""
+    for model_name, name, max_digits, *_ in AMOUNT_FIELDS:
+        model = apps.get_model('tracker', model_name)
+        model.objects.update(**{
+            name: Cast(
+                models.ExpressionWrapper(
+                    models.F(f'{name}_fixed') / models.Value(100.0), output_field=models.FloatField()
+                ),
+                models.DecimalField(max_digits=max_digits, decimal_places=2)
+            )
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_macronutrients'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='dailyfoodlog',
+            name='tracker_log_user_date_cal_idx',
+        ),
+        *[
+            migrations.AddField(
+                model_name=model_name,
+                name=f'{name}_fixed',
+                field=tracker.fields.FixedPointField(max_digits=max_digits, default=0, **options),
+                preserve_default=has_default,
+            )
+            for model_name, name, max_digits, has_default, options in AMOUNT_FIELDS
+        ],
+        migrations.RunPython(copy_to_fixed, migrations.RunPython.noop),
+        # Give the decimal fields a default before removing them, so that
+        # unapplying re-adds them to tables that already have rows
+        *[
+            migrations.AlterField(
+                model_name=model_name,
+                name=name,
+                field=models.DecimalField(max_digits=max_digits, decimal_places=2, default=0, **options),
+            )
+            for model_name, name, max_digits, has_default, options in AMOUNT_FIELDS
+            if not has_default
+        ],
+        migrations.RunPython(migrations.RunPython.noop, copy_to_decimal),
+        *[
+            migrations.RemoveField(model_name=model_name, name=name)
+            for model_name, name, *_ in AMOUNT_FIELDS
+        ],
+        *[
+            migrations.RenameField(model_name=model_name, old_name=f'{name}_fixed', new_name=name)
+            for model_name, name, *_ in AMOUNT_FIELDS
+        ],
+        migrations.AddIndex(
+            model_name='dailyfoodlog',
+            index=models.Index(fields=['user', 'date', 'calories'], name='tracker_log_user_date_cal_idx'),
+        ),
+    ]
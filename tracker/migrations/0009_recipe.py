@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:10
+
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+
+import tracker.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_fixed_point_amounts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('food', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recipe', to='tracker.food')),
+            ],
+            options={
+                'verbose_name': 'Recipe',
+                'verbose_name_plural': 'Recipes',
+                'ordering': ['food__name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grams', tracker.fields.FixedPointField(help_text='Quantity of the ingredient in grams', max_digits=7, validators=[django.core.validators.MinValueValidator(Decimal('0.01'))])),
+                ('food', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='used_in', to='tracker.food')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingredients', to='tracker.recipe')),
+            ],
+            options={
+                'verbose_name': 'Recipe Ingredient',
+                'verbose_name_plural': 'Recipe Ingredients',
+                'unique_together': {('recipe', 'food')},
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:40
+
+import datetime
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copies of UserFoodScore.SCORE_HALF_LIFE_DAYS and SCORE_EPOCH
+SCORE_HALF_LIFE_DAYS = 30
+SCORE_EPOCH = datetime.date(2020, 1, 1)
+
+
+def backfill_scores(apps, schema_editor):
+    """Score every existing (user, food) pair from the food logs, as log2 of the summed weights."""
+    DailyFoodLog = apps.get_model('tracker', 'DailyFoodLog')
+    UserFoodScore = apps.get_model('tracker', 'UserFoodScore')
+    
+    rows = DailyFoodLog.objects.order_by().values_list('user_id', 'food_id', 'date').annotate(models.Count('id'))
+    log_weights = defaultdict(list)
+    counts = defaultdict(int)
+    for user_id, food_id, date, count in rows.iterator():
+        log_weights[(user_id, food_id)].append((date - SCORE_EPOCH).days / SCORE_HALF_LIFE_DAYS + math.log2(count))
+        counts[(user_id, food_id)] += count
+    
+    def log_sum(values):
+        largest = max(values)
+        return largest + math.log2(sum(2 ** (value - largest) for value in values))
+    
+    UserFoodScore.objects.bulk_create(
+        (
+            UserFoodScore(user_id=user_id, food_id=food_id, score=log_sum(values), log_count=counts[(user_id, food_id)])
+            for (user_id, food_id), values in log_weights.items()
+        ),
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tracker', '0009_recipe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserFoodScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(default=0)),
+                ('log_count', models.PositiveIntegerField(default=0)),
+                ('food', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_scores', to='tracker.food')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='food_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'User Food Score',
+                'verbose_name_plural': 'User Food Scores',
+                'indexes': [models.Index(fields=['user', '-score'], name='tracker_score_user_rank_idx')],
+                'unique_together': {('user', 'food')},
+            },
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,21 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
+from collections import defaultdict
+import datetime
+import math
 from decimal import Decimal
 
+from .fields import FixedPointField, from_fixed, scale_per_100, to_fixed
+from .user_cache import bump_user_data_version
+
+
+# Macronutrients stored per 100g on Food, per entry on DailyFoodLog and per
+# day on DailyCalorieSummary (as total_<name>)
+MACRONUTRIENTS = ('protein', 'carbs', 'fat', 'fibre')
+
 
 class UserProfile(models.Model):
     """
@@ -108,14 +120,33 @@ class Food(models.Model):
         ('other', 'Other'),
     ]
     
-    name = models.CharField(max_length=200)
+    name = models.CharField(max_length=200, unique=True)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
-    calories_per_100g = models.DecimalField(
-        max_digits=6, 
-        decimal_places=2,
+    calories_per_100g = FixedPointField(
+        max_digits=6,
         validators=[MinValueValidator(0)],
         help_text="Calories per 100 grams"
     )
+    protein_per_100g = FixedPointField(
+        max_digits=5, default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Protein in grams per 100 grams"
+    )
+    carbs_per_100g = FixedPointField(
+        max_digits=5, default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Carbohydrates in grams per 100 grams"
+    )
+    fat_per_100g = FixedPointField(
+        max_digits=5, default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Fat in grams per 100 grams"
+    )
+    fibre_per_100g = FixedPointField(
+        max_digits=5, default=0,
+        validators=[MinValueValidator(0)],
+        help_text="Dietary fibre in grams per 100 grams"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -128,64 +159,484 @@ class Food(models.Model):
         return f"{self.name} ({self.category})"
 
 
+class Recipe(models.Model):
+    """
+    A home-cooked dish made of catalog Foods.
+    
+    Each recipe owns a Food row that carries its name, category and
+    effective per-100g values, so it is logged, searched and cached exactly
+    like any other Food. Those values are precomputed from the ingredients
+    and only recalculated when an ingredient or one of its Foods changes
+    (see tracker.recipes).
+    """
+    
+    food = models.OneToOneField(Food, on_delete=models.CASCADE, related_name='recipe')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Recipe"
+        verbose_name_plural = "Recipes"
+        ordering = ['food__name']
+    
+    def __str__(self):
+        return self.food.name
+
+
+class RecipeIngredient(models.Model):
+    """
+    Grams of a Food used in a Recipe. A Food used in any recipe cannot be
+    deleted.
+    """
+    
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name='ingredients')
+    food = models.ForeignKey(Food, on_delete=models.PROTECT, related_name='used_in')
+    grams = FixedPointField(
+        max_digits=7,
+        validators=[MinValueValidator(Decimal('0.01'))],
+        help_text="Quantity of the ingredient in grams"
+    )
+    
+    class Meta:
+        verbose_name = "Recipe Ingredient"
+        verbose_name_plural = "Recipe Ingredients"
+        unique_together = ['recipe', 'food']
+    
+    def __str__(self):
+        return f"{self.grams}g {self.food.name}"
+    
+    def clean(self):
+        """Reject ingredients that would make the recipe contain itself."""
+        from .recipes import uses_food
+        
+        if self.recipe_id and self.food_id and uses_food(self.food_id, self.recipe.food_id):
+            raise ValidationError({'food': 'A recipe cannot contain itself, directly or through another recipe.'})
+
+
 class DailyFoodLog(models.Model):
     """
     Daily Food Log model to track user's daily food consumption.
-    Automatically calculates calories based on quantity and food item.
+    Automatically calculates calories and macronutrients based on quantity
+    and food item, so reads never need to join Food.
     """
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='food_logs')
     food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='logs')
-    quantity = models.DecimalField(
-        max_digits=7, 
-        decimal_places=2,
-        validators=[MinValueValidator(0.01)],
+    quantity = FixedPointField(
+        max_digits=7,
+        validators=[MinValueValidator(Decimal('0.01'))],
         help_text="Quantity in grams"
     )
     date = models.DateField(default=timezone.now)
-    calories = models.DecimalField(
-        max_digits=7, 
-        decimal_places=2,
+    calories = FixedPointField(
+        max_digits=7,
         help_text="Calculated calories for this entry"
     )
+    protein = FixedPointField(max_digits=7, default=0, help_text="Calculated protein in grams")
+    carbs = FixedPointField(max_digits=7, default=0, help_text="Calculated carbohydrates in grams")
+    fat = FixedPointField(max_digits=7, default=0, help_text="Calculated fat in grams")
+    fibre = FixedPointField(max_digits=7, default=0, help_text="Calculated fibre in grams")
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         verbose_name = "Daily Food Log"
         verbose_name_plural = "Daily Food Logs"
         ordering = ['-date', '-created_at']
-        unique_together = ['user', 'food', 'date', 'created_at']  # Allow multiple entries per day
+        indexes = [
+            # Per-day and date-range lookups. Calories-only sums can be read
+            # from the index alone, but summary refreshes also sum the
+            # macronutrients and so read the rows (SQLite has no INCLUDE)
+            models.Index(fields=['user', 'date', 'calories'], name='tracker_log_user_date_cal_idx'),
+            # Most recent entries for a user
+            models.Index(fields=['user', '-created_at'], name='tracker_log_user_created_idx'),
+            # Newest-first keyset pagination of a user's full history
+            models.Index(fields=['user', '-date', '-created_at', '-id'], name='tracker_log_user_keyset_idx'),
+        ]
+    
+    def _nutrition_source(self):
+        """Return the Food (or catalog entry) to take per-100g values from."""
+        from .catalog import get_catalog
+        
+        # Use an already attached Food, else the catalog cache, before querying
+        food = self.food if DailyFoodLog.food.is_cached(self) else get_catalog().get(self.food_id)
+        if food is None:
+            food = self.food
+        return food
     
     def calculate_calories(self):
         """Calculate calories based on quantity and food's calories per 100g."""
-        quantity = float(self.quantity)
-        calories_per_100g = float(self.food.calories_per_100g)
-        calculated_calories = (quantity / 100) * calories_per_100g
-        return round(calculated_calories, 2)
+        return self.calculate_nutrients()['calories']
+    
+    def calculate_nutrients(self):
+        """
+        Calculate calories and each macronutrient for this entry's quantity.
+        Works on integer hundredths throughout, so results are exact to the
+        stored precision.
+        """
+        food = self._nutrition_source()
+        quantity = to_fixed(self.quantity)
+        nutrients = {'calories': scale_per_100(quantity, to_fixed(food.calories_per_100g))}
+        for name in MACRONUTRIENTS:
+            nutrients[name] = scale_per_100(quantity, to_fixed(getattr(food, f'{name}_per_100g')))
+        return {name: from_fixed(units) for name, units in nutrients.items()}
+    
+    def set_nutrients(self):
+        """Store the calculated calories and macronutrients on the entry."""
+        for name, value in self.calculate_nutrients().items():
+            setattr(self, name, value)
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the loaded date and food so a moved entry can refresh its old
+        day's summary and food score.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_date = instance.__dict__.get('date')
+        instance._loaded_food_id = instance.__dict__.get('food_id')
+        return instance
     
     def save(self, *args, **kwargs):
-        """Override save to automatically calculate calories."""
-        self.calories = self.calculate_calories()
-        super().save(*args, **kwargs)
+        """Override save to automatically calculate calories and macronutrients."""
+        self.set_nutrients()
+        # Atomic so the daily summary refreshed by post_save commits with the entry
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+    
+    def delete(self, *args, **kwargs):
+        """Override delete so the daily summary refresh commits with the removal."""
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
     
     def __str__(self):
         return f"{self.user.username} - {self.food.name} ({self.quantity}g) on {self.date}"
     
+    @classmethod
+    def log_meal(cls, user, date, items):
+        """
+        Log several (food, quantity) pairs for one date with a single bulk insert.
+        Calories and macronutrients come from the catalog cache; the day's
+        summary and food scores are refreshed and the user's cached pages
+        invalidated here, since bulk_create skips the save signals.
+        """
+        logs = [cls(user=user, food=food, quantity=quantity, date=date) for food, quantity in items]
+        for log in logs:
+            log.set_nutrients()
+        
+        with transaction.atomic():
+            created = cls.objects.bulk_create(logs)
+            DailyCalorieSummary.refresh(user.id, date)
+            UserFoodScore.add_logs(created)
+            transaction.on_commit(lambda: bump_user_data_version(user.id))
+        return created
+    
     @staticmethod
     def get_daily_total_calories(user, date):
         """Get total calories consumed by a user on a specific date."""
-        logs = DailyFoodLog.objects.filter(user=user, date=date)
-        total = sum(float(log.calories) for log in logs)
-        return round(total, 2)
+        summary = DailyCalorieSummary.objects.filter(user=user, date=date).first()
+        return summary.total_calories if summary else Decimal('0.00')
+    
+    @staticmethod
+    def get_daily_totals(user, date):
+        """
+        Get total calories and macronutrients consumed by a user on a
+        specific date, keyed 'calories', 'protein', 'carbs', 'fat', 'fibre'.
+        """
+        fields = ['total_calories'] + [f'total_{name}' for name in MACRONUTRIENTS]
+        row = DailyCalorieSummary.objects.filter(user=user, date=date).values(*fields).first() or {}
+        return {field[len('total_'):]: row.get(field, Decimal('0.00')) for field in fields}
     
     @staticmethod
     def get_weekly_summary(user, start_date, end_date):
         """Get weekly summary of calories consumed."""
-        logs = DailyFoodLog.objects.filter(
+        return DailyCalorieSummary.objects.filter(
             user=user,
             date__range=[start_date, end_date]
-        ).values('date').annotate(
-            total_calories=models.Sum('calories')
+        ).values(
+            'date', 'total_calories', *[f'total_{name}' for name in MACRONUTRIENTS], 'entry_count'
         ).order_by('date')
+
+
+class DailyCalorieSummary(models.Model):
+    """
+    Per-user, per-day rollup of DailyFoodLog entries.
+    Kept in sync by the DailyFoodLog save/delete signals so views can read
+    daily totals without aggregating raw log rows.
+    """
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_summaries')
+    date = models.DateField()
+    total_calories = FixedPointField(max_digits=9, default=0)
+    total_protein = FixedPointField(max_digits=9, default=0)
+    total_carbs = FixedPointField(max_digits=9, default=0)
+    total_fat = FixedPointField(max_digits=9, default=0)
+    total_fibre = FixedPointField(max_digits=9, default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Daily Calorie Summary"
+        verbose_name_plural = "Daily Calorie Summaries"
+        ordering = ['-date']
+        unique_together = ['user', 'date']
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.date}: {self.total_calories} kcal ({self.entry_count} entries)"
+    
+    @staticmethod
+    def totals_aggregates():
+        """Aggregate expressions for every summary total, computed in one query."""
+        aggregates = {'total_calories': models.Sum('calories'), 'entry_count': models.Count('id')}
+        for name in MACRONUTRIENTS:
+            aggregates[f'total_{name}'] = models.Sum(name)
+        return aggregates
+    
+    @classmethod
+    def refresh(cls, user_id, date):
+        """
+        Recompute the summary row for one user and day from the raw logs:
+        one aggregate and one upsert (or delete), without a savepoint when
+        already inside the caller's transaction.
+        """
+        with transaction.atomic(savepoint=False):
+            totals = DailyFoodLog.objects.filter(user_id=user_id, date=date).aggregate(
+                **cls.totals_aggregates()
+            )
+            if totals['entry_count']:
+                cls.objects.bulk_create(
+                    [cls(user_id=user_id, date=date, **totals)],
+                    update_conflicts=True,
+                    unique_fields=['user', 'date'],
+                    update_fields=list(totals) + ['updated_at']
+                )
+            else:
+                cls.objects.filter(user_id=user_id, date=date).delete()
+    
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """Rebuild summaries from scratch, optionally only for the given users."""
+        logs = DailyFoodLog.objects.all()
+        summaries = cls.objects.all()
+        if user_ids is not None:
+            logs = logs.filter(user_id__in=user_ids)
+            summaries = summaries.filter(user_id__in=user_ids)
+        
+        rows = logs.order_by().values('user_id', 'date').annotate(**cls.totals_aggregates())
+        
+        with transaction.atomic():
+            summaries.delete()
+            created = cls.objects.bulk_create(
+                (cls(**row) for row in rows.iterator()),
+                batch_size=1000
+            )
+            if user_ids is None:
+                user_ids = User.objects.values_list('id', flat=True)
+            for user_id in list(user_ids):
+                transaction.on_commit(lambda user_id=user_id: bump_user_data_version(user_id))
+        return len(created)
+
+
+class UserFoodScore(models.Model):
+    """
+    How often and how recently a user logs a food, for ranking quick picks.
+    
+    Each entry weighs 2 ** (days since SCORE_EPOCH / SCORE_HALF_LIFE_DAYS),
+    so it counts for half as much as one logged SCORE_HALF_LIFE_DAYS later.
+    Decaying every score by the same factor as time passes would not change
+    their order, so no decay is applied and ranking a user's foods is one
+    indexed read. The weights themselves overflow a float within a century
+    of the epoch, so the stored score is log2 of their sum, which stays
+    small for any date and ranks the same. New entries are added to the
+    score incrementally; removing or moving entries recalculates the
+    affected scores from the entries left, since subtracting a recent
+    entry's weight would cancel out the older ones. Kept in sync by the
+    DailyFoodLog save/delete signals and the bulk insert paths.
+    """
+    
+    # Days after which an entry's weight halves relative to newer entries
+    SCORE_HALF_LIFE_DAYS = 30
+    # Reference day for the exponential weights
+    SCORE_EPOCH = datetime.date(2020, 1, 1)
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='food_scores')
+    food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name='user_scores')
+    score = models.FloatField(default=0)
+    log_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        verbose_name = "User Food Score"
+        verbose_name_plural = "User Food Scores"
+        unique_together = ['user', 'food']
+        indexes = [
+            # A user's top-ranked foods
+            models.Index(fields=['user', '-score'], name='tracker_score_user_rank_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.food_id}: {self.score:.3g} ({self.log_count} entries)"
+    
+    @classmethod
+    def log_weight(cls, date, count=1):
+        """log2 of the weight of count entries logged on the given date."""
+        if isinstance(date, datetime.datetime):
+            # An entry left on its timezone.now default has not been cleaned yet
+            date = timezone.localdate(date)
+        return (date - cls.SCORE_EPOCH).days / cls.SCORE_HALF_LIFE_DAYS + math.log2(count)
+    
+    @staticmethod
+    def log_sum(log_weights):
+        """Return log2 of the sum of weights given as log2 values, without overflowing."""
+        largest = max(log_weights)
+        return largest + math.log2(sum(2 ** (value - largest) for value in log_weights))
+    
+    @classmethod
+    def add_logs(cls, logs):
+        """
+        Add newly saved entries to their (user, food) scores with one read of
+        the affected rows and one upsert, however many pairs change.
+        """
+        added = defaultdict(list)
+        for log in logs:
+            added[(log.user_id, log.food_id)].append(cls.log_weight(log.date))
+        if not added:
+            return
+        with transaction.atomic(savepoint=False):
+            rows = cls._for_pairs(cls.objects.select_for_update(), added).values_list(
+                'user_id', 'food_id', 'score', 'log_count'
+            )
+            current = {(user_id, food_id): values for user_id, food_id, *values in rows}
+            
+            upserts = []
+            for pair, log_weights in added.items():
+                score, count = current.get(pair, (None, 0))
+                upserts.append(cls(
+                    user_id=pair[0], food_id=pair[1],
+                    score=cls.log_sum(log_weights + [score] if count else log_weights),
+                    log_count=count + len(log_weights)
+                ))
+            cls._upsert(upserts)
+    
+    @classmethod
+    def remove_logs(cls, logs):
+        """
+        Recalculate the scores of the (user, food) pairs of deleted or moved
+        entries from the entries they have left, dropping pairs with none.
+        """
+        cls.refresh_pairs({(log.user_id, log.food_id) for log in logs})
+    
+    @classmethod
+    def refresh_pairs(cls, pairs):
+        """
+        Recalculate the given (user_id, food_id) scores from the food log with
+        one grouped read and one upsert, plus a delete for pairs left without
+        entries.
+        """
+        pairs = set(pairs)
+        if not pairs:
+            return
+        with transaction.atomic(savepoint=False):
+            totals = cls._totals(cls._for_pairs(DailyFoodLog.objects.all(), pairs))
+            cls._upsert([
+                cls(user_id=user_id, food_id=food_id, score=score, log_count=count)
+                for (user_id, food_id), (score, count) in totals.items()
+                if (user_id, food_id) in pairs
+            ])
+            emptied = pairs - set(totals)
+            if emptied:
+                rows = cls._for_pairs(cls.objects.all(), emptied).values_list('user_id', 'food_id', 'id')
+                cls.objects.filter(id__in=[
+                    score_id for user_id, food_id, score_id in rows if (user_id, food_id) in emptied
+                ]).delete()
+    
+    @staticmethod
+    def _for_pairs(queryset, pairs):
+        """Narrow a queryset to the users and foods of the pairs (possibly a few more rows)."""
+        return queryset.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            food_id__in={food_id for _, food_id in pairs}
+        )
+    
+    @classmethod
+    def _totals(cls, logs):
+        """Return (user_id, food_id) -> (score, entry count) for a queryset of entries."""
+        # Entries per user, food and day, so the weights are summed in Python
+        # over far fewer rows than the log itself
+        rows = logs.order_by().values_list('user_id', 'food_id', 'date').annotate(models.Count('id'))
+        log_weights = defaultdict(list)
+        counts = defaultdict(int)
+        for user_id, food_id, date, count in rows.iterator():
+            log_weights[(user_id, food_id)].append(cls.log_weight(date, count))
+            counts[(user_id, food_id)] += count
+        return {pair: (cls.log_sum(values), counts[pair]) for pair, values in log_weights.items()}
+    
+    @classmethod
+    def _upsert(cls, scores):
+        """Insert or update scores by (user, food) in one statement."""
+        if scores:
+            cls.objects.bulk_create(
+                scores, update_conflicts=True,
+                unique_fields=['user', 'food'], update_fields=['score', 'log_count']
+            )
+    
+    @classmethod
+    def top_food_ids(cls, user, limit):
+        """Ids of the user's highest-scoring foods, best first, from one indexed query."""
+        return list(
+            cls.objects.filter(user=user).order_by('-score').values_list('food_id', flat=True)[:limit]
+        )
+    
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """Rebuild scores from scratch, optionally only for the given users."""
+        logs = DailyFoodLog.objects.all()
+        scores = cls.objects.all()
+        if user_ids is not None:
+            logs = logs.filter(user_id__in=user_ids)
+            scores = scores.filter(user_id__in=user_ids)
+        totals = cls._totals(logs)
         
-        return logs
+        with transaction.atomic():
+            scores.delete()
+            created = cls.objects.bulk_create(
+                (
+                    cls(user_id=user_id, food_id=food_id, score=score, log_count=count)
+                    for (user_id, food_id), (score, count) in totals.items()
+                ),
+                batch_size=1000
+            )
+        return len(created)
+
+
+class PopulationStat(models.Model):
+    """
+    Cross-user intake aggregate for one group (all users, a food category,
+    an activity level/gender cohort or a weekday). Written only by the
+    compute_population_stats command, which replaces every row on each run,
+    so reports never aggregate raw log rows live.
+    """
+    
+    DIMENSION_CHOICES = [
+        ('overall', 'All Users'),
+        ('category', 'Food Category'),
+        ('cohort', 'Activity Level / Gender'),
+        ('weekday', 'Weekday'),
+    ]
+    
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=50, help_text="Group within the dimension, e.g. 'Snacks' or 'moderate / male'")
+    sort_order = models.PositiveSmallIntegerField(default=0)
+    user_count = models.PositiveIntegerField(default=0)
+    logged_days = models.PositiveIntegerField(default=0, help_text="User-days the average is taken over")
+    entry_count = models.PositiveIntegerField(default=0)
+    total_calories = FixedPointField(max_digits=14, default=0)
+    average_daily_calories = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+    computed_at = models.DateTimeField()
+    
+    class Meta:
+        verbose_name = "Population Statistic"
+        verbose_name_plural = "Population Statistics"
+        ordering = ['dimension', 'sort_order', 'key']
+        unique_together = ['dimension', 'key']
+    
+    def __str__(self):
+        return f"{self.get_dimension_display()}: {self.key} ({self.average_daily_calories} kcal/day)"
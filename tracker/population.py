@@ -0,0 +1,143 @@
+"""
+Cross-user intake statistics for the nutrition team.
+
+Aggregates are computed per shard of users (a contiguous range of user ids)
+so no single query spans the whole log table, and shards can be processed
+in parallel. Shards are disjoint in users, so every partial figure,
+including distinct user counts, is merged by simple addition.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+import django
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractWeekDay
+from django.utils import timezone
+
+from .models import Food, UserProfile, DailyFoodLog, DailyCalorieSummary, PopulationStat
+
+
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Indexes of the partial figures kept per (dimension, key) group
+USERS, DAYS, ENTRIES, TOTAL = range(4)
+
+
+def shard_ranges(chunk_size):
+    """Split all user ids into (first_id, last_id) ranges of at most chunk_size users."""
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    return [
+        (user_ids[i], user_ids[min(i + chunk_size, len(user_ids)) - 1])
+        for i in range(0, len(user_ids), chunk_size)
+    ]
+
+
+def compute_shard(user_id_range):
+    """
+    Return partial aggregates for the users in an inclusive id range as a
+    dict of (dimension, key) -> [users, logged days, entries, total calories].
+    Category groups leave logged days at 0; they are averaged over all
+    logged days when the shards are stored.
+    """
+    first_id, last_id = user_id_range
+    logs = DailyFoodLog.objects.filter(user_id__gte=first_id, user_id__lte=last_id).order_by()
+    summaries = DailyCalorieSummary.objects.filter(user_id__gte=first_id, user_id__lte=last_id).order_by()
+    partial = defaultdict(lambda: [0, 0, 0, Decimal('0')])
+
+    def add(group, users, days, entries, total):
+        figures = partial[group]
+        figures[USERS] += users
+        figures[DAYS] += days
+        figures[ENTRIES] += entries or 0
+        figures[TOTAL] += total or Decimal('0')
+
+    day_totals = {
+        'users': Count('user_id', distinct=True),
+        'days': Count('id'),
+        'entries': Sum('entry_count'),
+        'total': Sum('total_calories'),
+    }
+
+    overall = summaries.aggregate(**day_totals)
+    if overall['days']:
+        add(('overall', 'all'), overall['users'], overall['days'], overall['entries'], overall['total'])
+
+    for row in logs.values('food__category').annotate(
+        users=Count('user_id', distinct=True), entries=Count('id'), total=Sum('calories')
+    ):
+        add(('category', row['food__category']), row['users'], 0, row['entries'], row['total'])
+
+    for row in summaries.values('user__profile__activity_level', 'user__profile__gender').annotate(**day_totals):
+        cohort = (row['user__profile__activity_level'], row['user__profile__gender'])
+        add(('cohort', cohort), row['users'], row['days'], row['entries'], row['total'])
+
+    # ExtractWeekDay numbers days 1 (Sunday) to 7 (Saturday); store Monday as 0
+    for row in summaries.annotate(weekday=ExtractWeekDay('date')).values('weekday').annotate(**day_totals):
+        add(('weekday', (row['weekday'] + 5) % 7), row['users'], row['days'], row['entries'], row['total'])
+
+    return dict(partial)
+
+
+def merge(partials):
+    """Add up shard results from compute_shard."""
+    merged = defaultdict(lambda: [0, 0, 0, Decimal('0')])
+    for partial in partials:
+        for group, figures in partial.items():
+            for i, value in enumerate(figures):
+                merged[group][i] += value
+    return dict(merged)
+
+
+def _describe(dimension, key):
+    """Return the stored (key, sort_order) for a group."""
+    if dimension == 'category':
+        codes = [code for code, _ in Food.CATEGORY_CHOICES]
+        order = codes.index(key) if key in codes else len(codes)
+        return dict(Food.CATEGORY_CHOICES).get(key, key), order
+    if dimension == 'cohort':
+        level, gender = key
+        if level is None:
+            return 'No profile', 99
+        levels = [code for code, _ in UserProfile.ACTIVITY_LEVELS]
+        genders = [code for code, _ in UserProfile.GENDER_CHOICES]
+        order = levels.index(level) * len(genders) + genders.index(gender) if level in levels and gender in genders else 98
+        return f'{level} / {gender}', order
+    if dimension == 'weekday':
+        return WEEKDAY_NAMES[key], key
+    return 'All users', 0
+
+
+def store(merged):
+    """Replace all PopulationStat rows with the merged results and return how many were written."""
+    computed_at = timezone.now()
+    all_days = merged.get(('overall', 'all'), [0, 0, 0, 0])[DAYS]
+
+    stats = []
+    for (dimension, key), figures in merged.items():
+        # Category intake is averaged over every logged user-day
+        days = all_days if dimension == 'category' else figures[DAYS]
+        average = (figures[TOTAL] / days).quantize(Decimal('0.01')) if days else Decimal('0')
+        label, sort_order = _describe(dimension, key)
+        stats.append(PopulationStat(
+            dimension=dimension,
+            key=label,
+            sort_order=sort_order,
+            user_count=figures[USERS],
+            logged_days=days,
+            entry_count=figures[ENTRIES],
+            total_calories=figures[TOTAL],
+            average_daily_calories=average,
+            computed_at=computed_at,
+        ))
+
+    with transaction.atomic():
+        PopulationStat.objects.all().delete()
+        PopulationStat.objects.bulk_create(stats)
+    return len(stats)
+
+
+def init_worker():
+    """Process pool initializer: make sure Django is set up in the worker."""
+    django.setup()
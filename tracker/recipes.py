@@ -0,0 +1,129 @@
+"""
+Precomputed per-100g values of recipes.
+
+A recipe's Food row stores the grams-weighted average of its ingredients'
+calories and macronutrients per 100g, so logging a recipe reads one catalog
+entry however many ingredients it has. Saving or deleting an ingredient, or
+changing a Food used as one, schedules the affected recipes; everything
+scheduled within a transaction is recalculated together once it commits,
+with a few queries per level of recipe nesting, and recipes built on a
+changed recipe follow in the next level.
+"""
+import threading
+
+from django.db import transaction
+from django.utils import timezone
+
+from .catalog import bump_catalog_version
+from .fields import divide_half_up, from_fixed, to_fixed
+from .models import MACRONUTRIENTS, Food, Recipe, RecipeIngredient
+
+
+# Food fields derived from a recipe's ingredients
+NUTRIENT_FIELDS = ['calories_per_100g'] + [f'{name}_per_100g' for name in MACRONUTRIENTS]
+
+# Levels of recipes-within-recipes followed when propagating a change
+MAX_RECIPE_DEPTH = 10
+
+_scheduled = threading.local()
+
+
+def recipes_using_foods(food_ids):
+    """Return the ids of recipes that use, or are backed by, any of the given Foods."""
+    food_ids = list(food_ids)
+    recipe_ids = set(
+        RecipeIngredient.objects.filter(food_id__in=food_ids).values_list('recipe_id', flat=True)
+    )
+    recipe_ids.update(Recipe.objects.filter(food_id__in=food_ids).values_list('id', flat=True))
+    return recipe_ids
+
+
+def uses_food(food_id, target_food_id):
+    """Return True if food_id is target_food_id or a recipe containing it at any depth."""
+    seen = set()
+    frontier = {food_id}
+    while frontier:
+        if target_food_id in frontier:
+            return True
+        seen |= frontier
+        frontier = set(
+            RecipeIngredient.objects.filter(recipe__food_id__in=frontier).values_list('food_id', flat=True)
+        ) - seen
+    return False
+
+
+def schedule_recipe_refresh(recipe_ids):
+    """
+    Recalculate the given recipes when the current transaction commits
+    (immediately in autocommit mode). Ids scheduled by several writes in one
+    transaction are recalculated in a single batch.
+    """
+    pending = getattr(_scheduled, 'recipe_ids', None)
+    if pending is None:
+        pending = _scheduled.recipe_ids = set()
+    pending.update(recipe_ids)
+    # Every call registers a callback: one scheduled in a transaction that
+    # rolls back is discarded, and the first callback to run drains the set
+    transaction.on_commit(_run_scheduled)
+
+
+def _run_scheduled():
+    recipe_ids = getattr(_scheduled, 'recipe_ids', None)
+    _scheduled.recipe_ids = set()
+    if recipe_ids:
+        refresh_recipes(recipe_ids)
+
+
+def refresh_recipes(recipe_ids):
+    """
+    Recalculate the given recipes, then any recipe using one whose values
+    changed, and so on. Returns the number of recipes whose values changed.
+    """
+    changed_count = 0
+    with transaction.atomic():
+        wave = set(recipe_ids)
+        for _ in range(MAX_RECIPE_DEPTH):
+            if not wave:
+                break
+            changed_food_ids = _recalculate(wave)
+            changed_count += len(changed_food_ids)
+            wave = set(
+                RecipeIngredient.objects.filter(food_id__in=changed_food_ids).values_list('recipe_id', flat=True)
+            )
+        if changed_count:
+            transaction.on_commit(bump_catalog_version)
+    return changed_count
+
+
+def _recalculate(recipe_ids):
+    """Store fresh per-100g values for the recipes; return the ids of Foods that changed."""
+    recipes = dict(Recipe.objects.filter(id__in=recipe_ids).values_list('id', 'food_id'))
+
+    # Per recipe: total grams and, per nutrient, the sum of grams * per-100g
+    # value, all in integer hundredths
+    totals = {recipe_id: [0] * (len(NUTRIENT_FIELDS) + 1) for recipe_id in recipes}
+    rows = RecipeIngredient.objects.filter(recipe_id__in=recipes).values_list(
+        'recipe_id', 'grams', *[f'food__{field}' for field in NUTRIENT_FIELDS]
+    )
+    for recipe_id, grams, *per_100g in rows:
+        units = to_fixed(grams)
+        recipe_totals = totals[recipe_id]
+        recipe_totals[0] += units
+        for i, value in enumerate(per_100g, start=1):
+            recipe_totals[i] += units * to_fixed(value)
+
+    current = {
+        food_id: values
+        for food_id, *values in Food.objects.filter(id__in=recipes.values()).values_list('id', *NUTRIENT_FIELDS)
+    }
+    now = timezone.now()
+    updated = []
+    for recipe_id, food_id in recipes.items():
+        grams, *weighted = totals[recipe_id]
+        values = [from_fixed(divide_half_up(total, grams) if grams else 0) for total in weighted]
+        if values != current.get(food_id):
+            updated.append(Food(id=food_id, updated_at=now, **dict(zip(NUTRIENT_FIELDS, values))))
+
+    # bulk_update skips the Food signals, so this never reschedules itself
+    Food.objects.bulk_update(updated, NUTRIENT_FIELDS + ['updated_at'])
+    return {food.id for food in updated}
@@ -0,0 +1,159 @@
+"""
+Calendar reports: weekly, monthly and yearly totals, and a daily heatmap.
+
+Buckets are computed in the database: the user's daily summary rows in the
+range are truncated to the start of their week, month or year with Trunc
+and aggregated in one grouped query, so a yearly report over years of
+history reads one row per year. Periods without entries are filled in here
+with zero totals, so every bucket in the range is listed.
+"""
+from bisect import bisect_right
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+
+from .fields import TWO_PLACES
+from .models import DailyCalorieSummary, MACRONUTRIENTS
+
+
+# Database truncation function for each report period
+PERIODS = {'week': TruncWeek, 'month': TruncMonth, 'year': TruncYear}
+
+BUCKET_LABEL_FORMATS = {'week': 'Week of %d %b %Y', 'month': '%B %Y', 'year': '%Y'}
+
+# Heatmap levels 1-4 start at these fractions of the daily target (or of
+# the highest day when there is no target); level 0 means nothing logged
+HEATMAP_THRESHOLDS = (0.5, 0.9, 1.1)
+
+HEATMAP_DAYS = 365
+
+WEEKDAY_ABBREVIATIONS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def bucket_start(day, period):
+    """Return the first day of the week (Monday), month or year containing day."""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day.replace(month=1, day=1)
+
+
+def add_periods(start, period, count):
+    """Return the bucket start count periods after (or before, if negative) a bucket start."""
+    if period == 'week':
+        return start + timedelta(weeks=count)
+    if period == 'month':
+        months = start.year * 12 + start.month - 1 + count
+        return date(months // 12, months % 12 + 1, 1)
+    return date(start.year + count, 1, 1)
+
+
+def load_buckets(user, period, start_date, end_date):
+    """
+    Return {bucket start: totals} for the days from start_date to end_date
+    inclusive, from a single grouped query.
+    """
+    aggregates = {'calories': Sum('total_calories'), 'entry_count': Sum('entry_count'), 'logged_days': Count('id')}
+    for name in MACRONUTRIENTS:
+        aggregates[name] = Sum(f'total_{name}')
+
+    rows = DailyCalorieSummary.objects.filter(
+        user=user,
+        date__range=[start_date, end_date]
+    ).annotate(
+        bucket=PERIODS[period]('date')
+    ).values('bucket').annotate(**aggregates).order_by('bucket')
+    return {row.pop('bucket'): row for row in rows}
+
+
+def period_report(user, period, start_date, end_date, daily_target):
+    """
+    Totals per week, month or year from the bucket containing start_date
+    to the one containing end_date, including empty buckets. The last
+    bucket is cut off at end_date. daily_target may be 0 when the user has
+    no profile, in which case targets and differences are None.
+    """
+    start_date = bucket_start(start_date, period)
+    rows = load_buckets(user, period, start_date, end_date)
+    daily_target = Decimal(str(daily_target or 0)).quantize(TWO_PLACES)
+    zero = Decimal('0.00')
+
+    buckets = []
+    start = start_date
+    while start <= end_date:
+        end = min(add_periods(start, period, 1) - timedelta(days=1), end_date)
+        days = (end - start).days + 1
+        row = rows.get(start, {})
+        calories = row.get('calories') or zero
+        logged_days = row.get('logged_days', 0)
+        target = daily_target * days if daily_target else None
+        buckets.append({
+            'start': start,
+            'end': end,
+            'label': start.strftime(BUCKET_LABEL_FORMATS[period]),
+            'days': days,
+            'logged_days': logged_days,
+            'entry_count': row.get('entry_count') or 0,
+            'total_calories': calories,
+            'macros': {name: row.get(name) or zero for name in MACRONUTRIENTS},
+            'average_calories': (calories / logged_days).quantize(TWO_PLACES) if logged_days else None,
+            'target': target,
+            'difference': calories - target if target is not None else None,
+        })
+        start = add_periods(start, period, 1)
+
+    return {
+        'period': period,
+        'start': start_date,
+        'end': end_date,
+        'daily_target': daily_target,
+        'buckets': buckets,
+        'total_calories': sum((bucket['total_calories'] for bucket in buckets), zero),
+        'logged_days': sum(bucket['logged_days'] for bucket in buckets),
+    }
+
+
+def calendar_heatmap(user, end_date, daily_target, days=HEATMAP_DAYS):
+    """
+    Daily calories for the days up to end_date laid out as a calendar grid:
+    one row per weekday and one column per week (Monday first), each cell
+    a dict with the date, calories and a level from 0 to 4, or None for
+    days outside the range.
+    """
+    start_date = end_date - timedelta(days=days - 1)
+    totals = dict(
+        DailyCalorieSummary.objects.filter(
+            user=user,
+            date__range=[start_date, end_date]
+        ).values_list('date', 'total_calories')
+    )
+    scale = float(daily_target or 0) or float(max(totals.values(), default=0))
+
+    grid_start = bucket_start(start_date, 'week')
+    weeks = (end_date - grid_start).days // 7 + 1
+    rows = [[None] * weeks for _ in range(7)]
+    month_labels = [''] * weeks
+    for week in range(weeks):
+        for weekday in range(7):
+            day = grid_start + timedelta(weeks=week, days=weekday)
+            if day < start_date or day > end_date:
+                continue
+            calories = totals.get(day)
+            level = 0
+            if calories is not None and scale:
+                level = 1 + bisect_right(HEATMAP_THRESHOLDS, float(calories) / scale)
+            rows[weekday][week] = {'date': day, 'calories': calories, 'level': level}
+            if day.day == 1 or day == start_date:
+                month_labels[week] = day.strftime('%b')
+
+    return {
+        'start': start_date,
+        'end': end_date,
+        'rows': list(zip(WEEKDAY_ABBREVIATIONS, rows)),
+        'month_labels': month_labels,
+        'logged_days': len(totals),
+        'daily_target': daily_target,
+    }
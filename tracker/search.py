@@ -0,0 +1,150 @@
+"""
+In-process search index over Food names for the add-food typeahead.
+
+The index is built once per worker from the Food catalog cache and combines a
+sorted word list (prefix lookups via bisect) with a trigram posting list
+(typo-tolerant matching). It is rebuilt lazily whenever the catalog version
+changes.
+"""
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+from .catalog import get_catalog
+
+
+# Minimum trigram similarity for a fuzzy (non-prefix) match
+FUZZY_THRESHOLD = 0.25
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+
+def normalize(text):
+    """Lowercase text and split it into alphanumeric words."""
+    return _WORD_RE.findall(text.lower())
+
+
+def trigrams(words):
+    """Return the set of padded trigrams for a list of words."""
+    grams = set()
+    for word in words:
+        padded = f'  {word} '
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class FoodSearchIndex:
+    """
+    Immutable prefix + trigram index over a snapshot of the Food table.
+    """
+
+    def __init__(self, foods, version=None):
+        self.version = version
+        self.foods = {}
+        self.words = []
+        self.postings = {}
+
+        for food in foods:
+            words = normalize(food['name'])
+            food['words'] = words
+            food['trigrams'] = trigrams(words)
+            self.foods[food['id']] = food
+
+            for word in set(words):
+                self.words.append((word, food['id']))
+            for gram in food['trigrams']:
+                self.postings.setdefault(gram, []).append(food['id'])
+
+        self.words.sort()
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Build an index from a catalog snapshot."""
+        foods = [food._asdict() for food in catalog.foods.values()]
+        return cls(foods, version=catalog.version)
+
+    def _prefix_matches(self, words):
+        """Return ids of foods that have a word starting with each query word."""
+        matches = None
+        for query_word in words:
+            ids = set()
+            i = bisect_left(self.words, (query_word,))
+            while i < len(self.words) and self.words[i][0].startswith(query_word):
+                ids.add(self.words[i][1])
+                i += 1
+            matches = ids if matches is None else matches & ids
+            if not matches:
+                break
+        return matches or set()
+
+    def _fuzzy_matches(self, words):
+        """Return {id: similarity} for foods sharing enough trigrams with the query."""
+        query_grams = trigrams(words)
+        if not query_grams:
+            return {}
+
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self.postings.get(gram, ()))
+
+        scores = {}
+        for food_id, count in shared.items():
+            union = len(query_grams) + len(self.foods[food_id]['trigrams']) - count
+            similarity = count / union
+            if similarity >= FUZZY_THRESHOLD:
+                scores[food_id] = similarity
+        return scores
+
+    def search(self, query, category=None, limit=10):
+        """
+        Search foods by name.
+        Prefix matches rank first (exact name prefix before word prefix),
+        followed by typo-tolerant trigram matches ordered by similarity.
+        """
+        words = normalize(query)
+        if not words:
+            return []
+
+        prefix_ids = self._prefix_matches(words)
+        scores = self._fuzzy_matches(words)
+        joined = ' '.join(words)
+
+        ranked = []
+        for food_id in prefix_ids | set(scores):
+            food = self.foods[food_id]
+            if category and food['category'] != category:
+                continue
+            if ' '.join(food['words']).startswith(joined):
+                tier = 0
+            elif food_id in prefix_ids:
+                tier = 1
+            else:
+                tier = 2
+            ranked.append((tier, -scores.get(food_id, 0), food['name'], food_id))
+
+        ranked.sort()
+        return [self.foods[food_id] for *_, food_id in ranked[:limit]]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the worker's search index, rebuilding it when the catalog changes."""
+    global _index
+    catalog = get_catalog()
+    index = _index
+    if index is None or index.version != catalog.version:
+        with _index_lock:
+            if _index is None or _index.version != catalog.version:
+                _index = FoodSearchIndex.from_catalog(catalog)
+            index = _index
+    return index
+
+
+def search_foods(query, category=None, limit=10):
+    """Search the Food catalog, returning dicts with id, name, category and calories_per_100g."""
+    return get_index().search(query, category=category, limit=limit)
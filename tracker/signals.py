@@ -0,0 +1,77 @@
+"""
+Signal handlers keeping denormalized data in sync with the models it derives from.
+"""
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Food, UserProfile, DailyFoodLog, DailyCalorieSummary, Recipe, RecipeIngredient, UserFoodScore
+from .catalog import bump_catalog_version
+from .recipes import recipes_using_foods, schedule_recipe_refresh
+from .user_cache import bump_user_data_version
+
+
+@receiver(post_save, sender=DailyFoodLog)
+def update_summary_on_log_save(sender, instance, created, **kwargs):
+    """
+    Refresh the day's summary, plus the previous day if the entry was moved,
+    and the food scores if it is new or changed food or day.
+    """
+    DailyCalorieSummary.refresh(instance.user_id, instance.date)
+    
+    loaded_date = getattr(instance, '_loaded_date', None)
+    if loaded_date is not None and loaded_date != instance.date:
+        DailyCalorieSummary.refresh(instance.user_id, loaded_date)
+    
+    loaded_food_id = getattr(instance, '_loaded_food_id', None)
+    if created:
+        UserFoodScore.add_logs([instance])
+    elif loaded_date is not None and (loaded_date, loaded_food_id) != (instance.date, instance.food_id):
+        UserFoodScore.refresh_pairs({(instance.user_id, loaded_food_id), (instance.user_id, instance.food_id)})
+    instance._loaded_date = instance.date
+    instance._loaded_food_id = instance.food_id
+    transaction.on_commit(lambda: bump_user_data_version(instance.user_id))
+
+
+@receiver(post_delete, sender=DailyFoodLog)
+def update_summary_on_log_delete(sender, instance, **kwargs):
+    """Refresh the day's summary and food score after an entry is removed."""
+    DailyCalorieSummary.refresh(instance.user_id, instance.date)
+    UserFoodScore.remove_logs([instance])
+    transaction.on_commit(lambda: bump_user_data_version(instance.user_id))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_user_cache_on_profile_change(sender, instance, **kwargs):
+    """Invalidate the user's cached pages once the profile change is committed."""
+    transaction.on_commit(lambda: bump_user_data_version(instance.user_id))
+
+
+@receiver(post_save, sender=Food)
+@receiver(post_delete, sender=Food)
+def invalidate_food_catalog(sender, **kwargs):
+    """Invalidate cached catalog snapshots once the change is committed."""
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Food)
+def refresh_recipes_on_food_change(sender, instance, created, **kwargs):
+    """Recalculate recipes using the Food, and its own recipe, once the change is committed."""
+    if not created:
+        schedule_recipe_refresh(recipes_using_foods([instance.id]))
+
+
+@receiver(post_delete, sender=Recipe)
+def delete_recipe_food(sender, instance, **kwargs):
+    """
+    Delete the recipe's Food along with it. Raises ProtectedError, rolling
+    back the recipe's deletion, while the Food is an ingredient elsewhere.
+    """
+    Food.objects.filter(pk=instance.food_id).delete()
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def refresh_recipe_on_ingredient_change(sender, instance, **kwargs):
+    """Recalculate the recipe once the ingredient change is committed."""
+    schedule_recipe_refresh([instance.recipe_id])
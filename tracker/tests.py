@@ -1,3 +1,1328 @@
-from django.test import TestCase
+"""
+Tests for the tracker app.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection, transaction
+from django.db.models import ProtectedError, Sum
+from django.http import StreamingHttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .decorators import QueryBudgetExceeded, query_budget
+from .catalog import bump_catalog_version, get_catalog
+from .ingest import LogWriteBuffer, submit_logs
+from .instrumentation import RenderTimer
+from .reports import calendar_heatmap, period_report
+from .search import FoodSearchIndex
+from .fields import FixedPointField, from_fixed, scale_per_100, to_fixed
+from .models import UserProfile, Food, Recipe, RecipeIngredient, DailyFoodLog, DailyCalorieSummary, UserFoodScore, PopulationStat
+from .trends import compute_trends, rolling_average, run_lengths
+from .user_cache import check_shared_cache
+
+
+def make_food(name='Dal Tadka', calories='120.00', **values):
+    """Create a Food with the given calories per 100g."""
+    return Food.objects.create(name=name, category='dal', calories_per_100g=Decimal(calories), **values)
+
+
+def make_profile(user):
+    """Create a complete profile, so the dashboards render instead of redirecting."""
+    return UserProfile.objects.create(
+        user=user, age=30, gender='female', height=Decimal('165'), weight=Decimal('60'), activity_level='moderate'
+    )
+
+
+def server_timing_queries(response):
+    """Return the query count reported in a response's Server-Timing header."""
+    db_metric = response['Server-Timing'].split(', ')[0]
+    return int(db_metric.split('desc="')[1].split()[0])
+
+
+class DailyCalorieSummaryTests(TestCase):
+    """The daily summaries follow every entry that is added, changed, moved or deleted."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('summed', password='secret')
+        self.food = make_food()
+        self.day = date(2024, 3, 1)
+        self.next_day = self.day + timedelta(days=1)
+
+    def summaries(self):
+        return {
+            summary.date: (summary.total_calories, summary.entry_count)
+            for summary in DailyCalorieSummary.objects.filter(user=self.user)
+        }
+
+    def log(self, quantity, day):
+        return DailyFoodLog.objects.create(user=self.user, food=self.food, quantity=Decimal(quantity), date=day)
+
+    def test_add_and_change(self):
+        first = self.log('100', self.day)
+        self.log('50', self.day)
+        self.assertEqual(self.summaries(), {self.day: (Decimal('180.00'), 2)})
+        first.quantity = Decimal('200')
+        first.save()
+        self.assertEqual(self.summaries(), {self.day: (Decimal('300.00'), 2)})
+
+    def test_moved_entry_refreshes_both_days(self):
+        moved = self.log('100', self.day)
+        self.log('50', self.day)
+        moved = DailyFoodLog.objects.get(pk=moved.pk)
+        moved.date = self.next_day
+        moved.save()
+        self.assertEqual(self.summaries(), {
+            self.day: (Decimal('60.00'), 1),
+            self.next_day: (Decimal('120.00'), 1),
+        })
+
+    def test_deleting_last_entry_removes_summary(self):
+        kept = self.log('100', self.day)
+        removed = self.log('50', self.next_day)
+        removed.delete()
+        self.assertEqual(self.summaries(), {self.day: (Decimal('120.00'), 1)})
+        kept.delete()
+        self.assertEqual(self.summaries(), {})
+
+    def test_rebuild_matches_maintained_rows(self):
+        self.log('100', self.day)
+        self.log('75', self.next_day)
+        maintained = self.summaries()
+        DailyCalorieSummary.objects.all().delete()
+        self.assertEqual(DailyCalorieSummary.rebuild([self.user.id]), 2)
+        self.assertEqual(self.summaries(), maintained)
+
+
+class FoodSearchTests(TestCase):
+    """Search ranks name prefixes, then word prefixes, then close misspellings."""
+
+    FOODS = [
+        ('Masala Dosa', 'snacks'),
+        ('Paneer Butter Masala', 'vegetables'),
+        ('Masoor Dal', 'dal'),
+        ('Aloo Paratha', 'roti'),
+    ]
+
+    def setUp(self):
+        self.index = FoodSearchIndex([
+            {'id': i, 'name': name, 'category': category} for i, (name, category) in enumerate(self.FOODS)
+        ])
+
+    def names(self, query, **kwargs):
+        return [food['name'] for food in self.index.search(query, **kwargs)]
+
+    def test_name_prefix_ranks_before_word_prefix(self):
+        self.assertEqual(self.names('masala'), ['Masala Dosa', 'Paneer Butter Masala'])
+        # Within a tier, the closer trigram match first
+        self.assertEqual(self.names('MAS'), ['Masoor Dal', 'Masala Dosa', 'Paneer Butter Masala'])
+
+    def test_every_query_word_must_match(self):
+        self.assertEqual(self.names('pan mas'), ['Paneer Butter Masala'])
+
+    def test_misspelling_matches_fuzzily(self):
+        self.assertEqual(self.names('paratah'), ['Aloo Paratha'])
+        self.assertEqual(self.names('xyz'), [])
+
+    def test_category_and_limit(self):
+        self.assertEqual(self.names('mas', category='dal'), ['Masoor Dal'])
+        self.assertEqual(self.names('masala', limit=1), ['Masala Dosa'])
+        self.assertEqual(self.names('  '), [])
+
+    def test_endpoint_searches_catalog(self):
+        user = User.objects.create_user('searcher', password='secret')
+        self.client.force_login(user)
+        # Drop the snapshot of these foods along with them
+        self.addCleanup(bump_catalog_version)
+        with self.captureOnCommitCallbacks(execute=True):
+            for name, category in self.FOODS:
+                Food.objects.create(name=name, category=category, calories_per_100g=Decimal('100'))
+        response = self.client.get(reverse('tracker:food_search'), {'q': 'masala', 'limit': '1'})
+        self.assertEqual([food['name'] for food in response.json()['results']], ['Masala Dosa'])
+
+
+class LogMealTests(TestCase):
+    """A meal is logged in one go, with per-item calories and the day's totals."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('diner', password='secret')
+        self.dal = make_food(protein_per_100g=Decimal('9.00'))
+        self.rice = make_food('Jeera Rice', calories='150.00', carbs_per_100g=Decimal('30.00'))
+        self.day = date(2024, 3, 1)
+
+    def test_items_and_day_totals(self):
+        DailyFoodLog.objects.create(user=self.user, food=self.rice, quantity=Decimal('100'), date=self.day)
+        logs = DailyFoodLog.log_meal(self.user, self.day, [(self.dal, Decimal('150')), (self.rice, Decimal('75.5'))])
+        self.assertEqual([log.calories for log in logs], [Decimal('180.00'), Decimal('113.25')])
+        summary = DailyCalorieSummary.objects.get(user=self.user, date=self.day)
+        self.assertEqual(
+            (summary.total_calories, summary.total_protein, summary.total_carbs, summary.entry_count),
+            (Decimal('443.25'), Decimal('13.50'), Decimal('52.65'), 3)
+        )
+        self.assertEqual(UserFoodScore.objects.get(user=self.user, food=self.rice).log_count, 2)
+
+    def test_view_reports_meal_total(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('tracker:log_meal'), {
+            'date': self.day.isoformat(),
+            'items-TOTAL_FORMS': '3', 'items-INITIAL_FORMS': '0',
+            'items-MIN_NUM_FORMS': '1', 'items-MAX_NUM_FORMS': '20',
+            'items-0-food': self.dal.id, 'items-0-quantity': '150',
+            'items-1-food': self.rice.id, 'items-1-quantity': '75.5',
+        }, follow=True)
+        self.assertContains(response, 'Logged 2 food items - 293.25 calories')
+        self.assertEqual(DailyFoodLog.objects.filter(user=self.user, date=self.day).count(), 2)
+
+
+class ExportLogsTests(TestCase):
+    """The export streams the user's own entries in date order, optionally within a date range."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('exporter', password='secret')
+        self.client.force_login(self.user)
+        food = make_food()
+        for day, quantity in [(date(2024, 3, 3), '50'), (date(2024, 3, 1), '100'), (date(2024, 3, 2), '12.5')]:
+            DailyFoodLog.objects.create(user=self.user, food=food, quantity=Decimal(quantity), date=day)
+        other = User.objects.create_user('someone_else', password='secret')
+        DailyFoodLog.objects.create(user=other, food=food, quantity=Decimal('100'), date=date(2024, 3, 1))
+
+    def export(self, **params):
+        response = self.client.get(reverse('tracker:export_logs'), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, content = self.export(format='csv')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('filename="food-log-exporter.csv"', response['Content-Disposition'])
+        self.assertEqual(content.splitlines(), [
+            'date,food,category,quantity,calories',
+            '2024-03-01,Dal Tadka,Dal/Lentils,100.00,120.00',
+            '2024-03-02,Dal Tadka,Dal/Lentils,12.50,15.00',
+            '2024-03-03,Dal Tadka,Dal/Lentils,50.00,60.00',
+        ])
+
+    def test_ndjson_date_range(self):
+        response, content = self.export(format='ndjson', start='2024-03-02', end='2024-03-02')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual([json.loads(line) for line in content.splitlines()], [{
+            'date': '2024-03-02', 'food': 'Dal Tadka', 'category': 'Dal/Lentils',
+            'quantity': '12.50', 'calories': '15.00',
+        }])
+
+    def test_open_ended_range_and_unknown_format(self):
+        _, content = self.export(format='xml', start='2024-03-02', end='not-a-date')
+        self.assertEqual([line[:10] for line in content.splitlines()[1:]], ['2024-03-02', '2024-03-03'])
+
+
+class LoadFoodsTests(TestCase):
+    """load_indian_foods upserts dataset files by name and reports what changed."""
+
+    def write_file(self, suffix, content):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w', newline='') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_created_updated_and_unchanged_counts(self):
+        make_food()
+        make_food('Jeera Rice', calories='150.00')
+        csv_path = self.write_file('.csv', (
+            'name,category,calories_per_100g,protein_per_100g\n'
+            'Dal Tadka,dal,120,\n'
+            'Jeera Rice,rice,160,3.5\n'
+            'Plain Dosa,snacks,165,\n'
+            'Mystery,not-a-category,100,\n'
+        ))
+        jsonl_path = self.write_file('.jsonl', (
+            '{"name": "Plain Dosa", "category": "snacks", "calories_per_100g": 170}\n'
+            'not json\n'
+        ))
+        output = StringIO()
+        call_command('load_indian_foods', csv_path, jsonl_path, stdout=output)
+        self.assertIn(
+            'loaded 1 new foods and updated 1 existing foods! (1 unchanged, 2 invalid rows skipped)',
+            output.getvalue()
+        )
+        self.assertEqual(
+            sorted(Food.objects.values_list('name', 'category', 'calories_per_100g', 'protein_per_100g')),
+            [
+                ('Dal Tadka', 'dal', Decimal('120.00'), Decimal('0.00')),
+                ('Jeera Rice', 'rice', Decimal('160.00'), Decimal('3.50')),
+                ('Plain Dosa', 'snacks', Decimal('170.00'), Decimal('0.00')),
+            ]
+        )
+
+        output = StringIO()
+        call_command('load_indian_foods', csv_path, jsonl_path, stdout=output)
+        self.assertIn('loaded 0 new foods and updated 0 existing foods! (3 unchanged', output.getvalue())
+
+
+class DuplicateEntryTests(TestCase):
+    """Identical entries, down to the timestamp, are separate entries."""
+
+    def test_same_food_twice_in_one_meal(self):
+        user = User.objects.create_user('twice', password='secret')
+        food = make_food()
+        day = date(2024, 3, 1)
+        DailyFoodLog.log_meal(user, day, [(food, Decimal('100')), (food, Decimal('100'))])
+        DailyFoodLog.objects.filter(user=user).update(created_at=timezone.now())
+        DailyFoodLog.objects.create(user=user, food=food, quantity=Decimal('100'), date=day)
+        self.assertEqual(DailyFoodLog.objects.filter(user=user, food=food, date=day).count(), 3)
+        self.assertEqual(DailyCalorieSummary.objects.get(user=user, date=day).entry_count, 3)
+
+
+class LogHistoryApiTests(TestCase):
+    """The history API's keyset cursor walks every entry exactly once, newest first."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('scroller', password='secret')
+        self.client.force_login(self.user)
+        food = make_food()
+        moment = timezone.now()
+        for i in range(11):
+            log = DailyFoodLog.objects.create(
+                user=self.user, food=food, quantity=Decimal('100'), date=date(2024, 3, 1 + i // 4)
+            )
+            # Pairs of entries share a date and timestamp, so ties fall back to the id
+            DailyFoodLog.objects.filter(pk=log.pk).update(created_at=moment + timedelta(seconds=i // 2))
+
+    def walk(self, **params):
+        ids = []
+        cursor = ''
+        while True:
+            response = self.client.get(reverse('tracker:log_history_api'), {'cursor': cursor, **params})
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page['results']), 3)
+            ids.extend(entry['id'] for entry in page['results'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                return ids
+
+    @mock.patch('tracker.views.LOG_API_PAGE_SIZE', 3)
+    def test_walk_has_no_duplicates_or_gaps(self):
+        expected = list(
+            DailyFoodLog.objects.filter(user=self.user).order_by('-date', '-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(self.walk(), expected)
+        self.assertEqual(
+            self.walk(start='2024-03-02', end='2024-03-02'),
+            [log_id for log_id in expected if DailyFoodLog.objects.get(pk=log_id).date == date(2024, 3, 2)]
+        )
+
+    def test_invalid_cursor_and_category(self):
+        url = reverse('tracker:log_history_api')
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'category': 'nope'}).status_code, 400)
+
+
+class TrendsTests(TestCase):
+    """Trend analytics over a dense per-day series, with unlogged days left out of averages."""
+
+    def test_rolling_average_skips_unlogged_days(self):
+        totals = np.array([10.0, 0.0, 20.0, 30.0])
+        logged = np.array([True, False, True, True])
+        self.assertEqual(list(rolling_average(totals, logged, 2)), [10.0, 10.0, 20.0, 25.0])
+        self.assertTrue(np.isnan(rolling_average(totals, logged, 1)[1]))
+
+    def test_run_lengths(self):
+        starts, lengths = run_lengths(np.array([True, True, False, True]))
+        self.assertEqual((list(starts), list(lengths)), ([0, 3], [2, 1]))
+
+    def test_compute_trends(self):
+        user = User.objects.create_user('trending', password='secret')
+        monday = date(2024, 3, 4)
+        # Nothing logged on Wednesday or Sunday
+        for offset, calories in [(0, '2000'), (1, '2100'), (3, '2500'), (4, '1900'), (5, '1950')]:
+            DailyCalorieSummary.objects.create(
+                user=user, date=monday + timedelta(days=offset), total_calories=Decimal(calories), entry_count=1
+            )
+        trends = compute_trends(user, monday, monday + timedelta(days=6), 2000)
+        self.assertEqual((trends['days'], trends['logged_days'], trends['average_calories']), (7, 5, 2090.0))
+        self.assertEqual(trends['rolling_averages']['7d'], [2000.0, 2050.0, 2050.0, 2200.0, 2125.0, 2090.0, 2090.0])
+        self.assertEqual(trends['adherence'], {
+            'daily_target': 2000.0,
+            'tolerance': 0.10,
+            'on_target_days': 4,
+            'over_target_days': 1,
+            'on_target_rate': 0.8,
+            'longest_streak': 2,
+            'longest_streak_start': '2024-03-04',
+            'current_streak': 0,
+        })
+        weekdays = {row['weekday']: (row['average_calories'], row['logged_days']) for row in trends['weekdays']}
+        self.assertEqual(weekdays['Thursday'], (2500.0, 1))
+        self.assertEqual(weekdays['Sunday'], (None, 0))
+        self.assertIsNone(compute_trends(user, monday, monday, 0)['adherence'])
+
+
+class PopulationStatsTests(TestCase):
+    """compute_population_stats gives the same figures however users are sharded."""
+
+    def setUp(self):
+        dal = make_food()
+        rice = Food.objects.create(name='Jeera Rice', category='rice', calories_per_100g=Decimal('150'))
+        monday, tuesday = date(2024, 3, 4), date(2024, 3, 5)
+        first, second, third = (User.objects.create_user(f'person{i}', password='secret') for i in range(3))
+        make_profile(first)
+        make_profile(second)
+        for user, food, quantity, day in [
+            (first, dal, '100', monday), (first, rice, '100', monday), (first, dal, '200', tuesday),
+            (second, rice, '200', monday),
+            (third, dal, '50', tuesday),
+        ]:
+            DailyFoodLog.objects.create(user=user, food=food, quantity=Decimal(quantity), date=day)
+
+    def stats(self, chunk_size):
+        call_command('compute_population_stats', chunk_size=chunk_size, stdout=StringIO())
+        return {
+            (stat.dimension, stat.key): (
+                stat.user_count, stat.logged_days, stat.entry_count, stat.total_calories, stat.average_daily_calories
+            )
+            for stat in PopulationStat.objects.all()
+        }
+
+    def test_aggregates(self):
+        stats = self.stats(chunk_size=1)
+        self.assertEqual(stats, {
+            ('overall', 'All users'): (3, 4, 5, Decimal('870.00'), Decimal('217.50')),
+            ('category', 'Dal/Lentils'): (2, 4, 3, Decimal('420.00'), Decimal('105.00')),
+            ('category', 'Rice'): (2, 4, 2, Decimal('450.00'), Decimal('112.50')),
+            ('cohort', 'moderate / female'): (2, 3, 4, Decimal('810.00'), Decimal('270.00')),
+            ('cohort', 'No profile'): (1, 1, 1, Decimal('60.00'), Decimal('60.00')),
+            ('weekday', 'Monday'): (2, 2, 3, Decimal('570.00'), Decimal('285.00')),
+            ('weekday', 'Tuesday'): (2, 2, 2, Decimal('300.00'), Decimal('150.00')),
+        })
+        self.assertEqual(self.stats(chunk_size=10), stats)
+
+
+class MacronutrientTests(TestCase):
+    """Entries store their macronutrients, which the daily and weekly totals add up."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('macros', password='secret')
+        make_profile(self.user)
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+        self.dal = make_food(
+            protein_per_100g=Decimal('9.00'), carbs_per_100g=Decimal('15.50'),
+            fat_per_100g=Decimal('3.25'), fibre_per_100g=Decimal('4.00'),
+        )
+
+    def test_entry_macros_are_fixed_at_write_time(self):
+        log = DailyFoodLog.objects.create(user=self.user, food=self.dal, quantity=Decimal('150'), date=date(2024, 3, 4))
+        self.assertEqual(
+            (log.protein, log.carbs, log.fat, log.fibre),
+            (Decimal('13.50'), Decimal('23.25'), Decimal('4.88'), Decimal('6.00'))
+        )
+        self.dal.protein_per_100g = Decimal('20.00')
+        self.dal.save()
+        log.refresh_from_db()
+        self.assertEqual(log.protein, Decimal('13.50'))
+
+    def test_weekly_macro_totals(self):
+        monday = date(2024, 3, 4)
+        for offset, quantity in [(0, '100'), (0, '50'), (2, '200')]:
+            DailyFoodLog.objects.create(
+                user=self.user, food=self.dal, quantity=Decimal(quantity), date=monday + timedelta(days=offset)
+            )
+        response = self.client.get(reverse('tracker:weekly_summary'), {'week_start': monday.isoformat()})
+        self.assertEqual(
+            [(day['date'], day['total_protein']) for day in response.context['daily_summaries'] if day['entry_count']],
+            [(monday, Decimal('13.50')), (monday + timedelta(days=2), Decimal('18.00'))]
+        )
+        self.assertEqual(
+            response.context['weekly_macros'],
+            {'protein': Decimal('31.50'), 'carbs': Decimal('54.25'), 'fat': Decimal('11.38'), 'fibre': Decimal('14.00')}
+        )
+
+    async def test_dashboards_show_todays_macros(self):
+        await DailyFoodLog.objects.acreate(
+            user=self.user, food=self.dal, quantity=Decimal('200'), date=timezone.localdate()
+        )
+        expected = {'protein': 18.0, 'carbs': 31.0, 'fat': 6.5, 'fibre': 8.0}
+        for url_name in ('tracker:dashboard', 'tracker:dashboard_async'):
+            response = await self.async_client.get(reverse(url_name))
+            macros = {name: float(value) for name, value in response.context['macros'].items()}
+            self.assertEqual(macros, expected, url_name)
+
+
+class FixedPointTests(TestCase):
+    """Amounts are integer hundredths, rounded half up with no float arithmetic."""
+
+    def test_conversions_round_half_up(self):
+        self.assertEqual(to_fixed('1.005'), 101)
+        self.assertEqual(to_fixed(Decimal('2.675')), 268)
+        self.assertEqual(to_fixed(7), 700)
+        self.assertEqual(from_fixed(12345), Decimal('123.45'))
+        self.assertEqual(FixedPointField().to_python('0.125'), Decimal('0.13'))
+        with self.assertRaises(ValidationError):
+            FixedPointField().to_python('lots')
+
+    def test_scale_per_100(self):
+        # 50 g of 1.01 kcal/100g is 0.505 kcal
+        self.assertEqual(scale_per_100(5000, 101), 51)
+        # 12.5 g of 12.10 kcal/100g is 1.5125 kcal
+        self.assertEqual(scale_per_100(1250, 1210), 151)
+
+    def test_entries_and_totals_are_exact(self):
+        user = User.objects.create_user('exact', password='secret')
+        food = make_food(calories='100.00', protein_per_100g=Decimal('1.01'))
+        day = date(2024, 3, 1)
+        for _ in range(3):
+            log = DailyFoodLog.objects.create(user=user, food=food, quantity=Decimal('33.33'), date=day)
+        self.assertEqual((log.calories, log.protein), (Decimal('33.33'), Decimal('0.34')))
+        summary = DailyCalorieSummary.objects.get(user=user, date=day)
+        self.assertEqual((summary.total_calories, summary.total_protein), (Decimal('99.99'), Decimal('1.02')))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT quantity, calories FROM tracker_dailyfoodlog WHERE id = %s', [log.id])
+            self.assertEqual(cursor.fetchone(), (3333, 3333))
+
+
+class RecipeNutrientTests(TestCase):
+    """A recipe's per-100g values are its ingredients' grams-weighted average, kept up to date."""
+
+    def setUp(self):
+        self.rice = make_food(name='Rice', calories='130.00', protein_per_100g=Decimal('2.70'))
+        self.dal = make_food(protein_per_100g=Decimal('9.00'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dal_chawal = Recipe.objects.create(food=make_food(name='Dal Chawal', calories='0'))
+            RecipeIngredient.objects.create(recipe=self.dal_chawal, food=self.rice, grams=Decimal('200'))
+            self.dal_ingredient = RecipeIngredient.objects.create(
+                recipe=self.dal_chawal, food=self.dal, grams=Decimal('100')
+            )
+            self.thali = Recipe.objects.create(food=make_food(name='Thali', calories='0'))
+            RecipeIngredient.objects.create(recipe=self.thali, food=self.dal_chawal.food, grams=Decimal('300'))
+            RecipeIngredient.objects.create(recipe=self.thali, food=self.rice, grams=Decimal('100'))
+
+    def per_100g(self, recipe):
+        food = Food.objects.get(pk=recipe.food_id)
+        return food.calories_per_100g, food.protein_per_100g
+
+    def test_rollup(self):
+        self.assertEqual(self.per_100g(self.dal_chawal), (Decimal('126.67'), Decimal('4.80')))
+        self.assertEqual(self.per_100g(self.thali), (Decimal('127.50'), Decimal('4.28')))
+
+    def test_food_change_propagates_through_nested_recipes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rice.calories_per_100g = Decimal('150.00')
+            self.rice.save()
+        self.assertEqual(self.per_100g(self.dal_chawal), (Decimal('140.00'), Decimal('4.80')))
+        self.assertEqual(self.per_100g(self.thali), (Decimal('142.50'), Decimal('4.28')))
+
+    def test_ingredient_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dal_ingredient.grams = Decimal('200')
+            self.dal_ingredient.save()
+        self.assertEqual(self.per_100g(self.dal_chawal), (Decimal('125.00'), Decimal('5.85')))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dal_ingredient.delete()
+        self.assertEqual(self.per_100g(self.dal_chawal), (Decimal('130.00'), Decimal('2.70')))
+        self.assertEqual(self.per_100g(self.thali), (Decimal('130.00'), Decimal('2.70')))
+
+    def test_logging_a_recipe(self):
+        user = User.objects.create_user('cook', password='secret')
+        log = DailyFoodLog.objects.create(
+            user=user, food=Food.objects.get(pk=self.dal_chawal.food_id), quantity=Decimal('250'), date=date(2024, 3, 1)
+        )
+        self.assertEqual((log.calories, log.protein), (Decimal('316.68'), Decimal('12.00')))
+
+
+class CalendarReportTests(TestCase):
+    """Reports list every bucket in the range, with zero totals where nothing was logged."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('reporter', password='secret')
+        for day, calories, entries in [
+            (date(2024, 1, 15), '1800', 2), (date(2024, 1, 20), '2200', 1),
+            (date(2024, 3, 5), '2300', 1), (date(2024, 3, 6), '1900', 1), (date(2024, 3, 10), '1000', 1),
+        ]:
+            DailyCalorieSummary.objects.create(
+                user=self.user, date=day, total_calories=Decimal(calories), entry_count=entries
+            )
+
+    def test_monthly_buckets_fill_gaps(self):
+        report = period_report(self.user, 'month', date(2024, 1, 10), date(2024, 4, 5), 2000)
+        self.assertEqual(report['start'], date(2024, 1, 1))
+        self.assertEqual(
+            [
+                (bucket['label'], bucket['days'], bucket['logged_days'], bucket['entry_count'],
+                 bucket['total_calories'], bucket['average_calories'], bucket['difference'])
+                for bucket in report['buckets']
+            ],
+            [
+                ('January 2024', 31, 2, 3, Decimal('4000.00'), Decimal('2000.00'), Decimal('-58000.00')),
+                ('February 2024', 29, 0, 0, Decimal('0.00'), None, Decimal('-58000.00')),
+                ('March 2024', 31, 3, 3, Decimal('5200.00'), Decimal('1733.33'), Decimal('-56800.00')),
+                ('April 2024', 5, 0, 0, Decimal('0.00'), None, Decimal('-10000.00')),
+            ]
+        )
+        self.assertEqual((report['total_calories'], report['logged_days']), (Decimal('9200.00'), 5))
+
+    def test_weekly_and_yearly_buckets(self):
+        weeks = period_report(self.user, 'week', date(2024, 1, 17), date(2024, 1, 28), 0)
+        self.assertEqual(
+            [(bucket['start'], bucket['end'], bucket['total_calories'], bucket['target']) for bucket in weeks['buckets']],
+            [
+                (date(2024, 1, 15), date(2024, 1, 21), Decimal('4000.00'), None),
+                (date(2024, 1, 22), date(2024, 1, 28), Decimal('0.00'), None),
+            ]
+        )
+        years = period_report(self.user, 'year', date(2023, 6, 1), date(2024, 12, 31), 0)
+        self.assertEqual(
+            [(bucket['label'], bucket['total_calories']) for bucket in years['buckets']],
+            [('2023', Decimal('0.00')), ('2024', Decimal('9200.00'))]
+        )
+
+    def test_heatmap_levels(self):
+        heatmap = calendar_heatmap(self.user, date(2024, 3, 10), 2000, days=7)
+        self.assertEqual(
+            [(weekday, cells[0]['level']) for weekday, cells in heatmap['rows']],
+            [('Mon', 0), ('Tue', 4), ('Wed', 3), ('Thu', 0), ('Fri', 0), ('Sat', 0), ('Sun', 2)]
+        )
+        self.assertEqual((heatmap['month_labels'], heatmap['logged_days']), (['Mar'], 3))
+
+    def test_view_lists_empty_buckets(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('tracker:calendar_report'), {'period': 'month', 'end': '2024-04-05', 'count': 4}
+        )
+        self.assertEqual(
+            [bucket['label'] for bucket in response.context['report']['buckets']],
+            ['January 2024', 'February 2024', 'March 2024', 'April 2024']
+        )
+
+
+class LogWriteBufferTests(TransactionTestCase):
+    """The write buffer commits entries from its own thread, so changes must really commit."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('buffered', password='secret')
+        self.food = make_food()
+
+    def test_single_entry_is_flushed_within_the_interval(self):
+        buffer = LogWriteBuffer(interval_ms=5, batch_size=500)
+        try:
+            log = DailyFoodLog(user=self.user, food=self.food, quantity=Decimal('150'), date=timezone.localdate())
+            log.set_nutrients()
+            start = time.monotonic()
+            buffer.add([log])
+            self.assertTrue(buffer.wait_for_user(self.user.id, timeout=1.0))
+            self.assertLess(time.monotonic() - start, 0.5)
+        finally:
+            buffer.shutdown()
+        self.assertEqual(DailyFoodLog.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(DailyFoodLog.objects.get(user=self.user).calories, Decimal('180.00'))
+
+    def test_failing_batch_does_not_stop_the_writer(self):
+        class FailingBuffer(LogWriteBuffer):
+            @staticmethod
+            def _write(logs):
+                if any(log.quantity == Decimal('13') for log in logs):
+                    raise ValueError('unlucky entry')
+                LogWriteBuffer._write(logs)
+
+        buffer = FailingBuffer(interval_ms=5, batch_size=500)
+        try:
+            bad, good = [
+                DailyFoodLog(user=self.user, food=self.food, quantity=quantity, date=timezone.localdate())
+                for quantity in [Decimal('13'), Decimal('150')]
+            ]
+            for log in [bad, good]:
+                log.set_nutrients()
+            with self.assertLogs('tracker.ingest', 'ERROR'):
+                buffer.add([bad, good])
+                self.assertTrue(buffer.wait_for_user(self.user.id, timeout=1.0))
+            self.assertTrue(buffer._thread.is_alive())
+
+            later = DailyFoodLog(user=self.user, food=self.food, quantity=Decimal('200'), date=timezone.localdate())
+            later.set_nutrients()
+            buffer.add([later])
+            self.assertTrue(buffer.wait_for_user(self.user.id, timeout=1.0))
+        finally:
+            buffer.shutdown()
+        self.assertEqual(
+            sorted(DailyFoodLog.objects.filter(user=self.user).values_list('quantity', flat=True)),
+            [Decimal('150.00'), Decimal('200.00')]
+        )
+
+    def test_dead_writer_is_restarted(self):
+        buffer = LogWriteBuffer(interval_ms=5, batch_size=500)
+        try:
+            # End the writer thread as if it had died
+            buffer.shutdown()
+            buffer._stopping = False
+            log = DailyFoodLog(user=self.user, food=self.food, quantity=Decimal('150'), date=timezone.localdate())
+            log.set_nutrients()
+            with self.assertLogs('tracker.ingest', 'ERROR'):
+                buffer.add([log])
+            self.assertTrue(buffer.wait_for_user(self.user.id, timeout=1.0))
+        finally:
+            buffer.shutdown()
+        self.assertEqual(DailyFoodLog.objects.filter(user=self.user).count(), 1)
+
+    def test_submit_rejects_unknown_food(self):
+        log = DailyFoodLog(user=self.user, food_id=999999, quantity=Decimal('100'), date=timezone.localdate())
+        with self.assertRaises(ValidationError):
+            submit_logs([log])
+        self.assertFalse(DailyFoodLog.objects.exists())
+
+
+@override_settings(TRACKER_QUERY_BUDGET_STRICT=True)
+class ReadViewQueryBudgetTests(TestCase):
+    """Every budgeted page and API stays within its query budget on a cold cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', password='secret')
+        make_profile(cls.user)
+        foods = [make_food(f'Food {i}') for i in range(5)]
+        today = timezone.localdate()
+        for day in range(30):
+            for food in foods[:day % 4 + 1]:
+                DailyFoodLog.objects.create(
+                    user=cls.user, food=food, quantity=Decimal('120'), date=today - timedelta(days=day)
+                )
+        cls.log = DailyFoodLog.objects.filter(user=cls.user).first()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def assert_ok(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def test_pages(self):
+        for url_name in [
+            'tracker:dashboard', 'tracker:profile', 'tracker:add_food', 'tracker:log_meal',
+            'tracker:history', 'tracker:weekly_summary', 'tracker:trends',
+            'tracker:calendar_report', 'tracker:calendar_heatmap',
+        ]:
+            with self.subTest(url_name):
+                self.assert_ok(reverse(url_name))
+
+    def test_reports(self):
+        for period in ('week', 'month', 'year'):
+            with self.subTest(period):
+                self.assert_ok(reverse('tracker:calendar_report') + f'?period={period}&count=10')
+
+    def test_delete_confirmation(self):
+        self.assert_ok(reverse('tracker:delete_log', args=[self.log.id]))
+
+    def test_apis(self):
+        for url in [
+            reverse('tracker:food_search') + '?q=food',
+            reverse('tracker:food_catalog', args=[get_catalog().asset().digest]),
+            reverse('tracker:log_history_api'),
+            reverse('tracker:trends_api'),
+            reverse('tracker:export_logs') + '?format=csv',
+            reverse('tracker:export_logs') + '?format=ndjson',
+        ]:
+            with self.subTest(url):
+                self.assert_ok(url)
+
+    async def test_async_pages(self):
+        for url_name in ('tracker:dashboard_async', 'tracker:weekly_summary_async'):
+            response = await self.async_client.get(reverse(url_name))
+            self.assertEqual(response.status_code, 200, url_name)
+
+
+@override_settings(TRACKER_QUERY_BUDGET_STRICT=True)
+class WriteViewQueryBudgetTests(TestCase):
+    """The write views stay within their query budgets, which raise in strict mode."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('writer', password='secret')
+        self.client.force_login(self.user)
+        self.foods = [make_food(f'Food {i}') for i in range(4)]
+        self.today = timezone.localdate()
+
+    def test_add_food_log(self):
+        response = self.client.post(reverse('tracker:add_food'), {
+            'food': self.foods[0].id, 'quantity': '150', 'date': self.today.isoformat(),
+        })
+        self.assertRedirects(response, reverse('tracker:dashboard'), fetch_redirect_response=False)
+        self.assertEqual(UserFoodScore.objects.get(user=self.user, food=self.foods[0]).log_count, 1)
+
+    def test_log_meal(self):
+        data = {
+            'date': self.today.isoformat(),
+            'items-TOTAL_FORMS': '4', 'items-INITIAL_FORMS': '0',
+            'items-MIN_NUM_FORMS': '1', 'items-MAX_NUM_FORMS': '1000',
+        }
+        for i, food in enumerate(self.foods):
+            data[f'items-{i}-food'] = food.id
+            data[f'items-{i}-quantity'] = '100'
+        response = self.client.post(reverse('tracker:log_meal'), data)
+        self.assertRedirects(response, reverse('tracker:dashboard'), fetch_redirect_response=False)
+        self.assertEqual(UserFoodScore.objects.filter(user=self.user).count(), 4)
+
+    def test_delete_food_log(self):
+        log = DailyFoodLog.objects.create(user=self.user, food=self.foods[0], quantity=Decimal('100'), date=self.today)
+        response = self.client.post(reverse('tracker:delete_log', args=[log.id]))
+        self.assertRedirects(response, reverse('tracker:dashboard'), fetch_redirect_response=False)
+        self.assertFalse(UserFoodScore.objects.filter(user=self.user).exists())
+
+
+class ConditionalGetTests(TestCase):
+    """ETags of the user's pages change with everything the pages show."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('conditional', password='secret')
+        make_profile(cls.user)
+        DailyFoodLog.objects.create(user=cls.user, food=make_food(), quantity=Decimal('100'), date=timezone.localdate())
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_not_modified(self):
+        etag = self.client.get(reverse('tracker:history'))['ETag']
+        response = self.client.get(reverse('tracker:history'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_change_updates_etag(self):
+        for url_name in ['tracker:dashboard', 'tracker:history', 'tracker:weekly_summary']:
+            with self.subTest(url_name):
+                etag = self.client.get(reverse(url_name))['ETag']
+                bump_catalog_version()
+                response = self.client.get(reverse(url_name), HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response['ETag'], etag)
+
+    def test_out_of_range_dates(self):
+        requests = [
+            ('tracker:calendar_report', {'period': period, 'end': end})
+            for period in ['week', 'month', 'year'] for end in ['0001-01-01', '9999-12-31']
+        ] + [('tracker:calendar_heatmap', {'end': end}) for end in ['0001-06-01', '9999-06-01']]
+        for url_name, params in requests:
+            with self.subTest(url_name, **params):
+                self.assertEqual(self.client.get(reverse(url_name), params).status_code, 400)
+        for url_name, params in [
+            ('tracker:calendar_report', {'period': 'year', 'end': '9998-12-31', 'count': 1}),
+            ('tracker:calendar_report', {'period': 'week', 'end': '0001-01-08', 'count': 2}),
+            ('tracker:calendar_heatmap', {'end': '9998-12-31'}),
+            ('tracker:calendar_heatmap', {'end': '0002-01-02'}),
+        ]:
+            with self.subTest(url_name, **params):
+                self.assertEqual(self.client.get(reverse(url_name), params).status_code, 200)
+
+    def test_catalog_change_updates_cached_pages(self):
+        food = Food.objects.get()
+        self.assertContains(self.client.get(reverse('tracker:dashboard')), 'Dal Tadka')
+        self.assertContains(self.client.get(reverse('tracker:history')), 'Dal Tadka')
+        # A bulk update sends no signals, so bump the version like load_indian_foods does
+        Food.objects.filter(pk=food.pk).update(name='Dal Fry')
+        bump_catalog_version()
+        self.assertContains(self.client.get(reverse('tracker:dashboard')), 'Dal Fry')
+        self.assertContains(self.client.get(reverse('tracker:history')), 'Dal Fry')
+
+
+class SharedCacheCheckTests(TestCase):
+    """Production settings must not keep cache versions per process."""
+
+    LOCMEM = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    FILE_BASED = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/tmp'}}
+
+    def test_per_process_cache_rejected(self):
+        with override_settings(CACHES=self.LOCMEM, TRACKER_REQUIRE_SHARED_CACHE=True):
+            with self.assertRaises(ImproperlyConfigured):
+                check_shared_cache()
+
+    def test_defaults_to_not_debug(self):
+        with override_settings(CACHES=self.LOCMEM, DEBUG=False):
+            del settings.TRACKER_REQUIRE_SHARED_CACHE
+            with self.assertRaises(ImproperlyConfigured):
+                check_shared_cache()
+
+    def test_allowed(self):
+        with override_settings(CACHES=self.LOCMEM, TRACKER_REQUIRE_SHARED_CACHE=False):
+            check_shared_cache()
+        with override_settings(CACHES=self.FILE_BASED, TRACKER_REQUIRE_SHARED_CACHE=True):
+            check_shared_cache()
+
+
+class RecipeDeletionTests(TestCase):
+    """Deleting a recipe deletes the Food it is logged as."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('cook', password='secret')
+        self.rice = make_food(name='Rice', calories='130.00')
+        self.recipe = Recipe.objects.create(food=make_food(name='Jeera Rice', calories='0'))
+        RecipeIngredient.objects.create(recipe=self.recipe, food=self.rice, grams=Decimal('200'))
+        DailyFoodLog.objects.create(
+            user=self.user, food=self.recipe.food, quantity=Decimal('150'), date=timezone.localdate()
+        )
+
+    def test_delete_recipe(self):
+        self.recipe.delete()
+        self.assertFalse(Food.objects.filter(name='Jeera Rice').exists())
+        self.assertFalse(DailyFoodLog.objects.filter(user=self.user).exists())
+        self.assertFalse(DailyCalorieSummary.objects.filter(user=self.user).exists())
+        self.assertTrue(Food.objects.filter(pk=self.rice.pk).exists())
+
+    def test_recipe_used_as_ingredient_is_kept(self):
+        thali = Recipe.objects.create(food=make_food(name='Thali', calories='0'))
+        RecipeIngredient.objects.create(recipe=thali, food=self.recipe.food, grams=Decimal('300'))
+        with self.assertRaises(ProtectedError), transaction.atomic():
+            self.recipe.delete()
+        self.assertTrue(Recipe.objects.filter(pk=self.recipe.pk).exists())
+        self.assertTrue(self.recipe.ingredients.exists())
+
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        url = reverse('admin:tracker_recipe_delete', args=[self.recipe.pk])
+        self.assertContains(self.client.get(url), 'protected related objects')
+        self.client.post(url, {'post': 'yes'})
+        self.assertTrue(Recipe.objects.filter(pk=self.recipe.pk).exists())
+
+    def test_admin_delete(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        url = reverse('admin:tracker_recipe_delete', args=[self.recipe.pk])
+        self.assertContains(self.client.get(url), 'Jeera Rice')
+        self.client.post(url, {'post': 'yes'})
+        self.assertFalse(Food.objects.filter(name='Jeera Rice').exists())
+
+    def test_admin_delete_selected(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='secret'))
+        self.client.post(reverse('admin:tracker_recipe_changelist'), {
+            'action': 'delete_selected', '_selected_action': [self.recipe.pk], 'post': 'yes',
+        })
+        self.assertFalse(Food.objects.filter(name='Jeera Rice').exists())
+        self.assertFalse(Recipe.objects.exists())
+
+
+class DerivedRowsAdminTests(TestCase):
+    """Rows maintained from the food logs are read-only in the admin but go with their user or food."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser('admin', password='secret')
+        cls.user = User.objects.create_user('logger', password='secret')
+        cls.food = make_food()
+        DailyFoodLog.objects.create(user=cls.user, food=cls.food, quantity=Decimal('100'), date=timezone.localdate())
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def test_summary_cannot_be_deleted(self):
+        summary = DailyCalorieSummary.objects.get(user=self.user)
+        url = reverse('admin:tracker_dailycaloriesummary_delete', args=[summary.pk])
+        self.assertEqual(self.client.post(url, {'post': 'yes'}).status_code, 403)
+        response = self.client.get(reverse('admin:tracker_dailycaloriesummary_changelist'))
+        self.assertNotContains(response, 'value="delete_selected"')
+        self.assertTrue(DailyCalorieSummary.objects.filter(pk=summary.pk).exists())
+
+    def test_score_cannot_be_deleted(self):
+        score = UserFoodScore.objects.get(user=self.user)
+        url = reverse('admin:tracker_userfoodscore_delete', args=[score.pk])
+        self.assertEqual(self.client.post(url, {'post': 'yes'}).status_code, 403)
+        response = self.client.get(reverse('admin:tracker_userfoodscore_changelist'))
+        self.assertNotContains(response, 'value="delete_selected"')
+        self.assertTrue(UserFoodScore.objects.filter(pk=score.pk).exists())
+
+    def test_delete_user(self):
+        self.client.post(reverse('admin:auth_user_delete', args=[self.user.pk]), {'post': 'yes'})
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(DailyCalorieSummary.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(UserFoodScore.objects.filter(user_id=self.user.pk).exists())
+
+    def test_delete_food(self):
+        self.client.post(reverse('admin:tracker_food_delete', args=[self.food.pk]), {'post': 'yes'})
+        self.assertFalse(Food.objects.filter(pk=self.food.pk).exists())
+        self.assertFalse(UserFoodScore.objects.filter(food_id=self.food.pk).exists())
+
+
+class UserFoodScoreTests(TestCase):
+    """Quick-pick scores stay finite and exact for any entry date."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('scorer', password='secret')
+        make_profile(cls.user)
+        cls.dal = make_food()
+        cls.rice = make_food(name='Rice', calories='130.00')
+
+    def log(self, food, day):
+        return DailyFoodLog.objects.create(user=self.user, food=food, quantity=Decimal('100'), date=day)
+
+    def test_far_future_date(self):
+        self.log(self.dal, date(9999, 12, 31))
+        score = UserFoodScore.objects.get(user=self.user, food=self.dal)
+        self.assertAlmostEqual(score.score, UserFoodScore.log_weight(date(9999, 12, 31)))
+        self.assertEqual(UserFoodScore.top_food_ids(self.user, 8), [self.dal.id])
+
+    def test_form_rejects_far_future_date(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('tracker:add_food'), {
+            'food': self.dal.id, 'quantity': '100', 'date': '2110-01-01',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'date', 'Entries can be logged at most 365 days ahead.')
+        self.assertFalse(DailyFoodLog.objects.exists())
+
+    def test_add_then_delete_keeps_older_entries(self):
+        self.log(self.dal, date(2020, 1, 2))
+        self.log(self.rice, date(2020, 1, 1))
+        recent = self.log(self.dal, timezone.localdate())
+        recent.delete()
+        score = UserFoodScore.objects.get(user=self.user, food=self.dal)
+        self.assertEqual(score.log_count, 1)
+        self.assertAlmostEqual(score.score, UserFoodScore.log_weight(date(2020, 1, 2)))
+        self.assertEqual(UserFoodScore.top_food_ids(self.user, 8), [self.dal.id, self.rice.id])
+
+    def test_move_and_rebuild_match_incremental_scores(self):
+        log = self.log(self.dal, date(2024, 5, 1))
+        self.log(self.dal, date(2024, 5, 3))
+        log.food = self.rice
+        log.save()
+        incremental = dict(UserFoodScore.objects.values_list('food_id', 'score'))
+        UserFoodScore.rebuild([self.user.id])
+        rebuilt = dict(UserFoodScore.objects.values_list('food_id', 'score'))
+        self.assertEqual(incremental.keys(), rebuilt.keys())
+        for food_id, score in rebuilt.items():
+            self.assertAlmostEqual(incremental[food_id], score)
+
+
+class ImportFoodLogsTests(TestCase):
+    """import_food_logs skips bad rows and keeps summaries and scores in sync."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('importer', password='secret')
+        make_food()
+
+    def write_csv(self, rows):
+        handle, path = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(handle, 'w', newline='') as f:
+            f.write('date,food,quantity\n')
+            f.writelines(f'{day},{food},{quantity}\n' for day, food, quantity in rows)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_bad_rows_are_skipped(self):
+        path = self.write_csv([
+            ('2024-03-01', 'Dal Tadka', '100'),
+            ('2024-03-01', 'Dal Tadka', 'NaN'),
+            ('2024-03-01', 'Dal Tadka', 'Infinity'),
+            ('2024-03-01', 'Dal Tadka', '1e30'),
+            ('2024-03-01', 'Dal Tadka', '100000'),
+            ('2024-03-01', 'Dal Tadka', '-5'),
+            ('2024-03-01', 'Dal Tadka', '0.001'),
+            ('2024-03-01', 'Dal Tadka', 'lots'),
+            ('2024-02-30', 'Dal Tadka', '100'),
+            ('2024-03-02', 'Unknown Food', '100'),
+            ('2024-03-02', 'dal tadka', '50.5'),
+        ])
+        output = StringIO()
+        call_command('import_food_logs', path, user='importer', stdout=output)
+        self.assertIn('Imported 2 food logs, skipped 9 rows', output.getvalue())
+        self.assertEqual(
+            sorted(DailyFoodLog.objects.filter(user=self.user).values_list('date', 'calories')),
+            [(date(2024, 3, 1), Decimal('120.00')), (date(2024, 3, 2), Decimal('60.60'))]
+        )
+        self.assertEqual(DailyCalorieSummary.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(UserFoodScore.objects.get(user=self.user).log_count, 2)
+
+    def test_failed_import_rebuilds_committed_batches(self):
+        path = self.write_csv([('2024-03-01', 'Dal Tadka', '100'), ('2024-03-02', 'Dal Tadka', '100')])
+        with self.assertRaises(CommandError):
+            call_command('import_food_logs', path, '/nonexistent.csv', user='importer', batch_size=1, stdout=StringIO())
+        self.assertEqual(DailyFoodLog.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(DailyCalorieSummary.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(UserFoodScore.objects.get(user=self.user).log_count, 2)
+
+
+class BackfillLogMacrosTests(TestCase):
+    """backfill_log_macros fills in the macronutrients of entries saved without them."""
+
+    def test_legacy_entries_are_backfilled(self):
+        user = User.objects.create_user('legacy', password='secret')
+        dal = make_food(protein_per_100g=Decimal('9.00'), carbs_per_100g=Decimal('15.50'))
+        water = make_food('Water', calories='0.00')
+        day = date(2024, 3, 1)
+        legacy = DailyFoodLog.objects.create(user=user, food=dal, quantity=Decimal('150'), date=day)
+        DailyFoodLog.objects.create(user=user, food=water, quantity=Decimal('250'), date=day)
+        # As saved before macronutrients were stored, with since-changed calories
+        DailyFoodLog.objects.filter(pk=legacy.pk).update(calories=Decimal('170.00'), protein=0, carbs=0, fat=0, fibre=0)
+        DailyCalorieSummary.rebuild([user.id])
+
+        output = StringIO()
+        call_command('backfill_log_macros', batch_size=1, stdout=output)
+        self.assertIn('Backfilled macronutrients of 1 food logs', output.getvalue())
+        legacy.refresh_from_db()
+        self.assertEqual(
+            (legacy.calories, legacy.protein, legacy.carbs, legacy.fat),
+            (Decimal('170.00'), Decimal('13.50'), Decimal('23.25'), Decimal('0.00'))
+        )
+        summary = DailyCalorieSummary.objects.get(user=user, date=day)
+        self.assertEqual((summary.total_protein, summary.total_carbs), (Decimal('13.50'), Decimal('23.25')))
+
+    def test_unknown_user(self):
+        with self.assertRaises(CommandError):
+            call_command('backfill_log_macros', usernames=['nobody'], stdout=StringIO())
+
+
+class PerformanceMiddlewareTests(TestCase):
+    """Server-Timing counts the queries of sync and async views alike."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('timed', password='secret')
+        make_profile(self.user)
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def test_sync_view_queries_are_counted(self):
+        response = self.client.get(reverse('tracker:weekly_summary'))
+        self.assertGreater(server_timing_queries(response), 0)
+
+    async def test_async_view_queries_are_counted(self):
+        for url_name in ('tracker:dashboard_async', 'tracker:weekly_summary_async'):
+            response = await self.async_client.get(reverse(url_name))
+            self.assertEqual(response.status_code, 200)
+            self.assertGreater(server_timing_queries(response), 0)
+
+
+class RenderTimerTests(unittest.TestCase):
+    """Render timers nest: every active timer sees the render time."""
+
+    def test_nested_timers_both_count_render(self):
+        template = Template('{% for i in items %}{{ i }}{% endfor %}')
+        with RenderTimer() as outer:
+            with RenderTimer() as inner:
+                template.render(Context({'items': range(1000)}))
+        self.assertGreater(inner.duration, 0)
+        self.assertGreaterEqual(outer.duration, inner.duration)
+        self.assertEqual((outer.depth, inner.depth), (0, 0))
+
+
+@override_settings(TRACKER_QUERY_BUDGET_STRICT=True)
+class AsyncQueryBudgetTests(TestCase):
+    """Budgets on async views see queries run by the async ORM in worker threads."""
+
+    async def test_async_view_over_budget_raises(self):
+        @query_budget(max_queries=0)
+        async def view(request):
+            await Food.objects.acount()
+
+        with self.assertRaises(QueryBudgetExceeded):
+            await view(RequestFactory().get('/'))
+
+    async def test_async_view_within_budget(self):
+        @query_budget(max_queries=1)
+        async def view(request):
+            return await Food.objects.acount()
+
+        self.assertEqual(await view(RequestFactory().get('/')), 0)
+
+
+@override_settings(TRACKER_QUERY_BUDGET_STRICT=True)
+class StreamingQueryBudgetTests(TestCase):
+    """Budgets on streaming views count the queries run while the body is produced."""
+
+    def streaming_view(self, max_queries):
+        @query_budget(max_queries=max_queries)
+        def view(request):
+            def stream():
+                yield str(Food.objects.count())
+                yield str(Food.objects.count())
+            return StreamingHttpResponse(stream())
+        return view
+
+    def test_over_budget_raises_while_streaming(self):
+        response = self.streaming_view(max_queries=1)(RequestFactory().get('/'))
+        with self.assertRaises(QueryBudgetExceeded):
+            b''.join(response.streaming_content)
+
+    def test_within_budget(self):
+        response = self.streaming_view(max_queries=2)(RequestFactory().get('/'))
+        self.assertEqual(b''.join(response.streaming_content), b'00')
+
+
+def query_plan(sql, params=()):
+    """Return the steps of SQLite's EXPLAIN QUERY PLAN for a query."""
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite syntax')
+class QueryPlanTests(TestCase):
+    """The food log indexes serve the queries they were added for, and no page scans the log tables."""
+
+    # Pages whose queries are checked: (url name, query string)
+    CHECKED_PAGES = [
+        ('tracker:dashboard', ''),
+        ('tracker:history', ''),
+        ('tracker:weekly_summary', ''),
+        ('tracker:add_food', ''),
+        ('tracker:log_meal', ''),
+        ('tracker:export_logs', '?format=csv'),
+        ('tracker:log_history_api', ''),
+        ('tracker:calendar_report', '?period=year&count=10'),
+        ('tracker:calendar_heatmap', ''),
+    ]
+
+    # Tables that grow with user history and must never be scanned
+    CHECKED_TABLES = ['tracker_dailyfoodlog', 'tracker_dailycaloriesummary', 'tracker_userfoodscore']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('planned', password='secret')
+        make_profile(cls.user)
+        cls.food = make_food()
+        cls.today = timezone.localdate()
+        for day in range(10):
+            DailyFoodLog.objects.create(
+                user=cls.user, food=cls.food, quantity=Decimal('100'), date=cls.today - timedelta(days=day)
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_uses_index(self, queryset, index_name):
+        sql, params = queryset.query.sql_with_params()
+        plan = query_plan(sql, params)
+        self.assertTrue(any(index_name in step for step in plan), plan)
+
+    def test_daily_totals_use_date_index(self):
+        self.assert_uses_index(
+            DailyFoodLog.objects.filter(user=self.user, date=self.today)
+            .values('user').annotate(**DailyCalorieSummary.totals_aggregates()),
+            'INDEX tracker_log_user_date_cal_idx'
+        )
+
+    def test_recent_entries_use_created_index(self):
+        self.assert_uses_index(
+            DailyFoodLog.objects.filter(user=self.user).order_by('-created_at')[:5],
+            'tracker_log_user_created_idx'
+        )
+
+    def test_history_page_uses_keyset_index(self):
+        self.assert_uses_index(
+            DailyFoodLog.objects.filter(user=self.user).order_by('-date', '-created_at', '-id')[:51],
+            'tracker_log_user_keyset_idx'
+        )
+
+    def test_quick_picks_use_rank_index(self):
+        self.assert_uses_index(
+            UserFoodScore.objects.filter(user=self.user).order_by('-score').values('food_id')[:8],
+            'tracker_score_user_rank_idx'
+        )
+
+    def test_pages_do_not_scan_log_tables(self):
+        self.client.force_login(self.user)
+        for url_name, query_string in self.CHECKED_PAGES:
+            url = reverse(url_name) + query_string
+            with self.subTest(url), CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                for query in context.captured_queries:
+                    sql = query['sql']
+                    if not sql.startswith('SELECT') or not any(table in sql for table in self.CHECKED_TABLES):
+                        continue
+                    plan = query_plan(sql)
+                    scans = [
+                        step for step in plan
+                        if step.startswith('SCAN') and 'INDEX' not in step
+                        and step.split()[1] in self.CHECKED_TABLES
+                    ]
+                    self.assertEqual(scans, [], f'{sql}\n' + '\n'.join(plan))
+
+
+class ConcurrentWriteTests(TransactionTestCase):
+    """Concurrent food log writes and reads never fail with "database is locked"."""
+
+    THREADS = 4
+    WRITES = 10
+    READERS = 2
+
+    def test_no_lock_errors(self):
+        user = User.objects.create_user('writer', password='secret')
+        food_ids = [make_food(name=f'Food {n}').id for n in range(3)]
+        today = timezone.localdate()
+        lock = threading.Lock()
+        writing = threading.Event()
+        writing.set()
+        kept, errors = [], []
+
+        def record(error):
+            with lock:
+                errors.append(str(error))
+
+        # Every writer adds logs and deletes every other one again, like
+        # concurrent add_food_log / delete_food_log traffic; each save also
+        # refreshes the day's summary in the same transaction
+        def writer(thread_number):
+            try:
+                for i in range(self.WRITES):
+                    try:
+                        log = DailyFoodLog(
+                            user=user, food_id=food_ids[(thread_number + i) % len(food_ids)],
+                            quantity=Decimal('100'), date=today
+                        )
+                        log.save()
+                        if i % 2:
+                            log.delete()
+                        else:
+                            with lock:
+                                kept.append(log.id)
+                    except OperationalError as e:
+                        record(e)
+            finally:
+                connection.close()
+
+        def reader():
+            try:
+                while writing.is_set():
+                    try:
+                        logs = DailyFoodLog.objects.filter(user=user)
+                        logs.filter(date=today).aggregate(total=Sum('calories'))
+                        list(logs.select_related('food').order_by('-created_at')[:5])
+                    except OperationalError as e:
+                        record(e)
+            finally:
+                connection.close()
+
+        writers = [threading.Thread(target=writer, args=(n,)) for n in range(self.THREADS)]
+        readers = [threading.Thread(target=reader) for _ in range(self.READERS)]
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        writing.clear()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual([error for error in errors if 'locked' in error], [])
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(DailyFoodLog.objects.filter(user=user).values_list('id', flat=True)), sorted(kept))
+        self.assertEqual(DailyCalorieSummary.objects.get(user=user, date=today).entry_count, len(kept))
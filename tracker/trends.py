@@ -0,0 +1,128 @@
+"""
+Long-range calorie trend analytics.
+
+A user's per-day totals for the whole requested range are read in a single
+query and laid out as dense NumPy arrays (one slot per calendar day), so
+rolling averages, target adherence, streaks and weekday patterns are
+computed with array operations rather than Python loops over days.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from .models import DailyCalorieSummary
+
+
+# Rolling average window lengths in days
+ROLLING_WINDOWS = (7, 30, 90)
+
+# A logged day is on target when within this fraction of the daily target
+ADHERENCE_TOLERANCE = 0.10
+
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def load_daily_totals(user, start_date, end_date):
+    """
+    Return (totals, logged) arrays with one slot per day from start_date to
+    end_date inclusive: the day's calories (0 if nothing was logged) and
+    whether anything was logged that day.
+    """
+    rows = DailyCalorieSummary.objects.filter(
+        user=user,
+        date__range=[start_date, end_date]
+    ).values_list('date', 'total_calories')
+
+    days = (end_date - start_date).days + 1
+    totals = np.zeros(days)
+    logged = np.zeros(days, dtype=bool)
+
+    rows = list(rows)
+    if rows:
+        dates, values = zip(*rows)
+        offsets = np.array([d.toordinal() for d in dates]) - start_date.toordinal()
+        totals[offsets] = np.array(values, dtype=float)
+        logged[offsets] = True
+    return totals, logged
+
+
+def rolling_average(totals, logged, window):
+    """
+    Average calories over the logged days in each trailing window, NaN where
+    the window contains no logged days. Computed from cumulative sums.
+    """
+    sums = np.cumsum(np.r_[0.0, totals])
+    counts = np.cumsum(np.r_[0, logged.astype(int)])
+    ends = np.arange(1, len(totals) + 1)
+    starts = np.maximum(ends - window, 0)
+    window_sums = sums[ends] - sums[starts]
+    window_counts = counts[ends] - counts[starts]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+
+def run_lengths(mask):
+    """Return (starts, lengths) of every run of consecutive True values."""
+    edges = np.flatnonzero(np.diff(np.r_[0, mask.astype(np.int8), 0]))
+    starts, ends = edges[::2], edges[1::2]
+    return starts, ends - starts
+
+
+def _rounded(values):
+    """Convert an array to a JSON-friendly list, mapping NaN to None."""
+    return [None if np.isnan(v) else round(float(v), 1) for v in values]
+
+
+def compute_trends(user, start_date, end_date, daily_target):
+    """
+    Compute trend analytics for a user between two dates (inclusive).
+    daily_target may be 0 when the user has no profile, in which case the
+    adherence and streak figures are omitted (None).
+    """
+    totals, logged = load_daily_totals(user, start_date, end_date)
+    days = len(totals)
+    logged_days = int(logged.sum())
+
+    rolling = {
+        f'{window}d': _rounded(rolling_average(totals, logged, window))
+        for window in ROLLING_WINDOWS
+    }
+
+    adherence = None
+    if daily_target > 0:
+        on_target = logged & (np.abs(totals - daily_target) <= daily_target * ADHERENCE_TOLERANCE)
+        over_target = logged & (totals > daily_target * (1 + ADHERENCE_TOLERANCE))
+        starts, lengths = run_lengths(on_target)
+        longest = int(lengths.max()) if len(lengths) else 0
+        longest_start = start_date + timedelta(days=int(starts[lengths.argmax()])) if longest else None
+        current = int(lengths[-1]) if len(lengths) and starts[-1] + lengths[-1] == days else 0
+        adherence = {
+            'daily_target': round(float(daily_target), 2),
+            'tolerance': ADHERENCE_TOLERANCE,
+            'on_target_days': int(on_target.sum()),
+            'over_target_days': int(over_target.sum()),
+            'on_target_rate': round(float(on_target.sum()) / logged_days, 3) if logged_days else None,
+            'longest_streak': longest,
+            'longest_streak_start': longest_start.isoformat() if longest_start else None,
+            'current_streak': current,
+        }
+
+    weekdays = (start_date.weekday() + np.arange(days)) % 7
+    weekday_totals = np.bincount(weekdays[logged], weights=totals[logged], minlength=7)
+    weekday_counts = np.bincount(weekdays[logged], minlength=7)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        weekday_averages = np.where(weekday_counts > 0, weekday_totals / weekday_counts, np.nan)
+
+    return {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'days': days,
+        'logged_days': logged_days,
+        'average_calories': round(float(totals[logged].mean()), 1) if logged_days else None,
+        'rolling_averages': rolling,
+        'adherence': adherence,
+        'weekdays': [
+            {'weekday': name, 'average_calories': average, 'logged_days': int(count)}
+            for name, average, count in zip(WEEKDAY_NAMES, _rounded(weekday_averages), weekday_counts)
+        ],
+    }
@@ -14,13 +14,27 @@ urlpatterns = [
     
     # Dashboard and main features
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/async/', views.dashboard_async, name='dashboard_async'),
     path('profile/', views.profile_view, name='profile'),
     
     # Food logging
     path('add-food/', views.add_food_log, name='add_food'),
+    path('log-meal/', views.log_meal, name='log_meal'),
     path('delete-log/<int:log_id>/', views.delete_food_log, name='delete_log'),
+    path('api/foods/search/', views.food_search, name='food_search'),
+    path('api/foods/catalog/<str:digest>.json', views.food_catalog, name='food_catalog'),
     
     # History and reports
     path('history/', views.history, name='history'),
     path('weekly-summary/', views.weekly_summary, name='weekly_summary'),
+    path('weekly-summary/async/', views.weekly_summary_async, name='weekly_summary_async'),
+    path('trends/', views.trends, name='trends'),
+    path('api/trends/', views.trends_api, name='trends_api'),
+    path('reports/', views.calendar_report, name='calendar_report'),
+    path('reports/heatmap/', views.calendar_heatmap_view, name='calendar_heatmap'),
+    path('export/', views.export_logs, name='export_logs'),
+    path('api/logs/', views.log_history_api, name='log_history_api'),
+    
+    # Monitoring
+    path('metrics/', views.metrics, name='metrics'),
 ]
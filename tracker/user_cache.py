@@ -0,0 +1,124 @@
+"""
+Per-user caching of dashboard and history data.
+
+Each user has a data version stored in the Django cache. It is bumped
+whenever one of their DailyFoodLog entries or their UserProfile is written,
+and every cached value or template fragment for that user includes the
+version in its key, so a bump makes all of them unreachable at once and the
+old entries simply expire. Keys also include the food catalog version,
+since pages show food names and categories. The time of the last bump is kept alongside for
+HTTP Last-Modified headers. Only the cache API common to every backend is
+used, so any backend works, but versions must live in a cache shared by
+every worker process (file-based, Redis, Memcached, database): with a
+per-process cache a write bumps the version in one worker only and the
+others keep serving stale pages. check_shared_cache() enforces this
+outside of DEBUG.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.middleware.csrf import get_token
+
+
+USER_DATA_VERSION_KEY = 'tracker:user_data_version:{user_id}'
+USER_DATA_MODIFIED_KEY = 'tracker:user_data_modified:{user_id}'
+
+# Seconds cached data and fragments live for; a version bump invalidates them sooner
+DEFAULT_FRAGMENT_TIMEOUT = 600
+
+# Cache backends whose contents are not shared between worker processes
+PER_PROCESS_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def check_shared_cache():
+    """
+    Raise ImproperlyConfigured if the default cache is per process while
+    settings.TRACKER_REQUIRE_SHARED_CACHE is True (defaults to not DEBUG).
+    """
+    if not getattr(settings, 'TRACKER_REQUIRE_SHARED_CACHE', not settings.DEBUG):
+        return
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in PER_PROCESS_CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f'The default cache ({backend}) is not shared between worker processes, so cache '
+            'invalidation would only reach one of them. Configure a shared cache backend or set '
+            'TRACKER_REQUIRE_SHARED_CACHE = False for a single-process deployment.'
+        )
+
+
+def get_fragment_timeout():
+    """Return the lifetime of cached per-user data and template fragments."""
+    return getattr(settings, 'TRACKER_FRAGMENT_CACHE_TIMEOUT', DEFAULT_FRAGMENT_TIMEOUT)
+
+
+def get_user_data_version(user_id):
+    """Return the user's current data version, initialising it if the cache is empty."""
+    key = USER_DATA_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed with the clock rather than 1 so a version lost to eviction
+        # never comes back to a value older fragments were cached under
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key, 0)
+    return version
+
+
+def get_user_data_modified(user_id):
+    """
+    Return the Unix timestamp of the user's last data change. If the cache
+    lost it, the current time is recorded, which only costs clients one
+    full response.
+    """
+    key = USER_DATA_MODIFIED_KEY.format(user_id=user_id)
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, time.time(), timeout=None)
+        modified = cache.get(key, time.time())
+    return modified
+
+
+def bump_user_data_version(user_id):
+    """Invalidate every cached value and fragment for a user."""
+    key = USER_DATA_VERSION_KEY.format(user_id=user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+    cache.set(USER_DATA_MODIFIED_KEY.format(user_id=user_id), time.time(), timeout=None)
+
+
+def get_or_set_user_data(user_id, name, compute, *parts):
+    """
+    Return a cached value for the user's current data version and the food
+    catalog version, calling compute() and caching its result on a miss.
+    Extra parts (e.g. the requested date) are added to the key.
+    """
+    # Imported here: catalog imports models, which import this module
+    from .catalog import get_catalog_version
+
+    versions = [get_user_data_version(user_id), get_catalog_version()]
+    key = ':'.join(['tracker', name, str(user_id)] + [str(part) for part in versions + list(parts)])
+    data = cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, get_fragment_timeout())
+    return data
+
+
+def csrf_fragment_key(request):
+    """
+    Return a short digest of the request's CSRF secret.
+
+    Fragments containing {% csrf_token %} must vary on it: any masked token
+    of the same secret is accepted, but one cached before the secret was
+    rotated (e.g. at login) would be rejected.
+    """
+    get_token(request)
+    secret = request.META.get('CSRF_COOKIE', '')
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
@@ -1,13 +1,60 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.utils import timezone
-from django.db.models import Sum, Q, Count
-from django.http import JsonResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.db.models import Q
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from datetime import datetime, timedelta
-from .models import UserProfile, Food, DailyFoodLog
-from .forms import UserRegistrationForm, UserProfileForm, FoodLogForm, LoginForm
+from decimal import Decimal
+import asyncio
+import base64
+import binascii
+import csv
+import json
+import re
+from .models import UserProfile, Food, DailyFoodLog, DailyCalorieSummary, UserFoodScore, MACRONUTRIENTS
+from .forms import UserRegistrationForm, UserProfileForm, FoodLogForm, MealLogForm, MealItemFormSet, LoginForm
+from .catalog import get_catalog, get_catalog_version
+from .decorators import async_login_required, query_budget, read_your_writes, user_data_conditional
+from .fields import TWO_PLACES
+from .ingest import buffered_log_writes_enabled, submit_logs
+from .metrics import render_metrics
+from .search import search_foods
+from .reports import HEATMAP_DAYS, PERIODS, add_periods, bucket_start, calendar_heatmap, period_report
+from .trends import ROLLING_WINDOWS, compute_trends
+from .user_cache import csrf_fragment_key, get_fragment_timeout, get_or_set_user_data, get_user_data_version
+
+# Upper bound on results returned by the food search endpoint
+FOOD_SEARCH_MAX_LIMIT = 50
+
+# Foods offered as one-click quick picks on the add-food page
+QUICK_PICK_COUNT = 8
+
+# Browser cache lifetime of the content-hashed catalog asset (one year)
+CATALOG_ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+# Rows fetched per database round trip when streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = ['date', 'food', 'category', 'quantity', 'calories']
+
+# Entries per page of the log history API
+LOG_API_PAGE_SIZE = 50
+
+# Default and maximum number of days covered by the trends page and API
+TRENDS_DEFAULT_DAYS = 365
+TRENDS_MAX_DAYS = 3660
+
+# Buckets shown by default on the calendar report for each period, and the most allowed
+REPORT_DEFAULT_BUCKETS = {'week': 13, 'month': 12, 'year': 5}
+REPORT_MAX_BUCKETS = 120
 
 
 def home(request):
@@ -94,71 +141,85 @@ def user_logout(request):
     return redirect('tracker:login')
 
 
+def _calorie_progress(calorie_target, calories_consumed):
+    """Return the dashboard's goal, consumed, remaining and percentage figures as Decimals."""
+    # Get daily calorie target
+    calorie_target = Decimal(str(calorie_target or 0)).quantize(TWO_PLACES)
+    calories_consumed = Decimal(calories_consumed).quantize(TWO_PLACES)
+    
+    # Calculate remaining calories
+    remaining_calories = calorie_target - calories_consumed
+    remaining_calories = max(Decimal('0.00'), remaining_calories)  # Don't show negative
+    
+    # Calculate percentage
+    percentage = (calories_consumed * 100 / calorie_target) if calorie_target > 0 else Decimal('0')
+    percentage = min(Decimal('100'), percentage)  # Cap at 100%
+    
+    return {
+        'calorie_target': calorie_target,
+        'calories_consumed': calories_consumed,
+        'remaining_calories': remaining_calories,
+        'percentage': percentage.quantize(Decimal('0.1')),
+    }
+
+
 @login_required
+@read_your_writes
+@user_data_conditional(lambda request: timezone.now().date())
+@query_budget(max_queries=6, max_db_ms=250)
 def dashboard(request):
     """
     Main dashboard showing daily calorie goal, consumed, and remaining calories.
     """
     user = request.user
     
-    # Get or create user profile
-    try:
-        profile = user.profile
-    except UserProfile.DoesNotExist:
-        messages.warning(request, 'Please complete your profile to see calorie goals.')
-        return redirect('tracker:profile')
-    
     # Get today's date
     today = timezone.now().date()
     
-    # Get today's food logs
-    today_logs = DailyFoodLog.objects.filter(user=user, date=today)
-    
-    # Calculate total calories consumed today
-    total_calories_consumed = today_logs.aggregate(
-        total=Sum('calories')
-    )['total'] or 0
-    
-    # Get daily calorie target
-    calorie_target = float(profile.daily_calorie_target)
-    total_calories_consumed = float(total_calories_consumed)
-    
-    # Calculate remaining calories
-    remaining_calories = calorie_target - total_calories_consumed
-    remaining_calories = max(0, remaining_calories)  # Don't show negative
-    
-    # Calculate percentage
-    percentage = (total_calories_consumed / calorie_target * 100) if calorie_target > 0 else 0
-    percentage = min(100, percentage)  # Cap at 100%
-    
-    # Get recent food logs (last 5 entries)
-    recent_logs = DailyFoodLog.objects.filter(user=user).order_by('-created_at')[:5]
-    
-    # Get weekly summary (last 7 days)
-    week_start = today - timedelta(days=6)
-    weekly_logs = DailyFoodLog.objects.filter(
-        user=user,
-        date__range=[week_start, today]
-    ).values('date').annotate(
-        total_calories=Sum('calories')
-    ).order_by('date')
+    def compute_stats():
+        try:
+            profile = user.profile
+        except UserProfile.DoesNotExist:
+            return {'has_profile': False}
+        
+        # Today's calorie and macronutrient totals, read from one summary row
+        totals = DailyFoodLog.get_daily_totals(user, today)
+        
+        # Get weekly summary (last 7 days)
+        week_start = today - timedelta(days=6)
+        weekly_logs = DailyFoodLog.get_weekly_summary(user, week_start, today)
+        
+        return {
+            'has_profile': True,
+            **_calorie_progress(profile.daily_calorie_target, totals['calories']),
+            'macros': {name: totals[name] for name in MACRONUTRIENTS},
+            'weekly_logs': list(weekly_logs),
+        }
+    
+    # Figures are cached per user data version, so repeat views skip the queries
+    stats = get_or_set_user_data(user.id, 'dashboard', compute_stats, today)
+    if not stats['has_profile']:
+        messages.warning(request, 'Please complete your profile to see calorie goals.')
+        return redirect('tracker:profile')
     
+    # Querysets stay lazy and only run when their cached fragment is missing
     context = {
-        'profile': profile,
-        'calorie_target': round(calorie_target, 2),
-        'calories_consumed': round(total_calories_consumed, 2),
-        'remaining_calories': round(remaining_calories, 2),
-        'percentage': round(percentage, 1),
-        'today_logs': today_logs,
-        'recent_logs': recent_logs,
-        'weekly_logs': list(weekly_logs),
+        **stats,
+        'profile': SimpleLazyObject(lambda: user.profile),
+        'today_logs': DailyFoodLog.objects.filter(user=user, date=today).select_related('food'),
+        'recent_logs': DailyFoodLog.objects.filter(user=user).select_related('food').order_by('-created_at')[:5],
         'today': today,
+        'data_version': get_user_data_version(user.id),
+        'catalog_version': get_catalog_version(),
+        'fragment_timeout': get_fragment_timeout(),
+        'csrf_key': csrf_fragment_key(request),
     }
     
     return render(request, 'tracker/dashboard.html', context)
 
 
 @login_required
+@query_budget(max_queries=8)
 def profile_view(request):
     """
     View and update user profile.
@@ -188,51 +249,261 @@ def profile_view(request):
 
 
 @login_required
+@query_budget(max_queries=12)
 def add_food_log(request):
     """
     Add food log entry for the day.
     """
-    # Check if foods exist in database
-    foods_count = Food.objects.count()
+    # Check if foods exist in the catalog
+    catalog = get_catalog()
+    foods_count = len(catalog)
     
     if request.method == 'POST':
         form = FoodLogForm(request.POST)
         if form.is_valid():
             food_log = form.save(commit=False)
             food_log.user = request.user
-            food_log.save()
-            messages.success(
-                request, 
-                f'Added {food_log.food.name} ({food_log.quantity}g) - {food_log.calories} calories'
-            )
-            return redirect('tracker:dashboard')
+            try:
+                if buffered_log_writes_enabled():
+                    submit_logs([food_log])
+                else:
+                    food_log.save()
+            except ValidationError as e:
+                # The food was deleted after the form was validated
+                form.add_error('food', e)
+                messages.error(request, 'Please correct the errors below.')
+            else:
+                messages.success(
+                    request, 
+                    f'Added {food_log.food.name} ({food_log.quantity}g) - {food_log.calories} calories'
+                )
+                return redirect('tracker:dashboard')
         else:
             # Form has errors - show them
             messages.error(request, 'Please correct the errors below.')
     else:
         form = FoodLogForm()
     
-    # Get all foods grouped by category
-    foods_by_category = {}
-    for food in Food.objects.all().order_by('category', 'name'):
-        category = food.get_category_display()
-        if category not in foods_by_category:
-            foods_by_category[category] = []
-        foods_by_category[category].append(food)
+    # Currently selected food, so the search box can be refilled after errors
+    selected_food = getattr(form, 'cleaned_data', {}).get('food')
+    
+    # The user's most frequent and recent foods, named from the catalog cache
+    quick_picks = [
+        catalog.get(food_id)
+        for food_id in UserFoodScore.top_food_ids(request.user, QUICK_PICK_COUNT)
+        if catalog.get(food_id) is not None
+    ]
     
     return render(request, 'tracker/add_food.html', {
         'form': form,
-        'foods_by_category': foods_by_category,
-        'foods_count': foods_count
+        'foods_count': foods_count,
+        'selected_food': selected_food,
+        'quick_picks': quick_picks,
+        'catalog_digest': catalog.asset().digest,
+        'categories': Food.CATEGORY_CHOICES,
+    })
+
+
+@login_required
+@query_budget(max_queries=12)
+def log_meal(request):
+    """
+    Log a full meal (several food items for one date) in a single request.
+    """
+    catalog = get_catalog()
+    foods_count = len(catalog)
+    
+    if request.method == 'POST':
+        form = MealLogForm(request.POST)
+        formset = MealItemFormSet(request.POST, prefix='items')
+        if form.is_valid() and formset.is_valid():
+            items = [
+                (item['food'], item['quantity'])
+                for item in formset.cleaned_data
+                if item
+            ]
+            try:
+                if buffered_log_writes_enabled():
+                    date = form.cleaned_data['date']
+                    logs = submit_logs([
+                        DailyFoodLog(user=request.user, food=food, quantity=quantity, date=date)
+                        for food, quantity in items
+                    ])
+                else:
+                    logs = DailyFoodLog.log_meal(request.user, form.cleaned_data['date'], items)
+            except ValidationError as e:
+                # A food was deleted after the form was validated
+                form.add_error(None, e)
+                messages.error(request, 'Please correct the errors below.')
+            else:
+                total = sum((log.calories for log in logs), Decimal('0.00'))
+                messages.success(
+                    request,
+                    f'Logged {len(logs)} food items - {total} calories'
+                )
+                return redirect('tracker:dashboard')
+        else:
+            messages.error(request, 'Please correct the errors below.')
+    else:
+        form = MealLogForm()
+        formset = MealItemFormSet(prefix='items')
+    
+    return render(request, 'tracker/log_meal.html', {
+        'form': form,
+        'formset': formset,
+        'foods_count': foods_count,
+        'catalog_digest': catalog.asset().digest,
     })
 
 
 @login_required
+@query_budget(max_queries=1)
+def food_search(request):
+    """
+    JSON typeahead search over the food catalog.
+    Query params: q (search text), category (optional), limit (optional, max 50).
+    """
+    query = request.GET.get('q', '').strip()
+    category = request.GET.get('category', '') or None
+    
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        limit = 10
+    limit = max(1, min(limit, FOOD_SEARCH_MAX_LIMIT))
+    
+    results = [
+        {
+            'id': food['id'],
+            'name': food['name'],
+            'category': food['category'],
+            'category_display': dict(Food.CATEGORY_CHOICES).get(food['category'], food['category']),
+            'calories_per_100g': float(food['calories_per_100g']),
+        }
+        for food in search_foods(query, category=category, limit=limit)
+    ]
+    
+    return JsonResponse({'query': query, 'results': results})
+
+
+@login_required
+@query_budget(max_queries=1)
+def food_catalog(request, digest):
+    """
+    The whole food catalog as JSON, for the typeahead to search locally.
+    The URL carries a hash of the content, so the response is cached by the
+    browser for a year and any catalog change moves it to a new URL; an
+    outdated hash redirects to the current one. The JSON and its gzipped
+    form are built once per catalog version (see FoodCatalog.asset).
+    """
+    asset = get_catalog().asset()
+    if digest != asset.digest:
+        return redirect('tracker:food_catalog', digest=asset.digest)
+    
+    if ACCEPTS_GZIP_RE.search(request.headers.get('Accept-Encoding', '')):
+        response = HttpResponse(asset.gzipped, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(asset.content, content_type='application/json')
+    response['ETag'] = f'"{asset.digest}"'
+    patch_cache_control(response, private=True, max_age=CATALOG_ASSET_MAX_AGE, immutable=True)
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _encode_cursor(log):
+    """Encode the keyset position (date, created_at, id) of a log row as an opaque cursor."""
+    position = [log['date'].isoformat(), log['created_at'].isoformat(), log['id']]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    """Decode a cursor made by _encode_cursor, returning None if it is malformed."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        date_str, created_str, log_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_str).date(), datetime.fromisoformat(created_str), int(log_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        return None
+
+
+@login_required
+@read_your_writes
+@query_budget(max_queries=1)
+def log_history_api(request):
+    """
+    JSON list of the user's food log entries, newest first.
+    Query params: cursor (from a previous page's next_cursor), start and end
+    (optional YYYY-MM-DD), category (optional).
+    Pages are fetched by keyset on (date, created_at, id) rather than by
+    offset, so every page costs the same however deep the client scrolls.
+    """
+    logs = DailyFoodLog.objects.filter(user=request.user)
+    
+    start = _parse_date(request.GET.get('start'))
+    end = _parse_date(request.GET.get('end'))
+    if start:
+        logs = logs.filter(date__gte=start)
+    if end:
+        logs = logs.filter(date__lte=end)
+    
+    category = request.GET.get('category', '')
+    if category:
+        if category not in dict(Food.CATEGORY_CHOICES):
+            return JsonResponse({'error': f'Unknown category "{category}".'}, status=400)
+        logs = logs.filter(food__category=category)
+    
+    cursor = request.GET.get('cursor', '')
+    if cursor:
+        position = _decode_cursor(cursor)
+        if position is None:
+            return JsonResponse({'error': 'Invalid cursor.'}, status=400)
+        date, created_at, log_id = position
+        # The plain date bound lets the index seek straight to the cursor
+        logs = logs.filter(date__lte=date).filter(
+            Q(date__lt=date)
+            | Q(date=date, created_at__lt=created_at)
+            | Q(date=date, created_at=created_at, id__lt=log_id)
+        )
+    
+    # Fetch one extra row to tell whether another page follows
+    rows = list(
+        logs.order_by('-date', '-created_at', '-id').values(
+            'id', 'date', 'created_at', 'quantity', 'calories',
+            'food_id', 'food__name', 'food__category'
+        )[:LOG_API_PAGE_SIZE + 1]
+    )
+    has_next = len(rows) > LOG_API_PAGE_SIZE
+    rows = rows[:LOG_API_PAGE_SIZE]
+    
+    results = [
+        {
+            'id': row['id'],
+            'date': row['date'].isoformat(),
+            'created_at': row['created_at'].isoformat(),
+            'food_id': row['food_id'],
+            'food': row['food__name'],
+            'category': row['food__category'],
+            'quantity': float(row['quantity']),
+            'calories': float(row['calories']),
+        }
+        for row in rows
+    ]
+    
+    return JsonResponse({
+        'results': results,
+        'next_cursor': _encode_cursor(rows[-1]) if has_next else None,
+    })
+
+
+@login_required
+@read_your_writes
+@query_budget(max_queries=12)
 def delete_food_log(request, log_id):
     """
     Delete a food log entry.
     """
-    food_log = get_object_or_404(DailyFoodLog, id=log_id, user=request.user)
+    food_log = get_object_or_404(DailyFoodLog.objects.select_related('food'), id=log_id, user=request.user)
     
     if request.method == 'POST':
         food_log.delete()
@@ -242,7 +513,18 @@ def delete_food_log(request, log_id):
     return render(request, 'tracker/delete_confirm.html', {'food_log': food_log})
 
 
+def _history_date(request):
+    """Return the date requested on the history page, defaulting to today."""
+    try:
+        return datetime.strptime(request.GET.get('date', ''), '%Y-%m-%d').date()
+    except ValueError:
+        return timezone.now().date()
+
+
 @login_required
+@read_your_writes
+@user_data_conditional(_history_date)
+@query_budget(max_queries=6, max_db_ms=250)
 def history(request):
     """
     View food log history with date filtering.
@@ -250,46 +532,81 @@ def history(request):
     user = request.user
     
     # Get date filter from request
-    date_filter = request.GET.get('date', '')
-    if date_filter:
-        try:
-            filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-        except ValueError:
-            filter_date = timezone.now().date()
-    else:
-        filter_date = timezone.now().date()
-    
-    # Get logs for the selected date
-    logs = DailyFoodLog.objects.filter(user=user, date=filter_date).order_by('-created_at')
+    filter_date = _history_date(request)
     
-    # Calculate total for the day
-    total_calories = logs.aggregate(total=Sum('calories'))['total'] or 0
-    
-    # Get all unique dates with logs
-    all_dates = DailyFoodLog.objects.filter(user=user).values_list('date', flat=True).distinct().order_by('-date')
-    
-    # Get weekly summary
-    week_start = filter_date - timedelta(days=6)
-    weekly_summary = DailyFoodLog.objects.filter(
-        user=user,
-        date__range=[week_start, filter_date]
-    ).values('date').annotate(
-        total_calories=Sum('calories'),
-        entry_count=Count('id')
-    ).order_by('date')
+    def compute_summary():
+        # Calculate total for the day
+        total_calories = DailyFoodLog.get_daily_total_calories(user, filter_date)
+        
+        # Get all unique dates with logs (one summary row per logged day)
+        all_dates = DailyCalorieSummary.objects.filter(user=user).values_list('date', flat=True).order_by('-date')
+        
+        # Get weekly summary
+        week_start = filter_date - timedelta(days=6)
+        weekly_summary = DailyFoodLog.get_weekly_summary(user, week_start, filter_date)
+        
+        return {
+            'total_calories': total_calories,
+            'all_dates': list(all_dates[:30]),  # Show last 30 dates
+            'weekly_summary': list(weekly_summary),
+        }
     
     context = {
-        'logs': logs,
-        'total_calories': round(float(total_calories), 2),
+        **get_or_set_user_data(user.id, 'history', compute_summary, filter_date),
+        # Get logs for the selected date (only queried when the fragment is missing)
+        'logs': DailyFoodLog.objects.filter(user=user, date=filter_date).select_related('food').order_by('-created_at'),
         'selected_date': filter_date,
-        'all_dates': all_dates[:30],  # Show last 30 dates
-        'weekly_summary': list(weekly_summary),
+        'data_version': get_user_data_version(user.id),
+        'catalog_version': get_catalog_version(),
+        'fragment_timeout': get_fragment_timeout(),
+        'csrf_key': csrf_fragment_key(request),
     }
     
     return render(request, 'tracker/history.html', context)
 
 
+def _week_start(request):
+    """Return the week requested on the weekly summary page, defaulting to the current week."""
+    try:
+        return datetime.strptime(request.GET.get('week_start', ''), '%Y-%m-%d').date()
+    except ValueError:
+        today = timezone.now().date()
+        return today - timedelta(days=today.weekday())
+
+
+def _weekly_summary_context(week_start, week_end, daily_summaries_raw, daily_target):
+    """Build the weekly summary context from the week's summary rows and the daily target."""
+    daily_target = Decimal(str(daily_target or 0)).quantize(TWO_PLACES)
+    weekly_target = daily_target * 7
+    
+    # Calculate difference for each day
+    daily_summaries = []
+    for day in daily_summaries_raw:
+        day['difference'] = day['total_calories'] - daily_target
+        daily_summaries.append(day)
+    
+    # Calculate weekly totals
+    weekly_total = sum((day['total_calories'] for day in daily_summaries), Decimal('0.00'))
+    weekly_macros = {
+        name: sum((day[f'total_{name}'] for day in daily_summaries), Decimal('0.00'))
+        for name in MACRONUTRIENTS
+    }
+    
+    return {
+        'week_start': week_start,
+        'week_end': week_end,
+        'daily_summaries': daily_summaries,
+        'weekly_total': weekly_total,
+        'weekly_macros': weekly_macros,
+        'weekly_target': weekly_target,
+        'daily_target': daily_target,
+    }
+
+
 @login_required
+@read_your_writes
+@user_data_conditional(_week_start)
+@query_budget(max_queries=3, max_db_ms=250)
 def weekly_summary(request):
     """
     Detailed weekly summary view.
@@ -297,52 +614,329 @@ def weekly_summary(request):
     user = request.user
     
     # Get week range (default: current week)
-    week_start_str = request.GET.get('week_start', '')
-    if week_start_str:
-        try:
-            week_start = datetime.strptime(week_start_str, '%Y-%m-%d').date()
-        except ValueError:
-            week_start = timezone.now().date() - timedelta(days=timezone.now().date().weekday())
-    else:
-        week_start = timezone.now().date() - timedelta(days=timezone.now().date().weekday())
-    
+    week_start = _week_start(request)
     week_end = week_start + timedelta(days=6)
     
     # Get daily summaries
-    daily_summaries_raw = DailyFoodLog.objects.filter(
-        user=user,
-        date__range=[week_start, week_end]
-    ).values('date').annotate(
-        total_calories=Sum('calories'),
-        entry_count=Count('id')
-    ).order_by('date')
+    daily_summaries_raw = DailyFoodLog.get_weekly_summary(user, week_start, week_end)
     
     # Get user's daily target
     try:
-        daily_target = float(user.profile.daily_calorie_target)
-        weekly_target = daily_target * 7
+        daily_target = user.profile.daily_calorie_target
     except UserProfile.DoesNotExist:
         daily_target = 0
-        weekly_target = 0
     
-    # Calculate difference for each day
-    daily_summaries = []
-    for day in daily_summaries_raw:
-        total = float(day['total_calories'])
-        diff = total - daily_target
-        day['difference'] = round(diff, 2)
-        daily_summaries.append(day)
+    context = _weekly_summary_context(week_start, week_end, daily_summaries_raw, daily_target)
+    
+    return render(request, 'tracker/weekly_summary.html', context)
+
+
+async def _alist(queryset):
+    """Evaluate a queryset with the async ORM."""
+    return [obj async for obj in queryset]
+
+
+@async_login_required
+@read_your_writes
+@query_budget(max_queries=5, max_db_ms=250)
+async def dashboard_async(request):
+    """
+    Async version of dashboard for ASGI deployments; the sync view is kept
+    for WSGI. The profile, today's total, today's logs, recent logs and the
+    weekly summary are independent reads, so they are awaited together.
+    Everything is fetched before rendering since templates cannot run
+    queries in an async context.
+    """
+    user = request.user
+    today = timezone.now().date()
+    week_start = today - timedelta(days=6)
     
-    # Calculate weekly total
-    weekly_total = sum(day['total_calories'] for day in daily_summaries)
+    profile, summary, today_logs, recent_logs, weekly_logs = await asyncio.gather(
+        UserProfile.objects.filter(user=user).afirst(),
+        DailyCalorieSummary.objects.filter(user=user, date=today).afirst(),
+        _alist(DailyFoodLog.objects.filter(user=user, date=today).select_related('food')),
+        _alist(DailyFoodLog.objects.filter(user=user).select_related('food').order_by('-created_at')[:5]),
+        _alist(DailyFoodLog.get_weekly_summary(user, week_start, today)),
+    )
+    if profile is None:
+        messages.warning(request, 'Please complete your profile to see calorie goals.')
+        return redirect('tracker:profile')
     
+    total_calories_consumed = summary.total_calories if summary else Decimal('0.00')
     context = {
-        'week_start': week_start,
-        'week_end': week_end,
-        'daily_summaries': daily_summaries,
-        'weekly_total': round(weekly_total, 2),
-        'weekly_target': round(weekly_target, 2),
-        'daily_target': round(daily_target, 2),
+        **_calorie_progress(profile.daily_calorie_target, total_calories_consumed),
+        'macros': {
+            name: getattr(summary, f'total_{name}') if summary else Decimal('0.00')
+            for name in MACRONUTRIENTS
+        },
+        'profile': profile,
+        'today_logs': today_logs,
+        'recent_logs': recent_logs,
+        'weekly_logs': weekly_logs,
+        'today': today,
+        'data_version': get_user_data_version(user.id),
+        'catalog_version': get_catalog_version(),
+        'fragment_timeout': get_fragment_timeout(),
+        'csrf_key': csrf_fragment_key(request),
     }
     
+    return render(request, 'tracker/dashboard.html', context)
+
+
+@async_login_required
+@read_your_writes
+@query_budget(max_queries=2, max_db_ms=250)
+async def weekly_summary_async(request):
+    """
+    Async version of weekly_summary; the week's rows and the profile are
+    fetched concurrently.
+    """
+    user = request.user
+    week_start = _week_start(request)
+    week_end = week_start + timedelta(days=6)
+    
+    daily_summaries_raw, profile = await asyncio.gather(
+        _alist(DailyFoodLog.get_weekly_summary(user, week_start, week_end)),
+        UserProfile.objects.filter(user=user).afirst(),
+    )
+    daily_target = profile.daily_calorie_target if profile else 0
+    
+    context = _weekly_summary_context(week_start, week_end, daily_summaries_raw, daily_target)
+    
     return render(request, 'tracker/weekly_summary.html', context)
+
+
+def _user_trends(request):
+    """
+    Compute the user's trends over the last ?days= days (default 365, max
+    TRENDS_MAX_DAYS), cached per user data version.
+    """
+    user = request.user
+    try:
+        days = int(request.GET.get('days', TRENDS_DEFAULT_DAYS))
+    except ValueError:
+        days = TRENDS_DEFAULT_DAYS
+    days = max(1, min(days, TRENDS_MAX_DAYS))
+    
+    end_date = timezone.now().date()
+    start_date = end_date - timedelta(days=days - 1)
+    
+    def compute():
+        profile = UserProfile.objects.filter(user=user).first()
+        daily_target = float(profile.daily_calorie_target) if profile else 0
+        return compute_trends(user, start_date, end_date, daily_target)
+    
+    return get_or_set_user_data(user.id, 'trends', compute, start_date, end_date)
+
+
+@login_required
+@read_your_writes
+@query_budget(max_queries=2, max_db_ms=250)
+def trends(request):
+    """
+    Long-range trends: rolling averages, target adherence, streaks and
+    weekday patterns.
+    """
+    trend_data = _user_trends(request)
+    
+    context = {
+        'trends': trend_data,
+        'rolling_latest': [
+            (f'{window}-day', trend_data['rolling_averages'][f'{window}d'][-1])
+            for window in ROLLING_WINDOWS
+        ],
+        'range_options': [30, 90, 365, 1825],
+    }
+    
+    return render(request, 'tracker/trends.html', context)
+
+
+@login_required
+@read_your_writes
+@query_budget(max_queries=2, max_db_ms=250)
+def trends_api(request):
+    """
+    JSON trend analytics, including the full daily rolling average series.
+    Query params: days (optional, default 365).
+    """
+    return JsonResponse(_user_trends(request))
+
+
+def _report_range(request):
+    """
+    Return (period, start_date, end_date) for the calendar report: ?period=
+    week, month or year (default month), ending at ?end= (default today) and
+    going back ?count= buckets (default depends on the period). Returns
+    None if the range runs past the first or last representable date.
+    """
+    period = request.GET.get('period')
+    if period not in PERIODS:
+        period = 'month'
+    end_date = _parse_date(request.GET.get('end')) or timezone.now().date()
+    try:
+        count = int(request.GET.get('count', REPORT_DEFAULT_BUCKETS[period]))
+    except ValueError:
+        count = REPORT_DEFAULT_BUCKETS[period]
+    count = max(1, min(count, REPORT_MAX_BUCKETS))
+    last_bucket = bucket_start(end_date, period)
+    try:
+        start_date = add_periods(last_bucket, period, 1 - count)
+        # The report computes where the last bucket ends
+        add_periods(last_bucket, period, 1)
+    except (OverflowError, ValueError):
+        return None
+    return period, start_date, end_date
+
+
+def _daily_target(user):
+    """Return the user's daily calorie target, or 0 without a profile."""
+    try:
+        return user.profile.daily_calorie_target
+    except UserProfile.DoesNotExist:
+        return 0
+
+
+@login_required
+@read_your_writes
+@user_data_conditional(_report_range)
+@query_budget(max_queries=3, max_db_ms=250)
+def calendar_report(request):
+    """
+    Weekly, monthly or yearly totals with empty periods included, bucketed
+    by the database in one grouped query and cached per user data version.
+    """
+    report_range = _report_range(request)
+    if report_range is None:
+        return HttpResponseBadRequest('The requested range is out of bounds.')
+    user = request.user
+    period, start_date, end_date = report_range
+    report = get_or_set_user_data(
+        user.id, 'report',
+        lambda: period_report(user, period, start_date, end_date, _daily_target(user)),
+        period, start_date, end_date
+    )
+    
+    return render(request, 'tracker/calendar_report.html', {
+        'report': report,
+        'periods': list(PERIODS),
+    })
+
+
+def _heatmap_end(request):
+    """
+    Return the last day shown on the heatmap, defaulting to today, or None
+    if the heatmap or its earlier/later links would run past the first or
+    last representable date.
+    """
+    end_date = _parse_date(request.GET.get('end')) or timezone.now().date()
+    try:
+        end_date - timedelta(days=HEATMAP_DAYS)
+        end_date + timedelta(days=HEATMAP_DAYS)
+    except OverflowError:
+        return None
+    return end_date
+
+
+@login_required
+@read_your_writes
+@user_data_conditional(_heatmap_end)
+@query_budget(max_queries=3, max_db_ms=250)
+def calendar_heatmap_view(request):
+    """
+    The last 365 days as a calendar heatmap of daily calories against the
+    user's target, from one range query over the daily summaries.
+    """
+    end_date = _heatmap_end(request)
+    if end_date is None:
+        return HttpResponseBadRequest('The requested range is out of bounds.')
+    user = request.user
+    heatmap = get_or_set_user_data(
+        user.id, 'heatmap',
+        lambda: calendar_heatmap(user, end_date, _daily_target(user)),
+        end_date
+    )
+    
+    return render(request, 'tracker/calendar_heatmap.html', {
+        'heatmap': heatmap,
+        'previous_end': heatmap['start'] - timedelta(days=1),
+        'next_end': heatmap['end'] + timedelta(days=HEATMAP_DAYS),
+    })
+
+
+class Echo:
+    """Pseudo-buffer whose write() returns the value, for streaming csv.writer output."""
+    def write(self, value):
+        return value
+
+
+def _parse_date(value):
+    """Parse a YYYY-MM-DD query parameter, returning None if missing or invalid."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return None
+
+
+@login_required
+@read_your_writes
+@query_budget(max_queries=2)
+def export_logs(request):
+    """
+    Stream the user's full food log history as CSV or NDJSON.
+    Query params: format (csv|ndjson), start and end (optional YYYY-MM-DD).
+    Rows are read with a server-side chunked iterator so memory use stays
+    constant regardless of history length.
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        export_format = 'csv'
+    
+    logs = DailyFoodLog.objects.filter(user=request.user)
+    start_date = _parse_date(request.GET.get('start'))
+    end_date = _parse_date(request.GET.get('end'))
+    if start_date:
+        logs = logs.filter(date__gte=start_date)
+    if end_date:
+        logs = logs.filter(date__lte=end_date)
+    
+    rows = logs.order_by('date', 'created_at', 'id').values_list(
+        'date', 'food__name', 'food__category', 'quantity', 'calories'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    categories = dict(Food.CATEGORY_CHOICES)
+    
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        
+        def stream():
+            yield writer.writerow(EXPORT_FIELDS)
+            for date, name, category, quantity, calories in rows:
+                yield writer.writerow([
+                    date.isoformat(), name, categories.get(category, category), quantity, calories
+                ])
+        
+        content_type = 'text/csv'
+    else:
+        def stream():
+            for date, name, category, quantity, calories in rows:
+                yield json.dumps({
+                    'date': date.isoformat(),
+                    'food': name,
+                    'category': categories.get(category, category),
+                    'quantity': str(quantity),
+                    'calories': str(calories),
+                }) + '\n'
+        
+        content_type = 'application/x-ndjson'
+    
+    response = StreamingHttpResponse(stream(), content_type=content_type)
+    filename = f'food-log-{request.user.username}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@staff_member_required
+def metrics(request):
+    """
+    Request metrics for this worker in the Prometheus text format (staff only).
+    """
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')